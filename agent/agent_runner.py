@@ -5,30 +5,73 @@ Single-turn orchestrator.
 
 1. Runs the conversational chain and parses its JSON commands.
 2. Applies those commands to `AgentState`.
-3. When asked to draft or revise, calls the drafter → placeholder-checker loop:
+3. When asked to draft or revise, produces the draft:
+      • patch      – revisions of an existing draft: the reviser returns
+                     structured edits, applied locally; full redraft when
+                     they don't apply or with DRAFT_REVISION_MODE=full
+      • template   – fresh drafts of templated types (NDA, lease,
+                     partnership, shareholders) are rendered locally from
+                     `needed_fields` (`agent.doc_templates`); customised
+                     clauses go to the reviser as edits on that text
+      • sections   – DRAFT_MODE=sections: other fresh drafts are outlined,
+                     then their sections drafted concurrently
+                     (`agent.draft_sections`)
+      • drafter    – everything else, one full-document call
+      • readiness  – checked before any fresh draft against the type's
+                     field schema (`agent.field_schema`); missing / invalid
+                     required fields are all asked for in one reply instead
+   then runs the placeholder check (the checker LLM only when the local
+   check can't decide):
       • if `is_success == True`   → saves clean draft
       • else (≤ 2 tries)          → injects a system prompt telling the
         conversational chain what data to collect from the user
-4. Persists both user & AI messages plus the updated state.
+4. Returns the reply + updated state. The runner never writes to the DB;
+   the caller ends the turn with one `agent.persistence.commit_turn`.
+
+`run_agent_step` is the blocking driver; `arun_agent_step` runs the very
+same turn on `ainvoke` so async routes never pin a worker thread while the
+model is generating.  Every stage is timed with `agent.metrics.span`
+(outcome-labelled, scraped at `GET /metrics`).
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import json
 import logging
-from typing import Any, Dict, Union
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from pydantic import ValidationError
 
 from agent.state import AgentState
-from agent.memory import get_memory, SQLBufferMemory
+from agent.memory import aget_memory, get_memory, SQLBufferMemory
 from agent.utils import (
     invoke_with_retry,
+    ainvoke_with_retry,
     _clean_llm_text,
-    safe_parse_json_block,
-    salvage_json,
+    parse_model_json,
+)
+from agent.llm_cache import invoke_cached, ainvoke_cached
+from agent.metrics import span
+from agent.retry import turn_deadline
+from agent.scheduler import llm_user
+from agent.json_stream import JSONFieldStreamer
+from agent.draft_patch import PatchError, apply_patch, coerce_edits, render_anchored
+from agent.doc_templates import Rendered, TemplateMiss, template_registry
+from agent.field_schema import Readiness, schema_registry
+from agent.draft_sections import Section, SectionError, assemble, parse_outline, render_outline
+from agent.chains.registry                   import chain_registry
+from agent.chains.draft_reviser_chain        import parser as reviser_parser
+from agent.chains.section_drafter_chain      import outline_parser, section_parser
+from agent.chains.placeholder_checker        import (
+    PlaceholderCheckOut,
+    local_placeholder_check,
 )
-from agent.chains.conversational_legal_chain import get_conversational_legal_chain
-from agent.chains.document_drafter_chain     import get_document_drafter_chain
-from api.models import Message
 
 logger = logging.getLogger("agent.runner")
 logger.setLevel(logging.DEBUG)
@@ -67,37 +110,59 @@ def _extract_text(res: Any) -> str:
 
 
 # ─────────────────────────────────────────────────────────────
-def run_agent_step(state: AgentState, user_input: str, conversation_id: str):
-    """One interaction turn."""
-    memory: SQLBufferMemory = get_memory(conversation_id)
+# Turn helpers – shared by the sync and async drivers
+# ─────────────────────────────────────────────────────────────
+MAX_USER_PROMPTS = 2
 
-    # Ensure new counter exists
-    if not hasattr(state, "missing_prompt_count"):
-        state.missing_prompt_count = 0
+REVISION_MODE = os.getenv("DRAFT_REVISION_MODE", "patch").strip().lower()
 
-    # ────────────────── ➊ Conversational chain ──────────────────
-    conv_chain = get_conversational_legal_chain(memory)
-    raw_conv   = invoke_with_retry(conv_chain, {
-        "user_input": user_input,
-        "state":      state.summary(),
-    })
-    conv_text  = _clean_llm_text(_extract_text(raw_conv))
+# single   – one drafter call writes the whole document
+# sections – outline first, then every section drafted concurrently
+DRAFT_MODE                = os.getenv("DRAFT_MODE", "single").strip().lower()
+DRAFT_SECTION_CONCURRENCY = max(1, int(os.getenv("DRAFT_SECTION_CONCURRENCY", "4")))
+
+# Render fresh drafts of templated types locally (off → always the model)
+DRAFT_TEMPLATES = os.getenv("DRAFT_TEMPLATES", "on").strip().lower() not in ("0", "off", "false", "no")
+
+FRESH_DRAFT = "create fresh draft"
+
+# "draft the NDA" asks for nothing custom; "draft it with a non-compete clause" does
+_GENERIC_DRAFT_RE = re.compile(
+    r"^(?:please\s+)?(?:create|draft|generate|prepare|write|produce)\b"
+    r"(?!.*\b(?:with|add|include\w*|clause|section|except|without|but|instead|change|remove)\b)",
+    re.IGNORECASE,
+)
+
+_GARBLED_REPLY = "⚠️ Sorry, something got garbled. Could you rephrase?"
+
+
+def _merge_needed_values(state: AgentState, raw: Any, where: str) -> None:
+    """Merge `update_needed_values` (dict or list of pairs) into state."""
+    if not raw:
+        return
+    if isinstance(raw, dict):
+        state.needed_fields.update(_stringify_values(raw))
+        return
+    # Handle cases where the LLM returns a list/tuple of key–value pairs
+    try:
+        state.needed_fields.update(dict(raw))  # will succeed for list[(k,v)]
+    except Exception:
+        logger.warning("⚠️ Invalid format for update_needed_values%s: %s", where, raw)
+
+
+def _parse_conversational(raw_conv: Any) -> Dict[str, Any] | None:
+    conv_text = _clean_llm_text(_extract_text(raw_conv))
     logger.debug("\n🔵 RAW conversational output ↓↓↓\n%s\n", conv_text)
+    return parse_model_json(conv_text, required_key="user_reply")
 
-    parsed = (safe_parse_json_block(conv_text)
-              or salvage_json(conv_text, required_key="user_reply"))
 
-    if parsed is None:
-        fallback = "⚠️ Sorry, something got garbled. Could you rephrase?"
-        _persist(memory, conversation_id, user_input, fallback, state)
-        return {
-            "reply":                       fallback,
-            "updated_state":               state,
-            "draft_document":              None,
-            "document_updated_this_turn":  False,
-        }
-
-    # ────────────────── ➋ Basic state updates & safety nets ──────────────────
+def _apply_conversational(state: AgentState, parsed: Dict[str, Any]) -> tuple[str, str | None]:
+    """
+    Apply the conversational JSON commands to `state`.
+
+    Returns `(reply_to_user, draft_instruction)`; the instruction is None
+    unless the chain asked for `update_document`.
+    """
     reply_to_user: str = parsed.get("user_reply", "").strip()
 
     # Fallback in case user_reply missing
@@ -111,23 +176,10 @@ def run_agent_step(state: AgentState, user_input: str, conversation_id: str):
             state.document_type = doc_type_fallback
 
     # Safely merge any provided field values even if they are not a direct mapping.
-    field_fallback_raw = parsed.get("update_needed_values", {}) or {}
-    if field_fallback_raw:
-        if isinstance(field_fallback_raw, dict):
-            state.needed_fields.update(_stringify_values(field_fallback_raw))
-        else:
-            # Handle cases where the LLM returns a list/tuple of key–value pairs
-            try:
-                field_pairs = dict(field_fallback_raw)  # will succeed for list[(k,v)]
-                state.needed_fields.update(field_pairs)
-            except Exception:
-                logger.warning("⚠️ Invalid format for update_needed_values: %s", field_fallback_raw)
+    _merge_needed_values(state, parsed.get("update_needed_values", {}) or {}, "")
 
-    actions      = parsed.get("actions", [])
-    doc_updated  = False
-
-    # ────────────────── ➌ Execute JSON actions ──────────────────
-    for action in actions:
+    instruction = None
+    for action in parsed.get("actions", []):
         match action:
 
             # ─── update_document_type ───────────────────────────
@@ -144,116 +196,255 @@ def run_agent_step(state: AgentState, user_input: str, conversation_id: str):
 
             # ─── update_needed_values ───────────────────────────
             case "update_needed_values":
-                # Accept both dict and list-of-pairs for new field values
-                new_vals_raw = parsed.get("update_needed_values", {})
-                if new_vals_raw:
-                    if isinstance(new_vals_raw, dict):
-                        state.needed_fields.update(_stringify_values(new_vals_raw))
-                    else:
-                        try:
-                            state.needed_fields.update(dict(new_vals_raw))
-                        except Exception:
-                            logger.warning("⚠️ Invalid format for update_needed_values in action: %s", new_vals_raw)
+                _merge_needed_values(
+                    state, parsed.get("update_needed_values", {}), " in action"
+                )
 
             # ─── update_document  →  drafter + checker loop ─────
             case "update_document":
-                instr = parsed.get("update_document_instruction", "").strip() \
-                        or "create fresh draft"
-
-                # 1️⃣ Draft / revise
-                history_text = memory.load_memory_variables({}).get("history", "")
-                drafter   = get_document_drafter_chain(memory)
-                drafter_raw = invoke_with_retry(drafter, {
-                     "document_type":      state.document_type,
-                     "filled_fields_json": json.dumps(state.needed_fields),
-                     "current_draft":      state.draft,
-                     "instruction":        instr,
-                     "history":            history_text,
-                     "user_input":         user_input,  # for memory.save_context
-                 })
-                drafter_txt   = _clean_llm_text(_extract_text(drafter_raw))
-                d_parsed = (safe_parse_json_block(drafter_txt)
-                            or salvage_json(drafter_txt, required_key="draft"))
-                if not d_parsed or not d_parsed.get("draft"):
-                    reply_to_user = "⚠️ Drafting failed. Please try again."
-                    break
-
-                draft = d_parsed["draft"].strip()
-
-                # 2️⃣ Placeholder check
-                from agent.chains.placeholder_checker import (
-                    get_placeholder_checker_chain, parser as checker_parser
-                )
-                checker     = get_placeholder_checker_chain(memory)
-                check_raw   = invoke_with_retry(checker, {
-                     "draft": draft,
-                     "history": history_text,
-                     "user_input": user_input,  # for memory.save_context
-                 })
-                check_txt   = _clean_llm_text(_extract_text(check_raw))
-
-                try:
-                    check = checker_parser.parse(check_txt)
-                except Exception:
-                    reply_to_user = "⚠️ Placeholder check failed. Please try again."
-                    break
-
-                MAX_USER_PROMPTS = 2
-
-                if check.is_success:
-                    # Success → save draft
-                    state.draft      = draft
-                    state.is_drafted = True
-                    doc_updated      = True
-                    reply_to_user    = (
-                        "✅ All set! Your document is fully drafted. "
-                        "Let me know if you'd like any edits."
-                    )
-
-                else:
-                    # Still missing info
-                    if state.missing_prompt_count >= MAX_USER_PROMPTS:
-                        reply_to_user = (
-                            "I'm still missing details ("
-                            + check.missing_desc +
-                            "). Let's continue once you have them."
-                        )
-                    else:
-                        # Ask the user via conversational chain
-                        state.missing_prompt_count += 1
-                        system_addition = (
-                            "I am an internal checker. The draft is missing: "
-                            + check.missing_desc +
-                            ". Please ask the user for these details."
-                        )
-
-                        follow_conv = get_conversational_legal_chain(memory)
-                        follow_raw  = invoke_with_retry(follow_conv, {
-                            "user_input":      user_input,
-                            "state":           state.summary(),
-                            "system_addition": system_addition,
-                        })
-                        follow_text = _clean_llm_text(_extract_text(follow_raw))
-                        follow_parsed = (safe_parse_json_block(follow_text)
-                                         or salvage_json(follow_text,
-                                                         required_key="update_needed_values"))
-
-                        if follow_parsed:
-                            new_vals = follow_parsed.get("update_needed_values", {})
-                            state.needed_fields.update(_stringify_values(new_vals))
-
-                        # We echo the missing description back to the user
-                        reply_to_user = check.missing_desc
+                instruction = parsed.get("update_document_instruction", "").strip() \
+                              or "create fresh draft"
 
             # ─── fall-through ───────────────────────────────────
             case _:
                 logger.warning("⚠️ Unknown action: %s", action)
 
-    # ────────────────── ➍ Persist & return ──────────────────
-    _persist(memory, conversation_id, user_input, reply_to_user, state)
+    # Readiness is decided locally: an incomplete fresh draft never reaches
+    # the drafter – every missing field is asked for in this one reply.
+    if instruction and (not state.draft.strip() or _is_fresh(instruction)):
+        readiness = _check_readiness(state)
+        if readiness is not None and not readiness.ready:
+            return readiness.ask(), None
+
+    return reply_to_user, instruction
+
+
+def _check_readiness(state: AgentState) -> Readiness | None:
+    """Field-schema check for the document type (None → no schema, the model decides)."""
+    with span("readiness") as s:
+        readiness = schema_registry.check(state.document_type, state.needed_fields)
+        if readiness is None:
+            s.outcome = "no_schema"
+        elif not readiness.ready:
+            logger.info("🧾 %s not ready to draft – %s", readiness.doc_type, readiness.summary())
+            s.outcome = "missing_fields"
+        return readiness
+
 
+def _drafter_inputs(state: AgentState, instruction: str, history_text: Any) -> Dict[str, Any]:
     return {
-        "reply":                       reply_to_user,
+        "document_type":      state.document_type,
+        "filled_fields_json": json.dumps(state.needed_fields),
+        "current_draft":      state.draft,
+        "instruction":        instruction,
+        "history":            history_text,
+    }
+
+
+def _parse_draft(drafter_raw: Any) -> str | None:
+    d_parsed = parse_model_json(_extract_text(drafter_raw), required_key="draft")
+    if not d_parsed or not d_parsed.get("draft"):
+        return None
+    return d_parsed["draft"].strip()
+
+
+def _is_fresh(instruction: str) -> bool:
+    return instruction.strip().lower().startswith(FRESH_DRAFT)
+
+
+def _wants_patch(state: AgentState, instruction: str) -> bool:
+    return (
+        REVISION_MODE == "patch"
+        and state.is_drafted
+        and bool(state.draft.strip())
+        and not _is_fresh(instruction)
+    )
+
+
+def _reviser_inputs(state: AgentState, instruction: str, history_text: Any) -> Dict[str, Any]:
+    return {
+        "document_type":      state.document_type,
+        "filled_fields_json": json.dumps(state.needed_fields),
+        "anchored_draft":     render_anchored(state.draft),
+        "instruction":        instruction,
+        "history":            history_text,
+    }
+
+
+def _parse_patch(reviser_raw: Any) -> Dict[str, Any] | None:
+    try:
+        return reviser_parser.parse(_extract_text(reviser_raw))
+    except ValueError:
+        return None
+
+
+def _patched_draft(state: AgentState, reviser_raw: Any) -> tuple[str | None, str]:
+    """
+    Revised draft from the reviser's edits (None → regenerate fully) and
+    the outcome label: patched | full_rewrite | parse_failed | rejected.
+    """
+    parsed = _parse_patch(reviser_raw)
+    if parsed is None or parsed.get("full_rewrite"):
+        logger.info("🩹 Reviser asked for / forced a full rewrite")
+        return None, "parse_failed" if parsed is None else "full_rewrite"
+    try:
+        edits = coerce_edits(parsed["edits"])
+        draft = apply_patch(state.draft, edits)
+    except PatchError as exc:
+        logger.warning("🩹 Patch rejected (%s) – falling back to full draft", exc)
+        return None, "rejected"
+    logger.info("🩹 Applied %d edit(s) to the draft", len(edits))
+    return draft, "patched"
+
+
+def _patch_ok(text: str) -> bool:
+    return _parse_patch(text) is not None
+
+
+def _wants_sections(state: AgentState, instruction: str) -> bool:
+    """Only fresh drafts – a revision must keep the existing text."""
+    return DRAFT_MODE == "sections" and (not state.draft.strip() or _is_fresh(instruction))
+
+
+def _wants_template(state: AgentState, instruction: str) -> bool:
+    return DRAFT_TEMPLATES and (not state.draft.strip() or _is_fresh(instruction))
+
+
+def _customisation(instruction: str, custom_fields: Dict[str, str]) -> str | None:
+    """
+    What the model still has to write on top of a rendered template: the
+    instruction beyond "create fresh draft", plus field values no template
+    slot took.  None → the rendered draft is final.
+    """
+    extra = instruction.strip()
+    if _is_fresh(extra):
+        extra = extra[len(FRESH_DRAFT):].strip(" ;:,.-–—")
+    elif _GENERIC_DRAFT_RE.match(extra):
+        extra = ""
+    parts = [extra] if extra else []
+    if custom_fields:
+        parts.append(
+            "Add or adapt clauses so the draft also covers these agreed terms: "
+            + json.dumps(custom_fields, ensure_ascii=False)
+        )
+    return "; ".join(parts) or None
+
+
+def _render_template(state: AgentState) -> Rendered | None:
+    with span("template") as s:
+        try:
+            rendered = template_registry.render(state.document_type, state.needed_fields)
+        except TemplateMiss as exc:
+            logger.info("📐 No template draft (%s) – drafting with the model", exc)
+            s.outcome = "missing_fields"
+            return None
+        if rendered is None:
+            s.outcome = "no_template"
+        return rendered
+
+
+def _outline_inputs(state: AgentState, instruction: str, history_text: Any) -> Dict[str, Any]:
+    return {
+        "document_type":      state.document_type,
+        "filled_fields_json": json.dumps(state.needed_fields),
+        "instruction":        instruction,
+        "history":            history_text,
+    }
+
+
+def _section_inputs(
+    state: AgentState, instruction: str, title: str, sections: List[Section], idx: int,
+) -> Dict[str, Any]:
+    section = sections[idx]
+    return {
+        "document_type":      state.document_type,
+        "filled_fields_json": json.dumps(state.needed_fields),
+        "instruction":        instruction,
+        "title":              title or state.document_type,
+        "outline":            render_outline(sections),
+        "section":            f"{idx + 1}. {section.heading}"
+                              + (f" – {section.brief}" if section.brief else ""),
+    }
+
+
+def _parse_outline(outline_raw: Any) -> tuple[str, List[Section]] | None:
+    try:
+        return parse_outline(outline_parser.parse(_extract_text(outline_raw)))
+    except (ValueError, SectionError) as exc:
+        logger.warning("🗂 Unusable outline (%s) – drafting in one call", exc)
+        return None
+
+
+def _parse_section(section_raw: Any) -> str | None:
+    try:
+        return section_parser.parse(_extract_text(section_raw))["section"].strip()
+    except ValueError:
+        return None
+
+
+def _outline_ok(text: str) -> bool:
+    return _parse_outline(text) is not None
+
+
+def _section_ok(text: str) -> bool:
+    return _parse_section(text) is not None
+
+
+def _assembled(title: str, sections: List[Section], texts: List[str | None]) -> tuple[str | None, str]:
+    """Assembled draft (None → single-call drafter) and the span outcome."""
+    try:
+        draft = assemble(title, sections, texts)
+    except SectionError as exc:
+        logger.warning("🗂 Sections not assembled (%s) – drafting in one call", exc)
+        return None, "inconsistent"
+    logger.info("🗂 Assembled %d section(s)", len(sections))
+    return draft, "ok"
+
+
+def _parse_check(check_raw: Any) -> PlaceholderCheckOut | None:
+    parsed = parse_model_json(_extract_text(check_raw), required_key="is_success")
+    if parsed is None:
+        return None
+    try:
+        return PlaceholderCheckOut(**parsed)
+    except ValidationError:
+        return None
+
+
+def _draft_ok(text: str) -> bool:
+    return _parse_draft(text) is not None
+
+
+def _check_ok(text: str) -> bool:
+    return _parse_check(text) is not None
+
+
+def _check_outcome(where: str, check: PlaceholderCheckOut | None) -> str:
+    """Span label: local_pass | local_fail | llm_pass | llm_fail | parse_failed."""
+    if check is None:
+        return "parse_failed"
+    return f"{where}_{'pass' if check.is_success else 'fail'}"
+
+
+def _missing_info_prompt(check: PlaceholderCheckOut) -> str:
+    return (
+        "I am an internal checker. The draft is missing: "
+        + check.missing_desc +
+        ". Please ask the user for these details."
+    )
+
+
+def _apply_follow_up(state: AgentState, follow_raw: Any) -> None:
+    follow_parsed = parse_model_json(_extract_text(follow_raw),
+                                     required_key="update_needed_values")
+    if follow_parsed:
+        new_vals = follow_parsed.get("update_needed_values", {})
+        state.needed_fields.update(_stringify_values(new_vals))
+
+
+def _turn_result(state: AgentState, reply: str, doc_updated: bool) -> Dict[str, Any]:
+    return {
+        "reply":                       reply,
         "updated_state":               state,
         "draft_document":              state.draft if state.is_drafted else None,
         "document_updated_this_turn":  doc_updated,
@@ -261,24 +452,517 @@ def run_agent_step(state: AgentState, user_input: str, conversation_id: str):
 
 
 # ─────────────────────────────────────────────────────────────
-def _persist(
-    memory: SQLBufferMemory,
-    conv_id: str,
-    user_msg: str,
-    ai_msg: str,
+def run_agent_step(
     state: AgentState,
+    user_input: str,
+    conversation_id: str,
+    user_id: Optional[int] = None,
 ):
-    """Save chat messages + commit DB."""
-    memory.chat_memory.add_user_message(user_msg)
-    memory.chat_memory.add_ai_message(ai_msg)
-    memory.db.add_all(
-        [
-            Message(
-                conversation_id=int(conv_id), sender="user", content=user_msg
-            ),
-            Message(
-                conversation_id=int(conv_id), sender="assistant", content=ai_msg
-            ),
-        ]
+    """
+    One interaction turn.  LLM calls are scheduled fairly per `user_id`
+    and share one deadline budget (LLM_TURN_DEADLINE_SECONDS).
+    """
+    with llm_user(_user_key(user_id, conversation_id)), turn_deadline(), span("turn") as turn:
+        result = _run_agent_step(state, user_input, conversation_id)
+        turn.outcome = _turn_outcome(result)
+        return result
+
+
+def _turn_outcome(result: Dict[str, Any]) -> str:
+    if result["document_updated_this_turn"]:
+        return "drafted"
+    return "garbled" if result["reply"] == _GARBLED_REPLY else "ok"
+
+
+def _user_key(user_id: Optional[int], conversation_id: str) -> str:
+    return f"user:{user_id}" if user_id is not None else f"conv:{conversation_id}"
+
+
+def _run_agent_step(state: AgentState, user_input: str, conversation_id: str):
+    with span("memory_load"):
+        memory: SQLBufferMemory = get_memory(conversation_id)
+        memory.compact(state)   # rolling summary (no-op in buffer mode)
+        history = memory.load_memory_variables({}).get("history", "")
+
+    # Ensure new counter exists
+    if not hasattr(state, "missing_prompt_count"):
+        state.missing_prompt_count = 0
+
+    # ────────────────── ➊ Conversational chain ──────────────────
+    with span("conversational") as s:
+        raw_conv = invoke_with_retry(chain_registry.get("conversational"), {
+            "user_input": user_input,
+            "state":      state.summary(),
+            "history":    history,
+        })
+        parsed = _parse_conversational(raw_conv)
+        if parsed is None:
+            s.outcome = "parse_failed"
+
+    if parsed is None:
+        return _turn_result(state, _GARBLED_REPLY, False)
+
+    # ────────────────── ➋ State updates & JSON actions ──────────────────
+    reply_to_user, instr = _apply_conversational(state, parsed)
+    doc_updated = False
+
+    # ────────────────── ➌ Drafter → checker loop ──────────────────
+    if instr is not None:
+        reply_to_user, doc_updated = _draft_and_check(
+            history, state, user_input, instr
+        )
+
+    # ────────────────── ➍ Return (caller commits the turn) ──────────────────
+    return _turn_result(state, reply_to_user, doc_updated)
+
+
+def _draft_and_check(
+    history_text: Any,
+    state: AgentState,
+    user_input: str,
+    instr: str,
+) -> tuple[str, bool]:
+    # 1️⃣ Draft / revise
+    draft = _produce_draft(history_text, state, instr)
+    if draft is None:
+        return "⚠️ Drafting failed. Please try again.", False
+
+    # 2️⃣ Placeholder check – local fast path, LLM only when undecided
+    with span("checker") as s:
+        check = local_placeholder_check(draft, state.needed_fields)
+        where = "local"
+        if check is None:
+            where = "llm"
+            check_raw = invoke_cached("checker", chain_registry.get("checker"), {
+                "draft": draft,
+                "history": history_text,
+            }, accept=_check_ok)
+            check = _parse_check(check_raw)
+        s.outcome = _check_outcome(where, check)
+    if check is None:
+        return "⚠️ Placeholder check failed. Please try again.", False
+
+    if check.is_success:
+        return _accept_draft(state, draft), True
+
+    # Still missing info
+    if state.missing_prompt_count >= MAX_USER_PROMPTS:
+        return _give_up_reply(check), False
+
+    # Ask the user via conversational chain
+    state.missing_prompt_count += 1
+    with span("follow_up"):
+        follow_raw = invoke_with_retry(chain_registry.get("conversational"), {
+            "user_input":      user_input,
+            "state":           state.summary(),
+            "history":         history_text,
+            "system_addition": _missing_info_prompt(check),
+        })
+        _apply_follow_up(state, follow_raw)
+
+    # We echo the missing description back to the user
+    return check.missing_desc, False
+
+
+def _produce_draft(history_text: Any, state: AgentState, instr: str) -> str | None:
+    """Patch the existing draft when possible, else regenerate it."""
+    if _wants_patch(state, instr):
+        with span("reviser") as s:
+            reviser_raw = invoke_cached(
+                "reviser", chain_registry.get("reviser"),
+                _reviser_inputs(state, instr, history_text),
+                accept=_patch_ok,
+            )
+            draft, s.outcome = _patched_draft(state, reviser_raw)
+        if draft is not None:
+            return draft
+
+    if _wants_template(state, instr):
+        draft = _template_draft(history_text, state, instr)
+        if draft is not None:
+            return draft
+
+    if _wants_sections(state, instr):
+        draft = _draft_sections(history_text, state, instr)
+        if draft is not None:
+            return draft
+
+    with span("drafter") as s:
+        drafter_raw = invoke_cached(
+            "drafter", chain_registry.get("drafter"),
+            _drafter_inputs(state, instr, history_text),
+            accept=_draft_ok,
+        )
+        draft = _parse_draft(drafter_raw)
+        if draft is None:
+            s.outcome = "parse_failed"
+    return draft
+
+
+def _template_draft(history_text: Any, state: AgentState, instr: str) -> str | None:
+    """Rendered template; custom clauses are patched in by the reviser."""
+    rendered = _render_template(state)
+    if rendered is None:
+        return None
+    custom = _customisation(instr, rendered.custom_fields)
+    if custom is None:
+        return rendered.draft
+
+    base = state.model_copy(update={"draft": rendered.draft, "is_drafted": True})
+    with span("reviser") as s:
+        reviser_raw = invoke_cached(
+            "reviser", chain_registry.get("reviser"),
+            _reviser_inputs(base, custom, history_text),
+            accept=_patch_ok,
+        )
+        draft, s.outcome = _patched_draft(base, reviser_raw)
+    return draft
+
+
+def _draft_sections(history_text: Any, state: AgentState, instr: str) -> str | None:
+    """Outline, then draft every section on a bounded thread pool."""
+    with span("outline") as s:
+        outline_raw = invoke_cached(
+            "outline", chain_registry.get("outline"),
+            _outline_inputs(state, instr, history_text),
+            accept=_outline_ok,
+        )
+        outline = _parse_outline(outline_raw)
+        if outline is None:
+            s.outcome = "parse_failed"
+            return None
+    title, sections = outline
+
+    with span("sections") as s:
+        workers = min(DRAFT_SECTION_CONCURRENCY, len(sections))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="section") as pool:
+            # copy_context: the scheduler user and turn deadline ride along
+            futures = [
+                pool.submit(contextvars.copy_context().run,
+                            _draft_section, state, instr, title, sections, idx)
+                for idx in range(len(sections))
+            ]
+            texts = [f.result() for f in futures]
+        draft, s.outcome = _assembled(title, sections, texts)
+    return draft
+
+
+def _draft_section(
+    state: AgentState, instr: str, title: str, sections: List[Section], idx: int,
+) -> str | None:
+    with span("section") as s:
+        section_raw = invoke_cached(
+            "section", chain_registry.get("section"),
+            _section_inputs(state, instr, title, sections, idx),
+            accept=_section_ok,
+        )
+        text = _parse_section(section_raw)
+        if text is None:
+            s.outcome = "parse_failed"
+    return text
+
+
+def _accept_draft(state: AgentState, draft: str) -> str:
+    """Success → save draft."""
+    state.draft      = draft
+    state.is_drafted = True
+    return (
+        "✅ All set! Your document is fully drafted. "
+        "Let me know if you'd like any edits."
     )
-    memory.db.commit()
+
+
+def _give_up_reply(check: PlaceholderCheckOut) -> str:
+    return (
+        "I'm still missing details ("
+        + check.missing_desc +
+        "). Let's continue once you have them."
+    )
+
+
+# ─────────────────────────────────────────────────────────────
+# Async variant – same turn, built on `ainvoke`
+# ─────────────────────────────────────────────────────────────
+TokenSink = Callable[[str], Awaitable[None]]
+
+
+class _TokenForwarder(AsyncCallbackHandler):
+    """
+    Streams the conversational envelope's `user_reply` into `sink` as the
+    model writes it; the action keys around it are never forwarded.
+    """
+
+    def __init__(self, sink: TokenSink):
+        self.sink     = sink
+        self.streamer = JSONFieldStreamer("user_reply")
+        self.sent     = 0     # reply chars already forwarded
+
+    async def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        self.streamer = JSONFieldStreamer("user_reply")   # fresh per (re)try
+
+    async def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        self.streamer = JSONFieldStreamer("user_reply")
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if not token or not self.streamer.feed(token):
+            return
+        # A retry re-generates the reply – don't repeat what was already sent
+        fresh = self.streamer.value[self.sent:]
+        if fresh:
+            self.sent += len(fresh)
+            await self.sink(fresh)
+
+
+ProgressSink = Callable[[str], Awaitable[None]]
+
+
+async def _noop_progress(stage: str) -> None:
+    return None
+
+
+async def arun_agent_step(
+    state: AgentState,
+    user_input: str,
+    conversation_id: str,
+    on_token: Optional[TokenSink] = None,
+    user_id: Optional[int] = None,
+):
+    """
+    Async twin of `run_agent_step`.
+
+    Every LLM round-trip is awaited via `ainvoke`, and the memory is loaded
+    on the async engine (`aget_memory`), so the event loop stays free
+    while the model is thinking.
+
+    `on_token` (optional) receives the conversational reply text as the
+    model produces it – decoded out of the JSON envelope incrementally, so
+    the action metadata is never shown; drafting / checking calls are not
+    forwarded.
+    """
+    with llm_user(_user_key(user_id, conversation_id)), turn_deadline(), span("turn") as turn:
+        phase = await _arun_conversational(state, user_input, conversation_id, on_token)
+        if phase["draft_instruction"] is None:
+            result = _turn_result(state, phase["reply"], False)
+        else:
+            # ➌ Drafter → checker loop
+            reply_to_user, doc_updated = await _adraft_and_check(
+                phase["history"], state, user_input, phase["draft_instruction"]
+            )
+            result = _turn_result(state, reply_to_user, doc_updated)
+        # ➍ Return (caller commits the turn)
+        turn.outcome = _turn_outcome(result)
+        return result
+
+
+async def arun_conversational_step(
+    state: AgentState,
+    user_input: str,
+    conversation_id: str,
+    on_token: Optional[TokenSink] = None,
+    user_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    First half of a turn: conversational chain + state updates only.
+
+    Returns `{"reply", "updated_state", "draft_instruction", "history"}`;
+    when `draft_instruction` is not None the caller is expected to run
+    `arun_drafting_step` (possibly in the background).
+    """
+    with llm_user(_user_key(user_id, conversation_id)), turn_deadline():
+        return await _arun_conversational(state, user_input, conversation_id, on_token)
+
+
+async def arun_drafting_step(
+    state: AgentState,
+    user_input: str,
+    conversation_id: str,
+    instruction: str,
+    history: Any,
+    user_id: Optional[int] = None,
+    on_progress: Optional[ProgressSink] = None,
+) -> Dict[str, Any]:
+    """
+    Second half of a turn: drafter → checker loop (+ follow-up).
+
+    `on_progress` is awaited with "drafting", "checking" and "follow_up"
+    as each stage starts. Returns the usual turn-result dict.
+    """
+    with llm_user(_user_key(user_id, conversation_id)), turn_deadline():
+        reply_to_user, doc_updated = await _adraft_and_check(
+            history, state, user_input, instruction, on_progress or _noop_progress
+        )
+        return _turn_result(state, reply_to_user, doc_updated)
+
+
+async def _arun_conversational(
+    state: AgentState,
+    user_input: str,
+    conversation_id: str,
+    on_token: Optional[TokenSink],
+) -> Dict[str, Any]:
+    with span("memory_load"):
+        memory: SQLBufferMemory = await aget_memory(conversation_id)
+        await memory.acompact(state)
+        history = memory.load_memory_variables({}).get("history", "")
+
+    if not hasattr(state, "missing_prompt_count"):
+        state.missing_prompt_count = 0
+
+    # ➊ Conversational chain
+    config = {"callbacks": [_TokenForwarder(on_token)]} if on_token else None
+    with span("conversational") as s:
+        raw_conv = await ainvoke_with_retry(chain_registry.get("conversational"), {
+            "user_input": user_input,
+            "state":      state.summary(),
+            "history":    history,
+        }, config=config)
+        parsed = _parse_conversational(raw_conv)
+        if parsed is None:
+            s.outcome = "parse_failed"
+
+    if parsed is None:
+        reply_to_user, instr = _GARBLED_REPLY, None
+    else:
+        # ➋ State updates & JSON actions
+        reply_to_user, instr = _apply_conversational(state, parsed)
+
+    return {
+        "reply":             reply_to_user,
+        "updated_state":     state,
+        "draft_instruction": instr,
+        "history":           history,
+    }
+
+
+async def _adraft_and_check(
+    history_text: Any,
+    state: AgentState,
+    user_input: str,
+    instr: str,
+    on_progress: ProgressSink = _noop_progress,
+) -> tuple[str, bool]:
+    await on_progress("drafting")
+    draft = await _aproduce_draft(history_text, state, instr)
+    if draft is None:
+        return "⚠️ Drafting failed. Please try again.", False
+
+    await on_progress("checking")
+    with span("checker") as s:
+        check = local_placeholder_check(draft, state.needed_fields)
+        where = "local"
+        if check is None:
+            where = "llm"
+            check_raw = await ainvoke_cached("checker", chain_registry.get("checker"), {
+                "draft": draft,
+                "history": history_text,
+            }, accept=_check_ok)
+            check = _parse_check(check_raw)
+        s.outcome = _check_outcome(where, check)
+    if check is None:
+        return "⚠️ Placeholder check failed. Please try again.", False
+
+    if check.is_success:
+        return _accept_draft(state, draft), True
+
+    if state.missing_prompt_count >= MAX_USER_PROMPTS:
+        return _give_up_reply(check), False
+
+    await on_progress("follow_up")
+    state.missing_prompt_count += 1
+    with span("follow_up"):
+        follow_raw = await ainvoke_with_retry(chain_registry.get("conversational"), {
+            "user_input":      user_input,
+            "state":           state.summary(),
+            "history":         history_text,
+            "system_addition": _missing_info_prompt(check),
+        })
+        _apply_follow_up(state, follow_raw)
+    return check.missing_desc, False
+
+
+async def _aproduce_draft(history_text: Any, state: AgentState, instr: str) -> str | None:
+    if _wants_patch(state, instr):
+        with span("reviser") as s:
+            reviser_raw = await ainvoke_cached(
+                "reviser", chain_registry.get("reviser"),
+                _reviser_inputs(state, instr, history_text),
+                accept=_patch_ok,
+            )
+            draft, s.outcome = _patched_draft(state, reviser_raw)
+        if draft is not None:
+            return draft
+
+    if _wants_template(state, instr):
+        draft = await _atemplate_draft(history_text, state, instr)
+        if draft is not None:
+            return draft
+
+    if _wants_sections(state, instr):
+        draft = await _adraft_sections(history_text, state, instr)
+        if draft is not None:
+            return draft
+
+    with span("drafter") as s:
+        drafter_raw = await ainvoke_cached(
+            "drafter", chain_registry.get("drafter"),
+            _drafter_inputs(state, instr, history_text),
+            accept=_draft_ok,
+        )
+        draft = _parse_draft(drafter_raw)
+        if draft is None:
+            s.outcome = "parse_failed"
+    return draft
+
+
+async def _atemplate_draft(history_text: Any, state: AgentState, instr: str) -> str | None:
+    rendered = _render_template(state)
+    if rendered is None:
+        return None
+    custom = _customisation(instr, rendered.custom_fields)
+    if custom is None:
+        return rendered.draft
+
+    base = state.model_copy(update={"draft": rendered.draft, "is_drafted": True})
+    with span("reviser") as s:
+        reviser_raw = await ainvoke_cached(
+            "reviser", chain_registry.get("reviser"),
+            _reviser_inputs(base, custom, history_text),
+            accept=_patch_ok,
+        )
+        draft, s.outcome = _patched_draft(base, reviser_raw)
+    return draft
+
+
+async def _adraft_sections(history_text: Any, state: AgentState, instr: str) -> str | None:
+    """Outline, then draft every section concurrently (at most N in flight)."""
+    with span("outline") as s:
+        outline_raw = await ainvoke_cached(
+            "outline", chain_registry.get("outline"),
+            _outline_inputs(state, instr, history_text),
+            accept=_outline_ok,
+        )
+        outline = _parse_outline(outline_raw)
+        if outline is None:
+            s.outcome = "parse_failed"
+            return None
+    title, sections = outline
+
+    gate = asyncio.Semaphore(DRAFT_SECTION_CONCURRENCY)
+
+    async def draft_one(idx: int) -> str | None:
+        async with gate:
+            with span("section") as s:
+                section_raw = await ainvoke_cached(
+                    "section", chain_registry.get("section"),
+                    _section_inputs(state, instr, title, sections, idx),
+                    accept=_section_ok,
+                )
+                text = _parse_section(section_raw)
+                if text is None:
+                    s.outcome = "parse_failed"
+            return text
+
+    with span("sections") as s:
+        texts = await asyncio.gather(*(draft_one(idx) for idx in range(len(sections))))
+        draft, s.outcome = _assembled(title, sections, list(texts))
+    return draft
@@ -19,11 +19,8 @@ Natural conversation chain that:
 
 from typing import Dict, Any
 
-from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 
-from agent.llm import llm_chain  # → your ChatOpenAI wrapper
-
 
 _CLS_PROMPT = PromptTemplate(
     input_variables=["history", "user_input", "state"],
@@ -55,10 +52,15 @@ Never violate the guard-rules afterwards.
 4. Return **ONLY** a valid compact JSON, no markdown, no commentary.
 5. BEFORE choosing the `update_document` action, run an INTERNAL checklist:
    • Are **all** required fields for the chosen `document_type` present in `needed_fields`?
+     When the AgentState lists `missing=[…]`, those fields are still required – ask for **every**
+     one of them in a single reply and store answers under those names.
    • Does each value look plausible for its field?  (e.g. dates resemble `YYYY-MM-DD` or `July 17, 2025`; names are alphabetic; amounts are numeric; addresses have street words, etc.)
    • Are there any other fields that are typically required for this document type but missing from `needed_fields`? If so, ask the user for those as well.
    • If anything is missing, obviously invalid, or you think another field is needed, do **not** draft yet. Instead ask the user focused follow-up questions and emit only `update_needed_values` this turn.
 6. Never fabricate or guess values. Collect them explicitly from the user.
+7. `update_document_instruction`: for a first draft write `create fresh draft`, followed by any clause
+   the user wants customised (e.g. `create fresh draft; add a 12-month non-solicitation clause`).
+   For an existing draft, describe the change.
 
 Schema:
 {{
@@ -76,13 +78,3 @@ Guard-rules:
 """
 )
 
-
-def get_conversational_legal_chain(memory) -> LLMChain:
-    """Factory — returns an LLMChain with SQL-buffer memory attached."""
-    return LLMChain(
-        llm=llm_chain,
-        prompt=_CLS_PROMPT,
-        memory=memory,
-        output_key="text",
-        verbose=True   # <— runner pulls .text then parses JSON
-    )
@@ -20,13 +20,10 @@ import json
 import logging
 from typing import Dict
 
-from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 
 from pydantic import BaseModel, Field
 
-from agent.llm import llm_chain
-
 logger = logging.getLogger("agent.drafter")
 logger.setLevel(logging.DEBUG)
 
@@ -34,18 +31,16 @@ logger.setLevel(logging.DEBUG)
 # ────────────────────────────
 # JSON schema & parser
 # ────────────────────────────
-from agent.utils import safe_parse_json_block, _iterate_json_candidates
+from agent.utils import parse_model_json
 
 class SimpleDraftOutputParser:
     def get_format_instructions(self) -> str:
         return 'Return ONLY a JSON object with keys "draft" and "is_drafted".'
 
     def parse(self, text: str) -> dict:
-        # Try all balanced-brace JSON blocks
-        for candidate in _iterate_json_candidates(text):
-            parsed = safe_parse_json_block(candidate)
-            if parsed and 'draft' in parsed and 'is_drafted' in parsed:
-                return parsed
+        parsed = parse_model_json(text, required_key="draft")
+        if parsed and 'is_drafted' in parsed:
+            return parsed
         raise ValueError(f"No valid draft JSON found in output:\n{text}")
 
 parser = SimpleDraftOutputParser()
@@ -90,19 +85,3 @@ No markdown, no commentary.
 """
 )
 
-
-from agent.memory import SQLBufferMemory
-
-def get_document_drafter_chain(memory: "SQLBufferMemory | None" = None) -> LLMChain:
-    # If memory is provided and 'user_input' is not among input_variables, set input_key=None to avoid KeyError
-    use_input_key = memory is None or "user_input" in _DRAFTER_PROMPT.input_variables
-    llmchain_kwargs = dict(
-        llm=llm_chain,
-        prompt=_DRAFTER_PROMPT.partial(format_instructions=parser.get_format_instructions()),
-        memory=memory,
-        output_key="text",
-        verbose=True,
-    )
-    if use_input_key:
-        llmchain_kwargs["input_key"] = "user_input"
-    return LLMChain(**llmchain_kwargs)
@@ -0,0 +1,96 @@
+"""
+agent/chains/draft_reviser_chain.py
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Revises an EXISTING draft by returning structured edits instead of the
+whole document (see `agent.draft_patch`).
+
+INPUT keys:
+• document_type          – str
+• filled_fields_json     – str  (JSON object of {field: value})
+• anchored_draft         – str  (draft with [[Bn]] block labels)
+• instruction            – str  (e.g. "change the notice period to 60 days")
+• history                – str
+
+OUTPUT (strict JSON):
+{
+  "full_rewrite": false,
+  "edits": [ {"op": "replace", "anchor": "B4", "find": "30 days", "text": "60 days"} ]
+}
+"""
+
+import logging
+
+from langchain.prompts import PromptTemplate
+
+from agent.utils import parse_model_json
+
+logger = logging.getLogger("agent.reviser")
+logger.setLevel(logging.DEBUG)
+
+
+# ────────────────────────────
+# JSON parser
+# ────────────────────────────
+class SimplePatchOutputParser:
+    def get_format_instructions(self) -> str:
+        return 'Return ONLY a JSON object with keys "full_rewrite" and "edits".'
+
+    def parse(self, text: str) -> dict:
+        parsed = (parse_model_json(text, required_key="edits")
+                  or parse_model_json(text, required_key="full_rewrite"))
+        if parsed and parsed.get("full_rewrite") is True:
+            return {"full_rewrite": True, "edits": []}
+        if parsed and isinstance(parsed.get("edits"), list):
+            return parsed
+        raise ValueError(f"No valid edit JSON found in output:\n{text}")
+
+parser = SimplePatchOutputParser()
+
+# ────────────────────────────
+# Prompt
+# ────────────────────────────
+_REVISER_PROMPT = PromptTemplate(
+    input_variables=["document_type", "filled_fields_json",
+                     "anchored_draft", "instruction", "history"],
+    template=r"""
+You are a veteran legal drafter revising an existing document.
+
+────────────────────────────────────────────
+Conversation history (for reference):
+{history}
+────────────────────────────────────────────
+📝 Document type: {document_type}
+📑 Field values (JSON): {filled_fields_json}
+📄 Current draft – every block is labelled [[Bn]]: <<<START>>>
+{anchored_draft}
+<<<END>>>
+🛈 Revision instruction: {instruction}
+────────────────────────────────────────────
+
+TASK:
+• Do NOT return the document. Return only the edits needed to carry out the instruction.
+• Each edit is one of:
+  {{"op": "replace", "anchor": "B4", "text": "<new text for the whole block>"}}
+  {{"op": "replace", "anchor": "B4", "find": "<exact text inside B4>", "text": "<replacement>"}}
+  {{"op": "insert_after", "anchor": "B4", "text": "<new block>"}}
+  {{"op": "insert_before", "anchor": "B4", "text": "<new block>"}}
+  {{"op": "delete", "anchor": "B4"}}
+• Anchors refer to the labels above. Never write [[Bn]] labels inside "text".
+• "find" must be copied EXACTLY from the block and occur there only once; prefer it for small wording changes.
+• STRICT: Only use the provided field values. Placeholders like [DATE] or [NAME] are FORBIDDEN.
+• Renumber following clauses yourself (with extra edits) if an insert or delete requires it.
+• If the instruction needs the whole document rewritten (new document type, full restructure),
+  return {{"full_rewrite": true, "edits": []}} instead.
+
+Return only compact JSON exactly:
+
+{{
+  "full_rewrite": false,
+  "edits": [ ... ]
+}}
+
+No markdown, no commentary.
+
+{format_instructions}
+"""
+)
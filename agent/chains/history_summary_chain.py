@@ -0,0 +1,35 @@
+"""
+agent/chains/history_summary_chain.py
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Rolling summary of older conversation turns (used by `SQLBufferMemory`
+in MEMORY_MODE=summary).
+
+INPUT keys:
+• summary    – str  (current summary, may be empty)
+• new_lines  – str  ("Human: …\nAI: …" transcript to fold in)
+
+OUTPUT: plain-text updated summary.
+"""
+
+from langchain.prompts import PromptTemplate
+
+
+_SUMMARY_PROMPT = PromptTemplate(
+    input_variables=["summary", "new_lines"],
+    template=r"""
+You maintain the running summary of a legal-drafting conversation.
+
+Current summary:
+{summary}
+
+New conversation lines to fold in:
+{new_lines}
+
+Return the updated summary as short plain-text bullet points.
+• KEEP every concrete fact the user supplied (names, dates, amounts,
+  addresses, clauses requested, decisions made) – verbatim where possible.
+• Drop greetings, small talk and repeated questions.
+• No markdown headings, no commentary.
+"""
+)
+
@@ -3,27 +3,20 @@ Detect unresolved placeholders in a draft.
 
 Changes
 • Returns structured list via PydanticOutputParser
+• `local_placeholder_check` – deterministic fast path; the LLM checker
+  only runs when it returns None (can't decide)
 """
 
 import logging
-from typing import List
+import re
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from langchain.output_parsers import PydanticOutputParser
 
-from agent.llm import llm_chain
-from agent.memory import SQLBufferMemory
-# PLACEHOLDER_CHECKER_PROMPT inlined from agent/prompts.py
-PLACEHOLDER_CHECKER_PROMPT = PromptTemplate.from_template("""
-You're checking the draft below for any missing fields or placeholder values like [PLACEHOLDER], [Your Name], etc.
+from agent.utils import detect_placeholders
 
-Draft:
-{draft}
-
-List all placeholders found in the draft. Return as a Python list. If none found, return an empty list.
-""")
 
 logger = logging.getLogger("agent.placeholder_checker")
 logger.setLevel(logging.DEBUG)
@@ -38,6 +31,51 @@ class PlaceholderCheckOut(BaseModel):
 
 parser = PydanticOutputParser(pydantic_object=PlaceholderCheckOut)
 
+# ────────────────────────────
+# Local (no-LLM) check
+# ────────────────────────────
+_WS_RE = re.compile(r"\s+")
+
+def _norm(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip().casefold()
+
+
+def local_placeholder_check(
+    draft: str, needed_fields: Dict[str, str]
+) -> Optional[PlaceholderCheckOut]:
+    """
+    Decide the placeholder check without a model call when possible.
+
+    • unambiguous placeholders ([DATE], {{x}}, <PARTY>) → is_success False
+    • ambiguous ones (“______”, “[a]”, “Your Honour”)   → None, defer to the LLM
+    • none found, every field value present             → is_success True
+    • otherwise (values possibly reworded)              → None, defer to the LLM
+    """
+    placeholders = detect_placeholders(draft, certain=True)
+    if placeholders:
+        listed = ", ".join(placeholders[:10])
+        return PlaceholderCheckOut(
+            is_success=False,
+            missing_desc=f"unresolved placeholders: {listed}",
+            ask_user=f"Could you give me the real values for {listed}?",
+        )
+
+    maybe = detect_placeholders(draft)
+    if maybe:
+        logger.debug("🔎 Local check undecided – possible placeholders: %s", maybe[:10])
+        return None
+
+    haystack = _norm(draft)
+    absent = [
+        key for key, value in needed_fields.items()
+        if value and value.strip() and _norm(value) not in haystack
+    ]
+    if absent:
+        logger.debug("🔎 Local check undecided – values not verbatim: %s", absent)
+        return None
+
+    return PlaceholderCheckOut(is_success=True, missing_desc="", ask_user="")
+
 # ────────────────────────────
 # Prompt
 # ────────────────────────────
@@ -63,20 +101,3 @@ Draft:
 {draft}
 """
 )
-
-# ────────────────────────────
-# Chain
-# ────────────────────────────
-def get_placeholder_checker_chain(memory: "SQLBufferMemory | None" = None) -> LLMChain:
-    # If memory is provided and 'user_input' is not among input_variables, set input_key=None to avoid KeyError
-    use_input_key = memory is None or "user_input" in prompt.input_variables
-    llmchain_kwargs = dict(
-        llm=llm_chain,
-        prompt=prompt.partial(placeholder_checker_prompt=PLACEHOLDER_CHECKER_PROMPT),
-        memory=memory,
-        output_key="text",      # raw text; we'll parse separately
-        verbose=True,
-    )
-    if use_input_key:
-        llmchain_kwargs["input_key"] = "user_input"
-    return LLMChain(**llmchain_kwargs)
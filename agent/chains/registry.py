@@ -0,0 +1,162 @@
+"""
+agent/chains/registry.py
+━━━━━━━━━━━━━━━━━━━━━━━━
+Prebuilt chain registry.
+
+The only place a stage's runnable is built: every stage is compiled ONCE
+(prompt already partialled, `prompt | llm` runnable built) instead of a
+fresh `LLMChain` per call, and the runner just passes per-request
+inputs, `history` included.  The chain modules only define prompts and
+parsers:
+
+    stage = chain_registry.get("drafter")
+    raw   = invoke_with_retry(stage, {...})
+
+Stages: conversational · drafter · reviser · checker · history_summary ·
+outline · section (DRAFT_MODE=sections)
+
+`warm_up()` compiles the registry at app startup and logs a
+microbenchmark of legacy per-turn construction vs registry lookup.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langchain_core.prompts import BasePromptTemplate
+from langchain_core.runnables import Runnable
+
+logger = logging.getLogger("agent.chains.registry")
+logger.setLevel(logging.DEBUG)
+
+
+class CompiledStage:
+    """A stage's partialled prompt + `prompt | llm` runnable, built once."""
+
+    __slots__ = ("name", "prompt", "llm", "runnable")
+
+    def __init__(self, name: str, prompt: BasePromptTemplate, llm: Runnable):
+        self.name     = name
+        self.prompt   = prompt
+        self.llm      = llm
+        self.runnable = prompt | llm
+
+    def invoke(self, inputs: Dict[str, Any], config: Optional[Dict[str, Any]] = None):
+        return self.runnable.invoke(inputs, config=config)
+
+    async def ainvoke(self, inputs: Dict[str, Any], config: Optional[Dict[str, Any]] = None):
+        return await self.runnable.ainvoke(inputs, config=config)
+
+    def __repr__(self) -> str:
+        return f"<CompiledStage {self.name}>"
+
+
+class ChainRegistry:
+    def __init__(self):
+        self._lock   = threading.Lock()
+        self._stages: Dict[str, CompiledStage] = {}
+
+    @property
+    def compiled(self) -> bool:
+        return bool(self._stages)
+
+    def compile(self, llm: Optional[Runnable] = None) -> None:
+        """(Re)build every stage; `llm` defaults to `agent.llm.llm_chain`."""
+        # Imported here: agent.llm builds the model client on import.
+        import agent.llm
+        from agent.chains.conversational_legal_chain import _CLS_PROMPT
+        from agent.chains.document_drafter_chain import _DRAFTER_PROMPT, parser as drafter_parser
+        from agent.chains.draft_reviser_chain import _REVISER_PROMPT, parser as reviser_parser
+        from agent.chains.placeholder_checker import prompt as checker_prompt
+        from agent.chains.history_summary_chain import _SUMMARY_PROMPT
+        from agent.chains.section_drafter_chain import (
+            _OUTLINE_PROMPT, _SECTION_PROMPT, outline_parser, section_parser,
+        )
+
+        llm = llm or agent.llm.llm_chain
+        stages = {
+            "conversational":  CompiledStage("conversational", _CLS_PROMPT, llm),
+            "drafter":         CompiledStage(
+                "drafter",
+                _DRAFTER_PROMPT.partial(format_instructions=drafter_parser.get_format_instructions()),
+                llm,
+            ),
+            "reviser":         CompiledStage(
+                "reviser",
+                _REVISER_PROMPT.partial(format_instructions=reviser_parser.get_format_instructions()),
+                llm,
+            ),
+            "checker":         CompiledStage("checker", checker_prompt, llm),
+            "history_summary": CompiledStage("history_summary", _SUMMARY_PROMPT, llm),
+            "outline":         CompiledStage(
+                "outline",
+                _OUTLINE_PROMPT.partial(format_instructions=outline_parser.get_format_instructions()),
+                llm,
+            ),
+            "section":         CompiledStage(
+                "section",
+                _SECTION_PROMPT.partial(format_instructions=section_parser.get_format_instructions()),
+                llm,
+            ),
+        }
+        with self._lock:
+            self._stages = stages
+        logger.debug("🧱 Compiled chain registry: %s", ", ".join(stages))
+
+    def get(self, name: str) -> CompiledStage:
+        if not self._stages:
+            self.compile()
+        return self._stages[name]
+
+
+chain_registry = ChainRegistry()
+
+
+# ─────────────────────────────────────────────────────────────
+#  Startup microbenchmark
+# ─────────────────────────────────────────────────────────────
+def benchmark_construction(rounds: int = 50) -> Dict[str, float]:
+    """
+    Per-turn chain setup cost, in ms: the legacy factories (conversational
+    ×2 + drafter + checker, as a drafting turn used to build them) vs. the
+    equivalent registry lookups.
+    """
+    import agent.llm
+    from langchain.chains import LLMChain
+    from agent.chains.conversational_legal_chain import _CLS_PROMPT
+    from agent.chains.document_drafter_chain import _DRAFTER_PROMPT, parser as drafter_parser
+    from agent.chains.placeholder_checker import prompt as checker_prompt
+
+    def legacy_chain(prompt):
+        # What the old get_*_chain factories did on each call
+        return LLMChain(llm=agent.llm.llm_chain, prompt=prompt, output_key="text", verbose=True)
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        legacy_chain(_CLS_PROMPT)
+        legacy_chain(_DRAFTER_PROMPT.partial(format_instructions=drafter_parser.get_format_instructions()))
+        legacy_chain(checker_prompt)
+        legacy_chain(_CLS_PROMPT)
+    legacy = (time.perf_counter() - t0) * 1000 / rounds
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for name in ("conversational", "drafter", "checker", "conversational"):
+            chain_registry.get(name)
+    registry = (time.perf_counter() - t0) * 1000 / rounds
+
+    return {"legacy_ms_per_turn": legacy, "registry_ms_per_turn": registry}
+
+
+def warm_up(run_benchmark: bool = True) -> None:
+    """Compile all stages now (app startup) instead of on the first turn."""
+    chain_registry.compile()
+    if run_benchmark:
+        result = benchmark_construction()
+        logger.info(
+            "⏱️ Chain setup per turn: legacy %.3f ms → registry %.4f ms",
+            result["legacy_ms_per_turn"], result["registry_ms_per_turn"],
+        )
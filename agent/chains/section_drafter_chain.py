@@ -0,0 +1,137 @@
+"""
+agent/chains/section_drafter_chain.py
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Section-by-section drafting (DRAFT_MODE=sections, see `agent.draft_sections`).
+
+OUTLINE stage – INPUT keys:
+• document_type          – str
+• filled_fields_json     – str  (JSON object of {field: value})
+• instruction            – str
+• history                – str
+
+OUTPUT (strict JSON):
+{
+  "title": "RESIDENTIAL LEASE AGREEMENT",
+  "sections": [ {"heading": "Parties", "brief": "landlord, tenant and premises"} ]
+}
+
+SECTION stage – INPUT keys:
+• document_type, filled_fields_json, instruction
+• title                  – str  (document title from the outline)
+• outline                – str  (numbered outline of every section)
+• section                – str  (the one section to draft, e.g. "3. Rent – amount and due date")
+
+OUTPUT (strict JSON):
+{
+  "section": "<the section body>"
+}
+"""
+
+import logging
+
+from langchain.prompts import PromptTemplate
+
+from agent.utils import parse_model_json
+
+logger = logging.getLogger("agent.section_drafter")
+logger.setLevel(logging.DEBUG)
+
+
+# ────────────────────────────
+# JSON parsers
+# ────────────────────────────
+class SimpleOutlineOutputParser:
+    def get_format_instructions(self) -> str:
+        return 'Return ONLY a JSON object with keys "title" and "sections".'
+
+    def parse(self, text: str) -> dict:
+        parsed = parse_model_json(text, required_key="sections")
+        if parsed and isinstance(parsed.get("sections"), list):
+            return parsed
+        raise ValueError(f"No valid outline JSON found in output:\n{text}")
+
+
+class SimpleSectionOutputParser:
+    def get_format_instructions(self) -> str:
+        return 'Return ONLY a JSON object with the key "section".'
+
+    def parse(self, text: str) -> dict:
+        parsed = parse_model_json(text, required_key="section")
+        if parsed and isinstance(parsed.get("section"), str) and parsed["section"].strip():
+            return parsed
+        raise ValueError(f"No valid section JSON found in output:\n{text}")
+
+
+outline_parser = SimpleOutlineOutputParser()
+section_parser = SimpleSectionOutputParser()
+
+# ────────────────────────────
+# Prompts
+# ────────────────────────────
+_OUTLINE_PROMPT = PromptTemplate(
+    input_variables=["document_type", "filled_fields_json", "instruction", "history"],
+    template=r"""
+You are a senior legal drafter. Plan the section outline of a document before it is written.
+
+────────────────────────────────────────────
+Conversation history (for reference):
+{history}
+────────────────────────────────────────────
+📝 Document type: {document_type}
+📑 Field values (JSON): {filled_fields_json}
+🛈 Instruction: {instruction}
+────────────────────────────────────────────
+
+TASK:
+• List the sections this document needs, in order, as a professional would structure it.
+• Each section gets a short "heading" (no numbering) and a one-line "brief" naming what it covers
+  and which field values belong in it.
+• Every field value must be covered by at least one section.
+• Between 3 and 20 sections. Do NOT write the sections themselves.
+• Return only compact JSON exactly:
+
+{{
+  "title": "<document title>",
+  "sections": [{{"heading": "<heading>", "brief": "<what it covers>"}}]
+}}
+
+No markdown, no commentary.
+
+{format_instructions}
+"""
+)
+
+_SECTION_PROMPT = PromptTemplate(
+    input_variables=["document_type", "filled_fields_json", "instruction",
+                     "title", "outline", "section"],
+    template=r"""
+You are drafting one section of a larger legal document; other drafters write the other sections at the same time.
+
+────────────────────────────────────────────
+📝 Document type: {document_type}
+📑 Field values (JSON): {filled_fields_json}
+🛈 Instruction: {instruction}
+📄 Document: {title}
+🗂 Full outline:
+{outline}
+────────────────────────────────────────────
+✍️ Section to draft: {section}
+────────────────────────────────────────────
+
+TASK:
+• Write ONLY the body of this section, in plain professional text. Do not repeat its heading or the document title.
+• Do not restate what other sections of the outline cover; refer to them by number where needed.
+• Use the parties' names and defined terms exactly as given in the field values, so all sections agree.
+• STRICT: Only use the provided field values. Do NOT invent or guess any values.
+• Placeholders or tokens like [DATE], [NAME], etc. are STRICTLY FORBIDDEN.
+• Return only compact JSON exactly:
+
+{{
+  "section": "<the section body>"
+}}
+
+No markdown, no commentary.
+
+{format_instructions}
+"""
+)
@@ -0,0 +1,215 @@
+"""
+agent/doc_templates.py
+─────────────────────────────────────────────────────────────────────────────
+Clause templates for the common document types – a first draft rendered
+locally from `AgentState.needed_fields`, no model call.
+
+One JSON file per document type in `agent/templates/` (DRAFT_TEMPLATES_DIR):
+
+    {
+      "doc_type": "NDA", "version": 1,
+      "aliases":  ["non-disclosure agreement", …],
+      "title":    "MUTUAL NON-DISCLOSURE AGREEMENT",
+      "fields":   {"party_a": {"aliases": ["disclosing party", …], "required": true}, …},
+      "clauses":  [
+        {"id": "term", "heading": "Term",
+         "variants": [{"requires": ["term"], "text": "… {term} …"},
+                      {"text": "… until terminated …"}]},
+        …
+      ]
+    }
+
+• field keys are matched to slots by alias ("Party A Name" → party_a);
+  keys that match no slot come back as `custom_fields`
+• a clause renders its first variant whose `requires` are all present
+  (no matching variant → the clause is left out)
+• a missing required field raises `TemplateMiss` – the caller falls back
+  to the drafter chain, which can still pull values from the history
+• `version` is bumped whenever a template's wording changes; renders are
+  logged and counted as "<doc_type>@<version>"
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import string
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("agent.doc_templates")
+logger.setLevel(logging.DEBUG)
+
+TEMPLATES_DIR = Path(os.getenv("DRAFT_TEMPLATES_DIR", Path(__file__).parent / "templates"))
+
+_WORD_RE   = re.compile(r"[^a-z0-9]+")
+_SUFFIX_RE = re.compile(r"\s+(?:full\s+|legal\s+)?name$")
+
+
+def _norm(text: str) -> str:
+    return _WORD_RE.sub(" ", str(text).lower()).strip()
+
+
+def _key(text: str) -> str:
+    """Field-key form used for alias matching ("Party A's Name:" → "party a")."""
+    return _SUFFIX_RE.sub("", _norm(text).replace(" s ", " "))
+
+
+class TemplateMiss(LookupError):
+    """Required fields for the template are not in `needed_fields`."""
+
+    def __init__(self, template: str, missing: List[str]):
+        super().__init__(f"{template}: missing {', '.join(missing)}")
+        self.missing = missing
+
+
+@dataclass
+class Rendered:
+    draft: str
+    template: str                                   # "<doc_type>@<version>"
+    custom_fields: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class DocTemplate:
+    doc_type: str
+    version: int
+    title: str
+    aliases: List[str]
+    fields: Dict[str, Dict[str, Any]]
+    clauses: List[Dict[str, Any]]
+
+    @property
+    def id(self) -> str:
+        return f"{self.doc_type}@{self.version}"
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "DocTemplate":
+        tpl = cls(
+            doc_type=raw["doc_type"],
+            version=int(raw["version"]),
+            title=raw.get("title", raw["doc_type"]).strip(),
+            aliases=list(raw.get("aliases", [])),
+            fields=dict(raw["fields"]),
+            clauses=list(raw["clauses"]),
+        )
+        tpl._validate()
+        return tpl
+
+    def _validate(self) -> None:
+        formatter = string.Formatter()
+        for clause in self.clauses:
+            for variant in clause["variants"]:
+                used = {name for _, name, _, _ in formatter.parse(variant["text"]) if name}
+                unknown = (used | set(variant.get("requires", []))) - set(self.fields)
+                if unknown:
+                    raise ValueError(f"{self.id} clause {clause['id']}: unknown field(s) {sorted(unknown)}")
+                optional = used - set(variant.get("requires", [])) - self.required
+                if optional:
+                    raise ValueError(f"{self.id} clause {clause['id']}: {sorted(optional)} used but not required")
+
+    @property
+    def required(self) -> set:
+        return {name for name, spec in self.fields.items() if spec.get("required")}
+
+    # ––– Rendering –––––––––––––––––––––––––––––––––––––––––
+    def match_fields(self, needed_fields: Dict[str, str]) -> tuple[Dict[str, str], Dict[str, str]]:
+        """`(slot values, unmatched fields)` for the state's field values."""
+        lookup = {}
+        for name, spec in self.fields.items():
+            for alias in [name.replace("_", " "), *spec.get("aliases", [])]:
+                lookup.setdefault(_key(alias), name)
+
+        values: Dict[str, str] = {}
+        custom: Dict[str, str] = {}
+        for key, value in needed_fields.items():
+            if not value or not str(value).strip():
+                continue
+            slot = lookup.get(_key(key))
+            if slot is None or slot in values:
+                custom[key] = value
+            else:
+                values[slot] = str(value).strip()
+        return values, custom
+
+    def render(self, needed_fields: Dict[str, str]) -> Rendered:
+        values, custom = self.match_fields(needed_fields)
+        missing = sorted(self.required - set(values))
+        if missing:
+            raise TemplateMiss(self.id, missing)
+
+        blocks = [self.title]
+        number = 0
+        for clause in self.clauses:
+            variant = next(
+                (v for v in clause["variants"] if all(r in values for r in v.get("requires", []))),
+                None,
+            )
+            if variant is None:
+                continue
+            text = variant["text"].format_map(values).strip()
+            if clause.get("heading"):
+                number += 1
+                blocks.append(f"{number}. {clause['heading']}")
+            blocks.append(text)
+        return Rendered(draft="\n\n".join(blocks), template=self.id, custom_fields=custom)
+
+
+class TemplateRegistry:
+    """Lazily loads every template in TEMPLATES_DIR, keyed by type / alias."""
+
+    def __init__(self, directory: Path = TEMPLATES_DIR):
+        self.directory = Path(directory)
+        self._lock  = threading.Lock()
+        self._by_name: Optional[Dict[str, DocTemplate]] = None
+        self._stats = {"renders": 0, "misses": 0}
+
+    def _load(self) -> Dict[str, DocTemplate]:
+        by_name: Dict[str, DocTemplate] = {}
+        for path in sorted(self.directory.glob("*.json")):
+            tpl = DocTemplate.from_dict(json.loads(path.read_text(encoding="utf-8")))
+            for name in [tpl.doc_type, *tpl.aliases]:
+                by_name.setdefault(_norm(name), tpl)
+        logger.debug("📐 Loaded %d template(s) from %s",
+                     len({t.id for t in by_name.values()}), self.directory)
+        return by_name
+
+    def templates(self) -> Dict[str, DocTemplate]:
+        with self._lock:
+            if self._by_name is None:
+                self._by_name = self._load()
+            return self._by_name
+
+    def find(self, document_type: str) -> Optional[DocTemplate]:
+        return self.templates().get(_norm(document_type or ""))
+
+    def render(self, document_type: str, needed_fields: Dict[str, str]) -> Optional[Rendered]:
+        """Rendered draft, None when there is no template; TemplateMiss passes through."""
+        tpl = self.find(document_type)
+        if tpl is None:
+            return None
+        try:
+            rendered = tpl.render(needed_fields)
+        except TemplateMiss:
+            with self._lock:
+                self._stats["misses"] += 1
+            raise
+        with self._lock:
+            self._stats["renders"] += 1
+        logger.info("📐 Rendered %s (%d custom field(s))", rendered.template, len(rendered.custom_fields))
+        return rendered
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded = self._by_name or {}
+            return {
+                **self._stats,
+                "templates": len({t.id for t in loaded.values()}),
+            }
+
+
+template_registry = TemplateRegistry()
@@ -0,0 +1,171 @@
+"""
+agent/draft_patch.py
+─────────────────────────────────────────────────────────────────────────────
+Structured draft edits, applied locally.
+
+A revision no longer has to regenerate the whole document: the reviser
+stage sees the draft split into anchored blocks (paragraphs / clauses)
+
+    [[B1]] NON-DISCLOSURE AGREEMENT
+    [[B2]] 1. Definitions …
+
+and returns a small list of edits:
+
+    {"op": "replace",       "anchor": "B4", "text": "…"}             whole block
+    {"op": "replace",       "anchor": "B4", "find": "30", "text": "60"}  inside it
+    {"op": "insert_after",  "anchor": "B4", "text": "…"}
+    {"op": "insert_before", "anchor": "B4", "text": "…"}
+    {"op": "delete",        "anchor": "B4"}
+
+Anchors may also be a block's heading text ("7. Termination").
+`apply_patch` validates everything up front and raises `PatchError` when
+the patch can't be applied cleanly – the caller then falls back to a full
+regeneration.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+OPS = ("replace", "insert_after", "insert_before", "delete")
+
+_SPLIT_RE      = re.compile(r"(\n[ \t]*\n+)")      # blank line(s) between blocks
+_BLOCK_ID_RE   = re.compile(r"^\s*\[*\s*B(\d+)\s*\]*\s*$", re.IGNORECASE)
+_LABEL_LEAK_RE = re.compile(r"\[\[B\d+\]\]")
+_WS_RE         = re.compile(r"\s+")
+
+
+class PatchError(ValueError):
+    """The edit list can't be applied to this draft."""
+
+
+@dataclass
+class DraftEdit:
+    op: str
+    anchor: str
+    text: str = ""
+    find: Optional[str] = None
+
+
+# ─────────────────────────────────────────────────────────────
+# Segmentation
+# ─────────────────────────────────────────────────────────────
+def split_blocks(draft: str) -> tuple[List[str], List[str]]:
+    """Blocks and the separators between them (len(seps) == len(blocks) - 1)."""
+    parts = _SPLIT_RE.split(draft.strip())
+    return parts[0::2], parts[1::2]
+
+
+def render_anchored(draft: str) -> str:
+    """The draft as the reviser sees it: every block prefixed `[[Bn]]`."""
+    blocks, _ = split_blocks(draft)
+    return "\n\n".join(f"[[B{i}]] {block}" for i, block in enumerate(blocks, 1))
+
+
+def _norm(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip().casefold()
+
+
+def _resolve(anchor: str, blocks: List[str]) -> int:
+    """Block index for a `Bn` id or a unique heading prefix."""
+    m = _BLOCK_ID_RE.match(anchor)
+    if m:
+        idx = int(m.group(1)) - 1
+        if 0 <= idx < len(blocks):
+            return idx
+        raise PatchError(f"anchor {anchor!r} is out of range (1–{len(blocks)})")
+
+    wanted = _norm(anchor)
+    if not wanted:
+        raise PatchError("empty anchor")
+    hits = [
+        i for i, block in enumerate(blocks)
+        if _norm(block.split("\n", 1)[0]).startswith(wanted)
+    ]
+    if len(hits) != 1:
+        raise PatchError(f"anchor {anchor!r} matches {len(hits)} blocks")
+    return hits[0]
+
+
+# ─────────────────────────────────────────────────────────────
+# Parsing / application
+# ─────────────────────────────────────────────────────────────
+def coerce_edits(raw: Iterable[Any]) -> List[DraftEdit]:
+    """Validate the model's edit dicts into `DraftEdit`s."""
+    edits: List[DraftEdit] = []
+    for item in raw:
+        if not isinstance(item, dict):
+            raise PatchError(f"edit is not an object: {item!r}")
+        op = str(item.get("op", "")).strip().lower()
+        if op not in OPS:
+            raise PatchError(f"unknown op {op!r}")
+        anchor = str(item.get("anchor", "")).strip()
+        text   = item.get("text") or ""
+        find   = item.get("find") or None
+        if not isinstance(text, str) or (find is not None and not isinstance(find, str)):
+            raise PatchError("edit text must be a string")
+        if op != "delete" and not text.strip() and find is None:
+            raise PatchError(f"{op} on {anchor!r} has no text")
+        if find is not None and op != "replace":
+            raise PatchError("`find` is only valid with op=replace")
+        edits.append(DraftEdit(op, anchor, text.strip("\n"), find))
+    if not edits:
+        raise PatchError("empty edit list")
+    return edits
+
+
+def apply_patch(draft: str, edits: List[DraftEdit]) -> str:
+    """
+    Apply `edits` (anchors refer to the ORIGINAL block numbering) and
+    return the revised draft.  All-or-nothing: raises `PatchError`.
+    """
+    blocks, seps = split_blocks(draft)
+    before: Dict[int, List[str]] = {}
+    after:  Dict[int, List[str]] = {}
+    body:   Dict[int, Optional[str]] = {}     # None → deleted
+    whole:  set[int] = set()                  # replaced / deleted outright
+
+    for edit in edits:
+        idx = _resolve(edit.anchor, blocks)
+        if edit.op == "insert_before":
+            before.setdefault(idx, []).append(edit.text)
+        elif edit.op == "insert_after":
+            after.setdefault(idx, []).append(edit.text)
+        elif edit.find is not None:
+            if idx in whole:
+                raise PatchError(f"conflicting edits on {edit.anchor!r}")
+            current = body.get(idx, blocks[idx])
+            count = current.count(edit.find)
+            if count != 1:
+                raise PatchError(
+                    f"`find` text occurs {count}× in {edit.anchor!r}: {edit.find!r}"
+                )
+            body[idx] = current.replace(edit.find, edit.text)
+        else:
+            if idx in body:
+                raise PatchError(f"conflicting edits on {edit.anchor!r}")
+            body[idx] = None if edit.op == "delete" else edit.text
+            whole.add(idx)
+
+    # Reassemble; the first piece of each slot keeps the original separator
+    revised = ""
+    for i, block in enumerate(blocks):
+        sep    = seps[i - 1] if i else ""
+        kept   = body.get(i, block)
+        pieces = before.get(i, []) + ([kept] if kept is not None else []) + after.get(i, [])
+        for piece in pieces:
+            if revised:
+                revised += sep or "\n\n"
+            revised += piece
+            sep = ""
+    revised = revised.strip()
+
+    if not revised:
+        raise PatchError("patch deletes the whole draft")
+    if _LABEL_LEAK_RE.search(revised):
+        raise PatchError("block labels leaked into the draft")
+    if revised == draft.strip():
+        raise PatchError("patch changes nothing")
+    return revised
@@ -0,0 +1,123 @@
+"""
+agent/draft_sections.py
+─────────────────────────────────────────────────────────────────────────────
+Section-by-section drafting for long documents.
+
+The outline stage plans the document once
+
+    {"title": "RESIDENTIAL LEASE AGREEMENT",
+     "sections": [{"heading": "Parties", "brief": "landlord, tenant, premises"}, …]}
+
+the runner drafts every section concurrently from that outline, and
+`assemble` stitches the results back together in outline order:
+
+• numbering is the outline's ("1. Parties", "2. Term" …) – a heading or
+  document title the section drafter repeated at the top is dropped
+• a paragraph that already appeared in an earlier section is dropped
+  (sections drafted in parallel tend to restate definitions)
+• an empty section raises `SectionError` – the caller falls back to the
+  single-call drafter
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from agent.draft_patch import split_blocks
+
+MIN_SECTIONS = 2
+MAX_SECTIONS = 24
+MIN_DUPLICATE_CHARS = 40     # shorter repeats ("By: ____") are legitimate
+
+_NUMBER_RE = re.compile(
+    r"^(?:(?:section|article|clause)\s+[\divxlcdm.]+|\d+(?:\.\d+)*\.?|[ivxlcdm]+[.)])[\s:.\-–—]*",
+    re.IGNORECASE,
+)
+_WS_RE = re.compile(r"\s+")
+
+
+class SectionError(ValueError):
+    """The outline or the drafted sections can't be assembled."""
+
+
+@dataclass
+class Section:
+    heading: str
+    brief: str = ""
+
+
+# ─────────────────────────────────────────────────────────────
+# Outline
+# ─────────────────────────────────────────────────────────────
+def parse_outline(parsed: Dict[str, Any]) -> tuple[str, List[Section]]:
+    """`(title, sections)` from the outline stage's JSON; SectionError if unusable."""
+    raw = parsed.get("sections")
+    if not isinstance(raw, list):
+        raise SectionError("outline has no section list")
+
+    sections: List[Section] = []
+    seen = set()
+    for item in raw:
+        if isinstance(item, str):
+            heading, brief = item, ""
+        elif isinstance(item, dict):
+            heading, brief = str(item.get("heading") or ""), str(item.get("brief") or "")
+        else:
+            continue
+        heading = _NUMBER_RE.sub("", heading.strip()).strip()
+        if heading and _norm(heading) not in seen:
+            seen.add(_norm(heading))
+            sections.append(Section(heading=heading, brief=brief.strip()))
+
+    if not MIN_SECTIONS <= len(sections) <= MAX_SECTIONS:
+        raise SectionError(f"outline has {len(sections)} section(s)")
+    return str(parsed.get("title") or "").strip(), sections
+
+
+def render_outline(sections: Sequence[Section]) -> str:
+    """Numbered outline, as every section drafter sees it."""
+    return "\n".join(
+        f"{n}. {s.heading}" + (f" – {s.brief}" if s.brief else "")
+        for n, s in enumerate(sections, 1)
+    )
+
+
+# ─────────────────────────────────────────────────────────────
+# Assembly
+# ─────────────────────────────────────────────────────────────
+def _norm(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip().lower()
+
+
+def _bare(text: str) -> str:
+    """Heading text without its numbering / "Section 3" prefix."""
+    return _norm(_NUMBER_RE.sub("", text.strip()).rstrip(":."))
+
+
+def assemble(title: str, sections: Sequence[Section], texts: Sequence[Optional[str]]) -> str:
+    """The full draft from per-section texts, in outline order."""
+    if len(texts) != len(sections):
+        raise SectionError(f"{len(texts)} text(s) for {len(sections)} section(s)")
+
+    out: List[str] = [title] if title else []
+    earlier: set = set()
+    for n, (section, text) in enumerate(zip(sections, texts), 1):
+        blocks = [b.strip() for b in split_blocks(text or "")[0] if b.strip()]
+        repeats = {_bare(section.heading), _bare(title)} - {""}
+        while blocks:
+            first, _, rest = blocks[0].partition("\n")
+            if _bare(first) not in repeats:
+                break
+            blocks[0] = rest.strip()
+            if not blocks[0]:
+                blocks.pop(0)
+
+        body = [b for b in blocks if len(b) < MIN_DUPLICATE_CHARS or _norm(b) not in earlier]
+        if not body:
+            raise SectionError(f"section {n} ({section.heading}) is empty")
+        earlier.update(_norm(b) for b in body)
+        out.append(f"{n}. {section.heading}")
+        out.extend(body)
+    return "\n\n".join(out)
@@ -0,0 +1,212 @@
+"""
+agent/field_schema.py
+─────────────────────────────────────────────────────────────────────────────
+Required / optional fields per document type, with value validators –
+readiness to draft is decided here, locally, not by the model.
+
+The schema of a type is the `fields` block of its template
+(`agent/templates/*.json`, see `agent.doc_templates`), so aliases and
+required flags live in one place:
+
+    "effective_date": {"required": true, "type": "date", "aliases": ["date", …]}
+
+Types: text · name · date · money · duration · address
+
+• `schema_registry.check(doc_type, needed_fields)` → `Readiness`
+  (missing required fields, invalid values, optional fields not given)
+• `Readiness.ask()` – one reply that asks for everything still needed
+• `Readiness.summary()` – the gaps, for `AgentState.summary()`
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from agent.doc_templates import DocTemplate, TemplateRegistry, template_registry
+from agent.utils import detect_placeholders
+
+_MONTHS = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+           r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)")
+_DATE_RES = (
+    re.compile(r"\b\d{4}-\d{1,2}-\d{1,2}\b"),                                   # 2026-07-01
+    re.compile(r"\b\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}\b"),                         # 01/07/2026
+    re.compile(rf"\b{_MONTHS}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}\b", re.I),   # July 1, 2026
+    re.compile(rf"\b\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTHS}\.?,?\s+\d{{4}}\b", re.I),  # 1 July 2026
+    re.compile(r"\b(?:today|(?:up)?on\s+signing|date\s+of\s+(?:signing|execution)|immediately)\b", re.I),
+)
+_NUMBER_WORDS = r"(?:\d+(?:\.\d+)?|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|eighteen|twenty|thirty|sixty|ninety)"
+_DURATION_RE = re.compile(
+    rf"\b{_NUMBER_WORDS}[\s-]*(?:\(\d+\)\s*)?(?:business\s+)?(?:day|week|month|year)s?\b"
+    r"|\b(?:perpetual(?:ly)?|indefinite(?:ly)?|month[\s-]to[\s-]month)\b",
+    re.I,
+)
+_NON_ANSWERS = {"n a", "na", "none", "unknown", "tbd", "tba", "not sure", "idk", "later", "todo"}
+_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+# ─────────────────────────────────────────────────────────────
+# Value validators – None when valid, else the reason
+# ─────────────────────────────────────────────────────────────
+def _text(value: str) -> Optional[str]:
+    if not re.search(r"\w", value) or _WORD_RE.sub(" ", value.lower()).strip() in _NON_ANSWERS:
+        return "is not an actual value"
+    if detect_placeholders(value):
+        return "is still a placeholder"
+    return None
+
+
+def _name(value: str) -> Optional[str]:
+    return _text(value) or (None if re.search(r"[^\W\d_]", value) else "doesn't look like a name")
+
+
+def _date(value: str) -> Optional[str]:
+    return _text(value) or (None if any(r.search(value) for r in _DATE_RES) else "doesn't look like a date")
+
+
+def _money(value: str) -> Optional[str]:
+    return _text(value) or (None if re.search(r"\d", value) else "doesn't include an amount")
+
+
+def _duration(value: str) -> Optional[str]:
+    return _text(value) or (None if _DURATION_RE.search(value) else "doesn't look like a period of time")
+
+
+def _address(value: str) -> Optional[str]:
+    ok = re.search(r"\d", value) or "," in value or len(value.split()) >= 3
+    return _text(value) or (None if ok else "doesn't look like a full address")
+
+
+VALIDATORS: Dict[str, Callable[[str], Optional[str]]] = {
+    "text":     _text,
+    "name":     _name,
+    "date":     _date,
+    "money":    _money,
+    "duration": _duration,
+    "address":  _address,
+}
+
+EXAMPLES: Dict[str, str] = {
+    "date":     "July 1, 2026",
+    "money":    "$1,500",
+    "duration": "2 years",
+}
+
+
+# ─────────────────────────────────────────────────────────────
+# Schema
+# ─────────────────────────────────────────────────────────────
+@dataclass
+class FieldSpec:
+    name: str
+    label: str
+    type: str
+    required: bool
+
+    @property
+    def hint(self) -> str:
+        example = EXAMPLES.get(self.type)
+        return f"{self.label} (e.g. {example})" if example else self.label
+
+    def validate(self, value: str) -> Optional[str]:
+        return VALIDATORS[self.type](value)
+
+
+@dataclass
+class Readiness:
+    doc_type: str
+    missing: List[FieldSpec] = field(default_factory=list)
+    invalid: List[Tuple[FieldSpec, str, str]] = field(default_factory=list)   # spec, value, reason
+    optional: List[FieldSpec] = field(default_factory=list)                   # not given yet
+
+    @property
+    def ready(self) -> bool:
+        return not self.missing and not self.invalid
+
+    def ask(self) -> str:
+        """One message asking for every missing / invalid required field."""
+        lines = [f"Before I draft your {self.doc_type}, I need a few more details:"]
+        lines += [f"• {spec.hint}" for spec in self.missing]
+        lines += [f"• {spec.hint} – “{value}” {reason}" for spec, value, reason in self.invalid]
+        if self.optional:
+            lines.append(
+                "Optionally, also tell me: "
+                + ", ".join(spec.label for spec in self.optional)
+                + " (otherwise standard wording is used)."
+            )
+        return "\n".join(lines)
+
+    def summary(self) -> str:
+        parts = []
+        if self.missing or self.invalid:
+            parts.append("missing=" + str([s.label for s in self.missing] + [s.label for s, _, _ in self.invalid]))
+        if self.optional:
+            parts.append("optional=" + str([s.label for s in self.optional]))
+        return ", ".join(parts)
+
+
+@dataclass
+class DocSchema:
+    doc_type: str
+    template: DocTemplate
+    fields: Dict[str, FieldSpec]
+
+    @classmethod
+    def from_template(cls, tpl: DocTemplate) -> "DocSchema":
+        specs = {}
+        for name, raw in tpl.fields.items():
+            kind = raw.get("type", "text")
+            if kind not in VALIDATORS:
+                raise ValueError(f"{tpl.id} field {name}: unknown type {kind!r}")
+            specs[name] = FieldSpec(
+                name=name,
+                label=raw.get("label") or name.replace("_", " ").title(),
+                type=kind,
+                required=bool(raw.get("required")),
+            )
+        return cls(doc_type=tpl.doc_type, template=tpl, fields=specs)
+
+    def check(self, needed_fields: Dict[str, str]) -> Readiness:
+        values, _custom = self.template.match_fields(needed_fields)
+        result = Readiness(doc_type=self.doc_type)
+        for name, spec in self.fields.items():
+            value = values.get(name)
+            if value is None:
+                (result.missing if spec.required else result.optional).append(spec)
+                continue
+            reason = spec.validate(value)
+            if reason and spec.required:
+                result.invalid.append((spec, value, reason))
+        return result
+
+
+class SchemaRegistry:
+    """Field schemas for every templated document type."""
+
+    def __init__(self, templates: TemplateRegistry = template_registry):
+        self.templates = templates
+        self._schemas: Dict[str, DocSchema] = {}
+
+    def schemas(self) -> Dict[str, DocSchema]:
+        """Build (and so validate) every schema – called at startup."""
+        for tpl in self.templates.templates().values():
+            self.find(tpl.doc_type)
+        return dict(self._schemas)
+
+    def find(self, document_type: str) -> Optional[DocSchema]:
+        tpl = self.templates.find(document_type)
+        if tpl is None:
+            return None
+        schema = self._schemas.get(tpl.id)
+        if schema is None:
+            schema = self._schemas[tpl.id] = DocSchema.from_template(tpl)
+        return schema
+
+    def check(self, document_type: str, needed_fields: Dict[str, str]) -> Optional[Readiness]:
+        """None when the type has no schema (the model decides, as before)."""
+        schema = self.find(document_type)
+        return schema.check(needed_fields) if schema else None
+
+
+schema_registry = SchemaRegistry()
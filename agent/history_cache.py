@@ -0,0 +1,158 @@
+"""
+agent/history_cache.py
+─────────────────────────────────────────────────────────────────────────────
+In-process LRU cache of per-conversation chat history.
+
+`SQLBufferMemory` used to re-query and rebuild every `Message` row on every
+turn.  The cache keeps the materialised LangChain message list per
+conversation so a warm conversation costs O(1) to load:
+
+• bounded by conversation count *and* total characters held (size-aware)
+• appended to whenever a turn is written, invalidated on delete
+• a cached list may be only the conversation's tail; `offset` records
+  how many older messages were left in the database
+• hit / miss / eviction counters via `stats()`
+
+The cache is per process and only sees its own writes.  With several
+workers (WEB_CONCURRENCY > 1, or HISTORY_CACHE_VALIDATE=on) every hit is
+checked against the database before use – `agent.memory` compares the
+conversation's message count with `offset + len(cached)` (messages are
+append-only) and drops a stale entry via `mark_stale`.
+Set HISTORY_CACHE_MAX_CONVERSATIONS=0 to disable it.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage
+
+logger = logging.getLogger("agent.history_cache")
+logger.setLevel(logging.DEBUG)
+
+# Fixed per-message charge so many tiny messages still count towards the cap
+_MESSAGE_OVERHEAD = 64
+
+
+def _cost(messages: Sequence[BaseMessage]) -> int:
+    return sum(len(str(m.content)) + _MESSAGE_OVERHEAD for m in messages)
+
+
+class HistoryCache:
+    """Thread-safe LRU of `conversation_id → [BaseMessage, …]`."""
+
+    def __init__(self, max_conversations: int = 512, max_chars: int = 8_000_000):
+        self.max_conversations = max_conversations
+        self.max_chars         = max_chars
+
+        self._lock    = threading.Lock()
+        self._entries: "OrderedDict[int, List[BaseMessage]]" = OrderedDict()
+        self._costs:   Dict[int, int] = {}
+        self._offsets: Dict[int, int] = {}
+        self._chars     = 0
+        self.hits       = 0
+        self.misses     = 0
+        self.evictions  = 0
+        self.stale      = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_conversations > 0 and self.max_chars > 0
+
+    # ––– Reads –––––––––––––––––––––––––––––––––––––––––––
+    def get(self, conversation_id: int) -> Optional[List[BaseMessage]]:
+        """Return a *copy* of the cached history, or None on a miss."""
+        found = self.lookup(conversation_id)
+        return found[0] if found is not None else None
+
+    def lookup(self, conversation_id: int) -> Optional[Tuple[List[BaseMessage], int]]:
+        """`(copy of the cached messages, offset)`, or None on a miss."""
+        with self._lock:
+            messages = self._entries.get(conversation_id)
+            if messages is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(conversation_id)
+            self.hits += 1
+            return list(messages), self._offsets.get(conversation_id, 0)
+
+    # ––– Writes ––––––––––––––––––––––––––––––––––––––––––
+    def put(self, conversation_id: int, messages: Sequence[BaseMessage], offset: int = 0) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._drop(conversation_id)
+            self._entries[conversation_id] = list(messages)
+            if offset:
+                self._offsets[conversation_id] = offset
+            self._costs[conversation_id]   = _cost(messages)
+            self._chars += self._costs[conversation_id]
+            self._evict()
+
+    def append(self, conversation_id: int, messages: Sequence[BaseMessage]) -> None:
+        """Extend a cached history; a no-op when the conversation isn't cached."""
+        with self._lock:
+            cached = self._entries.get(conversation_id)
+            if cached is None:
+                return
+            cached.extend(messages)
+            added = _cost(messages)
+            self._costs[conversation_id] += added
+            self._chars += added
+            self._entries.move_to_end(conversation_id)
+            self._evict()
+
+    def invalidate(self, conversation_id: int) -> None:
+        with self._lock:
+            self._drop(conversation_id)
+
+    def mark_stale(self, conversation_id: int) -> None:
+        """Drop an entry another process has written past; counted in `stats()`."""
+        with self._lock:
+            self._drop(conversation_id)
+            self.stale += 1
+        logger.debug("🕰️ Stale history for conv_id=%s – reloading", conversation_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._costs.clear()
+            self._offsets.clear()
+            self._chars = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits":          self.hits,
+                "misses":        self.misses,
+                "evictions":     self.evictions,
+                "stale":         self.stale,
+                "conversations": len(self._entries),
+                "chars":         self._chars,
+            }
+
+    # ––– Internals (lock held) –––––––––––––––––––––––––––
+    def _drop(self, conversation_id: int) -> None:
+        if self._entries.pop(conversation_id, None) is not None:
+            self._chars -= self._costs.pop(conversation_id)
+            self._offsets.pop(conversation_id, None)
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_conversations or self._chars > self.max_chars
+        ):
+            conv_id, _ = self._entries.popitem(last=False)
+            self._chars -= self._costs.pop(conv_id)
+            self._offsets.pop(conv_id, None)
+            self.evictions += 1
+            logger.debug("♻️ Evicted history for conv_id=%s", conv_id)
+
+
+history_cache = HistoryCache(
+    max_conversations=int(os.getenv("HISTORY_CACHE_MAX_CONVERSATIONS", "512")),
+    max_chars=int(os.getenv("HISTORY_CACHE_MAX_CHARS", "8000000")),
+)
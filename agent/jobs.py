@@ -0,0 +1,184 @@
+"""
+agent/jobs.py
+─────────────────────────────────────────────────────────────────────────────
+Background drafting jobs.
+
+In job mode the HTTP request returns as soon as the conversational reply
+is known; the drafter → checker loop runs here instead:
+
+• bounded worker pool   – at most DRAFT_JOB_WORKERS jobs run at once,
+                          the rest wait in `queued`
+• one job per conversation at a time – `submit` checks and registers
+  under one lock and raises `JobConflict` when a job is already active
+• progress events       – queued · drafting · checking · follow_up ·
+                          done | failed, replayable from any offset
+
+Jobs live in process memory; finished ones are kept (DRAFT_JOB_KEEP most
+recent) so clients can still poll the result.  Background mode therefore
+needs a single worker process: with WEB_CONCURRENCY > 1 a poll may land
+on a worker that never saw the job, so `draft_jobs.enabled` is False and
+the API drafts inline instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("agent.jobs")
+logger.setLevel(logging.DEBUG)
+
+TERMINAL = ("done", "failed")
+
+
+class DraftJob:
+    def __init__(self, conversation_id: int):
+        self.id              = uuid.uuid4().hex
+        self.conversation_id = conversation_id
+        self.status          = "queued"
+        self.created_at      = time.time()
+        self.updated_at      = self.created_at
+        self.result: Optional[Dict[str, Any]] = None
+        self.error:  Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL
+
+    async def emit(self, status: str, data: Optional[Dict[str, Any]] = None) -> None:
+        self.status     = status
+        self.updated_at = time.time()
+        self.events.append({"event": status, "data": data or {}, "ts": self.updated_at})
+        # Wake every follower, then re-arm for the next event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self, start: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Yield events from index `start` until the job finishes."""
+        idx = start
+        while True:
+            while idx < len(self.events):
+                yield self.events[idx]
+                idx += 1
+            if self.finished:
+                return
+            await self._changed.wait()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id":          self.id,
+            "conversation_id": self.conversation_id,
+            "status":          self.status,
+            "created_at":      self.created_at,
+            "updated_at":      self.updated_at,
+            "progress":        [e["event"] for e in self.events],
+            "result":          self.result,
+            "error":           self.error,
+        }
+
+
+JobWork = Callable[[DraftJob], Awaitable[Dict[str, Any]]]
+
+
+class JobConflict(RuntimeError):
+    """The conversation already has an active drafting job."""
+
+    def __init__(self, job: DraftJob):
+        super().__init__(f"Drafting job {job.id} is still running.")
+        self.job = job
+
+
+class DraftJobManager:
+    def __init__(self, max_workers: int = 4, keep: int = 500, enabled: bool = True):
+        self.max_workers = max_workers
+        self.keep        = keep
+        self.enabled     = enabled
+        self._lock  = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: "OrderedDict[str, DraftJob]" = OrderedDict()
+        self._active: Dict[int, str] = {}
+        self._tasks: set = set()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._slots
+
+    def get(self, job_id: str) -> Optional[DraftJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_for(self, conversation_id: int) -> Optional[DraftJob]:
+        with self._lock:
+            return self._active_for(int(conversation_id))
+
+    def _active_for(self, conversation_id: int) -> Optional[DraftJob]:
+        job_id = self._active.get(conversation_id)
+        return self._jobs.get(job_id) if job_id else None
+
+    def submit(self, conversation_id: int, work: JobWork) -> DraftJob:
+        """Register and start a job; `JobConflict` if one is already active."""
+        job = DraftJob(int(conversation_id))
+        job.events.append({"event": "queued", "data": {}, "ts": job.created_at})
+        with self._lock:
+            active = self._active_for(job.conversation_id)
+            if active is not None:
+                raise JobConflict(active)
+            self._jobs[job.id] = job
+            self._active[job.conversation_id] = job.id
+            self._trim()
+
+        task = asyncio.create_task(self._run(job, work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: DraftJob, work: JobWork) -> None:
+        try:
+            async with self._semaphore():
+                await job.emit("running")
+                job.result = await work(job)
+                await job.emit("done", job.result)
+        except Exception as exc:
+            logger.exception("❌ Draft job %s failed", job.id)
+            job.error = str(exc)
+            await job.emit("failed", {"error": job.error})
+        finally:
+            with self._lock:
+                if self._active.get(job.conversation_id) == job.id:
+                    del self._active[job.conversation_id]
+
+    def _trim(self) -> None:
+        while len(self._jobs) > self.keep:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.finished:
+                break
+            del self._jobs[oldest_id]
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.max_workers, "enabled": int(self.enabled), **counts}
+
+
+draft_jobs = DraftJobManager(
+    max_workers=int(os.getenv("DRAFT_JOB_WORKERS", "4")),
+    keep=int(os.getenv("DRAFT_JOB_KEEP", "500")),
+    enabled=int(os.getenv("WEB_CONCURRENCY", "1") or "1") <= 1,
+)
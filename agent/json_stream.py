@@ -0,0 +1,147 @@
+"""
+agent/json_stream.py
+─────────────────────────────────────────────────────────────────────────────
+Incremental extraction of one string field from a streamed JSON envelope.
+
+The conversational chain answers with
+
+    {"actions": [...], "user_reply": "Sure – what are the party names?", ...}
+
+`JSONFieldStreamer.feed(token)` consumes the raw token stream and returns
+the *decoded* characters of the top-level `user_reply` string as soon as
+they arrive (escapes like \\n, \\" and \\uXXXX resolved, even when split
+across tokens).  Everything else – the other keys, a <think> preamble,
+code fences – is only buffered in `.raw` for the normal end-of-turn parse.
+
+One pass, O(1) work per character, no re-parsing of the buffer.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+_SIMPLE_ESCAPES = {
+    '"': '"', "\\": "\\", "/": "/",
+    "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t",
+}
+
+
+class JSONFieldStreamer:
+    def __init__(self, field: str = "user_reply"):
+        self.field = field
+        self.raw   = ""          # everything fed so far
+        self.value = ""          # decoded field text emitted so far
+        self.done  = False       # field string closed (or envelope ended)
+
+        self._pre         = ""   # text before the envelope's opening brace
+        self._started     = False
+        self._depth       = 0
+        self._in_str      = False
+        self._esc         = False
+        self._expect_key  = False
+        self._reading_key = False
+        self._key_buf: List[str] = []
+        self._last_key: Optional[str] = None
+        self._capturing   = False
+        self._hex: Optional[str] = None      # pending \uXXXX digits
+        self._high: Optional[int] = None     # pending high surrogate
+
+    # ─────────────────────────────────────────────────────────
+    def feed(self, chunk: str) -> str:
+        """Consume `chunk`; return newly decoded field characters (maybe '')."""
+        self.raw += chunk
+        if self.done:
+            return ""
+        out: List[str] = []
+        for ch in chunk:
+            if self.done:
+                break
+            if not self._started:
+                self._scan_preamble(ch)
+            elif self._capturing:
+                self._capture(ch, out)
+            elif self._in_str:
+                self._skip_string(ch)
+            else:
+                self._structure(ch)
+        text = "".join(out)
+        self.value += text
+        return text
+
+    # ─────────────────────────────────────────────────────────
+    def _scan_preamble(self, ch: str) -> None:
+        if ch == "{" and self._pre.count("<think>") <= self._pre.count("</think>"):
+            self._started    = True
+            self._depth      = 1
+            self._expect_key = True
+        else:
+            self._pre += ch
+
+    def _structure(self, ch: str) -> None:
+        if ch == '"':
+            self._in_str = True
+            if self._depth == 1 and self._expect_key:
+                self._reading_key = True
+                self._key_buf = []
+            elif self._depth == 1 and self._last_key == self.field:
+                self._capturing = True
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self.done = True
+        elif self._depth == 1:
+            if ch == ",":
+                self._expect_key = True
+                self._last_key   = None
+            elif ch == ":":
+                self._expect_key = False
+
+    def _skip_string(self, ch: str) -> None:
+        if self._esc:
+            self._esc = False
+            if self._reading_key:
+                self._key_buf.append(_SIMPLE_ESCAPES.get(ch, ch))
+        elif ch == "\\":
+            self._esc = True
+        elif ch == '"':
+            self._in_str = False
+            if self._reading_key:
+                self._reading_key = False
+                self._last_key = "".join(self._key_buf)
+        elif self._reading_key:
+            self._key_buf.append(ch)
+
+    def _capture(self, ch: str, out: List[str]) -> None:
+        if self._hex is not None:
+            self._hex += ch
+            if len(self._hex) == 4:
+                try:
+                    self._emit_codepoint(int(self._hex, 16), out)
+                except ValueError:           # not hex – keep it literally
+                    out.append("\\u" + self._hex)
+                self._hex = None
+        elif self._esc:
+            self._esc = False
+            if ch == "u":
+                self._hex = ""
+            else:
+                out.append(_SIMPLE_ESCAPES.get(ch, ch))
+        elif ch == "\\":
+            self._esc = True
+        elif ch == '"':
+            self._in_str    = False
+            self._capturing = False
+            self.done       = True
+        else:
+            out.append(ch)
+
+    def _emit_codepoint(self, cp: int, out: List[str]) -> None:
+        if 0xD800 <= cp <= 0xDBFF:
+            self._high = cp
+            return
+        if 0xDC00 <= cp <= 0xDFFF and self._high is not None:
+            cp = 0x10000 + ((self._high - 0xD800) << 10) + (cp - 0xDC00)
+        self._high = None
+        out.append(chr(cp))
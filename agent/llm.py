@@ -1,13 +1,15 @@
 import os
-import time
 import logging
+from dataclasses import replace
+from typing import Optional
 
 from dotenv import load_dotenv
 from fastapi import HTTPException
-from httpx import HTTPStatusError
 from langchain_core.runnables.base import Runnable
 from langchain_openai import ChatOpenAI  # Hugging Face-compatible OpenAI wrapper
 
+from agent.retry import DEFAULT_POLICY, LLMUnavailableError, call_with_retry, status_of
+
 # ────────────────────────────────
 # 🛠️ Logging Setup
 # ────────────────────────────────
@@ -44,6 +46,7 @@ llm_chain: Runnable = ChatOpenAI(
     temperature=0.3,
     max_tokens=8192,
     streaming=True,
+    stream_usage=True,   # token counts for agent_llm_tokens_total
 )
 
 #DeepSeekR1-1q1
@@ -60,34 +63,24 @@ llm_chain: Runnable = ChatOpenAI(
 # ────────────────────────────────
 # 🔁 Retry Logic for Cold Start / 503
 # ────────────────────────────────
-def invoke_with_retry(executor: Runnable, inputs, max_retries=1000, delay=5, **kwargs) -> str:
+def invoke_with_retry(executor: Runnable, inputs, max_retries: Optional[int] = None, **kwargs) -> str:
     """
-    Calls the LangChain Runnable with retry handling for Hugging Face cold-starts (503).
+    Calls the LangChain Runnable through the shared `agent.retry` policy
+    (typed status classification, jittered backoff, circuit breaker) and
+    returns the cleaned text.  Failures surface as HTTPException.
     """
-    last_error = None
-
-    for attempt in range(1, max_retries + 1):
-        try:
-            result = executor.invoke(inputs, **kwargs)
-            break
-        except HTTPStatusError as e:
-            last_error = e
-            if e.response.status_code == 503:
-                logger.warning(f"[Retry {attempt}/{max_retries}] 503 Cold Start – Retrying in {delay}s...")
-            else:
-                logger.error(f"[Retry {attempt}/{max_retries}] HTTP {e.response.status_code}: {e}")
-                raise HTTPException(502, f"LLM HTTP error {e.response.status_code}: {e}")
-        except Exception as e:
-            last_error = e
-            if "503" in str(e):
-                logger.warning(f"[Retry {attempt}/{max_retries}] 503-like error: {e} – Retrying in {delay}s...")
-            else:
-                logger.error(f"[Retry {attempt}/{max_retries}] Fatal error: {e}")
-                raise HTTPException(500, f"Unexpected LLM error: {e}")
-        time.sleep(delay)
-    else:
-        logger.error(f"All {max_retries} retries failed: {last_error}")
-        raise HTTPException(502, f"LLM service unavailable after multiple retries: {last_error}")
+    policy = DEFAULT_POLICY if max_retries is None else replace(DEFAULT_POLICY, max_attempts=max_retries)
+    try:
+        result = call_with_retry(lambda: executor.invoke(inputs, **kwargs), policy)
+    except LLMUnavailableError as e:
+        logger.error(f"LLM unavailable: {e}")
+        raise HTTPException(503, f"LLM service unavailable: {e}")
+    except Exception as e:
+        status = status_of(e)
+        logger.error(f"LLM error (HTTP {status}): {e}")
+        if status is not None:
+            raise HTTPException(502, f"LLM HTTP error {status}: {e}")
+        raise HTTPException(500, f"Unexpected LLM error: {e}")
 
     # ────────────────────────────────
     # 🧠 Parse LLM Output
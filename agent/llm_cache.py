@@ -0,0 +1,220 @@
+"""
+agent/llm_cache.py
+─────────────────────────────────────────────────────────────────────────────
+Persistent LLM response cache for the expensive, deterministic-enough
+stages (drafter, reviser, placeholder checker, outline, section).
+
+• key      = sha256(model, stage, rendered prompt)
+• storage  = local SQLite table (`LLM_CACHE_PATH`, default ./llm_cache.db)
+• eviction = TTL (`LLM_CACHE_TTL_SECONDS`) + LRU cap (`LLM_CACHE_MAX_ENTRIES`)
+• opt-in   = per stage via `LLM_CACHE_STAGES` (comma list, "" disables)
+
+`invoke_cached` / `ainvoke_cached` wrap `invoke_with_retry` /
+`ainvoke_with_retry`; per-stage hit rates come from `llm_cache.stats()`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from agent.utils import ainvoke_with_retry, invoke_with_retry
+
+logger = logging.getLogger("agent.llm_cache")
+logger.setLevel(logging.DEBUG)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key         TEXT PRIMARY KEY,
+    stage       TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    response    TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access);
+"""
+
+
+def _response_text(res: Any) -> str:
+    if isinstance(res, dict) and "text" in res:
+        return str(res["text"])
+    if hasattr(res, "content"):
+        return str(res.content)
+    return str(res)
+
+
+def _render_prompt(chain: Any, inputs: Dict[str, Any]) -> str:
+    """The exact prompt text the chain would send for `inputs`."""
+    prompt = getattr(chain, "prompt", None)
+    if prompt is None:
+        return repr(sorted(inputs.items()))
+    return prompt.format(**{k: inputs.get(k, "") for k in prompt.input_variables})
+
+
+def _model_name(chain: Any) -> str:
+    llm = getattr(chain, "llm", chain)
+    return str(getattr(llm, "model_name", None) or getattr(llm, "model", "") or type(llm).__name__)
+
+
+class LLMResponseCache:
+    """SQLite-backed TTL + LRU cache of raw LLM response text."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int, stages: set[str]):
+        self.path        = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stages      = stages
+
+        self._lock  = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # ––– Config ––––––––––––––––––––––––––––––––––––––––––
+    def enabled_for(self, stage: str) -> bool:
+        return stage in self.stages and self.max_entries > 0
+
+    @staticmethod
+    def make_key(model: str, stage: str, prompt: str) -> str:
+        h = hashlib.sha256()
+        for part in (model, stage, prompt):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    # ––– Storage –––––––––––––––––––––––––––––––––––––––––
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _count(self, stage: str, field: str) -> None:
+        bucket = self._stats.setdefault(stage, {"hits": 0, "misses": 0, "stores": 0})
+        bucket[field] += 1
+
+    def get(self, stage: str, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            db  = self._db()
+            row = db.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    db.commit()
+                self._count(stage, "misses")
+                return None
+            db.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            db.commit()
+            self._count(stage, "hits")
+            return row[0]
+
+    def put(self, stage: str, model: str, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, stage, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, stage, model, response, now, now),
+            )
+            db.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            (total,) = db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            if total > self.max_entries:
+                db.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    " SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (total - self.max_entries,),
+                )
+            db.commit()
+            self._count(stage, "stores")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            out: Dict[str, Dict[str, float]] = {}
+            for stage, s in self._stats.items():
+                looked_up = s["hits"] + s["misses"]
+                out[stage] = {**s, "hit_rate": (s["hits"] / looked_up) if looked_up else 0.0}
+            return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db().execute("DELETE FROM llm_cache")
+            self._db().commit()
+            self._stats.clear()
+
+
+llm_cache = LLMResponseCache(
+    path=os.getenv("LLM_CACHE_PATH", "./llm_cache.db"),
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000")),
+    stages={s.strip() for s in os.getenv("LLM_CACHE_STAGES", "drafter,reviser,checker,outline,section").split(",") if s.strip()},
+)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Cache-aware invocation
+# ─────────────────────────────────────────────────────────────
+Accept = Callable[[str], bool]
+
+
+def invoke_cached(
+    stage: str,
+    chain: Any,
+    inputs: Dict[str, Any],
+    accept: Optional[Accept] = None,
+) -> Any:
+    """
+    `invoke_with_retry` behind the response cache.
+
+    Only responses for which `accept(text)` is true are stored, so a
+    garbled generation is never replayed on the user's retry.
+    """
+    if not llm_cache.enabled_for(stage):
+        return invoke_with_retry(chain, inputs)
+
+    model = _model_name(chain)
+    key   = llm_cache.make_key(model, stage, _render_prompt(chain, inputs))
+    hit   = llm_cache.get(stage, key)
+    if hit is not None:
+        logger.debug("🎯 LLM cache hit (%s)", stage)
+        return {"text": hit}
+
+    res  = invoke_with_retry(chain, inputs)
+    text = _response_text(res)
+    if accept is None or accept(text):
+        llm_cache.put(stage, model, key, text)
+    return res
+
+
+async def ainvoke_cached(
+    stage: str,
+    chain: Any,
+    inputs: Dict[str, Any],
+    accept: Optional[Accept] = None,
+) -> Any:
+    """Async twin of `invoke_cached` (SQLite work runs off the event loop)."""
+    if not llm_cache.enabled_for(stage):
+        return await ainvoke_with_retry(chain, inputs)
+
+    model = _model_name(chain)
+    key   = llm_cache.make_key(model, stage, _render_prompt(chain, inputs))
+    hit   = await asyncio.to_thread(llm_cache.get, stage, key)
+    if hit is not None:
+        logger.debug("🎯 LLM cache hit (%s)", stage)
+        return {"text": hit}
+
+    res  = await ainvoke_with_retry(chain, inputs)
+    text = _response_text(res)
+    if accept is None or accept(text):
+        await asyncio.to_thread(llm_cache.put, stage, model, key, text)
+    return res
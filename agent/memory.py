@@ -2,23 +2,106 @@
 agent/memory.py
 ─────────────────────────────────────────────────────────────────────────────
 Production-grade ConversationBufferMemory backed by your SQL database.
+
+History is served from `agent.history_cache` when warm; a cold
+conversation loads only its newest MEMORY_TAIL_MESSAGES messages
+(0 = the whole transcript) with one indexed keyset query – the same
+`message_page` that backs `GET /conversations/{id}/messages`.
+`get_memory` loads on the sync engine, `aget_memory` on the async one.
+
+Two modes (env MEMORY_MODE):
+• buffer  (default) – the loaded transcript goes into every prompt: all
+                      of it by default; with MEMORY_TAIL_MESSAGES > 0
+                      older messages are left out
+• summary           – rolling summary of older turns + the last
+                      MEMORY_KEEP_TURNS turns verbatim, folded so the
+                      history stays under MEMORY_TOKEN_BUDGET tokens;
+                      messages a capped load skipped are folded into the
+                      summary first, so none are lost
+
+Per-prompt history token counts (`prompt_token_stats()`), next to what
+the full transcript would cost, are recorded in summary mode – which
+tokenises anyway to stay under budget – and in buffer mode only with
+MEMORY_TOKEN_STATS=on, since that tokenises the whole transcript per turn.
 """
 
 from __future__ import annotations
 
 import logging
+import os
+import threading
+from collections import deque
 from contextlib import contextmanager
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, get_buffer_string
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import Session
 
-from api.database import SessionLocal
+from api.database import AsyncSessionLocal, SessionLocal
 from api.models import Conversation, Message  # ORM models
+from agent.history_cache import history_cache
+from agent.state import AgentState
+from agent.utils import count_tokens, invoke_with_retry, ainvoke_with_retry, _clean_llm_text
 
 logger = logging.getLogger("agent.memory")
 logger.setLevel(logging.DEBUG)
 
+MEMORY_MODE          = os.getenv("MEMORY_MODE", "buffer").lower()
+KEEP_TURNS           = int(os.getenv("MEMORY_KEEP_TURNS", "6"))
+SUMMARY_BATCH_TURNS  = int(os.getenv("MEMORY_SUMMARY_BATCH_TURNS", "4"))
+TOKEN_BUDGET         = int(os.getenv("MEMORY_TOKEN_BUDGET", "2000"))
+TAIL_MESSAGES        = int(os.getenv("MEMORY_TAIL_MESSAGES", "0"))    # 0 = no cap
+TOKEN_STATS          = os.getenv("MEMORY_TOKEN_STATS", "off").strip().lower() not in ("0", "off", "false", "no")
+
+# Other workers write turns this process's history cache never sees
+_WORKERS             = int(os.getenv("WEB_CONCURRENCY", "1") or "1")
+VALIDATE_CACHE       = os.getenv(
+    "HISTORY_CACHE_VALIDATE", "on" if _WORKERS > 1 else "off"
+).strip().lower() not in ("0", "off", "false", "no")
+
+# ─────────────────────────────────────────────────────────────
+#  Per-prompt history token accounting
+# ─────────────────────────────────────────────────────────────
+class _PromptTokenStats:
+    """Running totals + the most recent per-prompt samples."""
+
+    def __init__(self, keep: int = 256):
+        self._lock   = threading.Lock()
+        self.recent: deque = deque(maxlen=keep)
+        self.prompts = 0
+        self.history_tokens = 0
+        self.full_history_tokens = 0
+
+    def record(self, conversation_id: int, mode: str, sent: int, full: int) -> None:
+        with self._lock:
+            self.prompts += 1
+            self.history_tokens += sent
+            self.full_history_tokens += full
+            self.recent.append({
+                "conversation_id": conversation_id,
+                "mode": mode,
+                "history_tokens": sent,
+                "full_history_tokens": full,
+            })
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "prompts": self.prompts,
+                "history_tokens": self.history_tokens,
+                "full_history_tokens": self.full_history_tokens,
+                "recent": list(self.recent),
+            }
+
+
+_token_stats = _PromptTokenStats()
+
+
+def prompt_token_stats() -> Dict[str, Any]:
+    return _token_stats.snapshot()
+
 # ─────────────────────────────────────────────────────────────
 #  Session helper
 # ─────────────────────────────────────────────────────────────
@@ -39,13 +122,132 @@ def _ensure_conversation(db: Session, conversation_id: int) -> None:
         db.commit()
         logger.debug("➕ Created Conversation(id=%s)", conversation_id)
 
+# ─────────────────────────────────────────────────────────────
+#  Keyset-paginated history reads
+# ─────────────────────────────────────────────────────────────
+def message_page(
+    db: Session,
+    conversation_id: int,
+    before: Optional[int] = None,
+    limit: Optional[int] = 50,
+) -> Tuple[List[Message], bool]:
+    """
+    The `limit` newest messages older than message id `before` (or the
+    newest overall; `limit=None` → all of them), oldest first, plus
+    whether older ones exist.
+
+    Ordered by (timestamp, id) – timestamps have one-second resolution on
+    SQLite, the id breaks ties – and served from the
+    (conversation_id, timestamp) index.  Raises LookupError when `before`
+    is not a message of this conversation.
+    """
+    query = db.query(Message).filter(Message.conversation_id == conversation_id)
+    if before is not None:
+        if db.query(Message.id).filter_by(id=before, conversation_id=conversation_id).first() is None:
+            raise LookupError(f"Message {before} is not in conversation {conversation_id}")
+        # Compare against the stored value, not a re-bound datetime
+        cursor_ts = select(Message.timestamp).where(Message.id == before).scalar_subquery()
+        query = query.filter(tuple_(Message.timestamp, Message.id) < tuple_(cursor_ts, before))
+    query = query.order_by(Message.timestamp.desc(), Message.id.desc())
+    rows = (query.limit(limit + 1) if limit is not None else query).all()
+    has_more = limit is not None and len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    return rows, has_more
+
+
+def load_history(db: Session, conversation_id: int) -> Tuple[List[BaseMessage], int]:
+    """
+    The newest MEMORY_TAIL_MESSAGES messages as LangChain messages (oldest
+    first) and how many older ones were skipped.  Plain sync ORM code, so
+    the async loader runs it unchanged via `AsyncSession.run_sync`.
+    """
+    if TAIL_MESSAGES <= 0:
+        rows, has_more = message_page(db, conversation_id, limit=None)
+    else:
+        rows, has_more = message_page(db, conversation_id, limit=TAIL_MESSAGES)
+    offset = 0
+    if has_more:
+        total = (
+            db.query(func.count(Message.id))
+            .filter(Message.conversation_id == conversation_id)
+            .scalar()
+        )
+        offset = total - len(rows)
+    logger.debug(
+        "🧩 Bootstrapping %s msgs (skipped %s older) for conv_id=%s",
+        len(rows), offset, conversation_id
+    )
+    return [_as_message(row) for row in rows], offset
+
+
+def cached_history(db: Session, conversation_id: int) -> Optional[Tuple[List[BaseMessage], int]]:
+    """
+    History-cache hit, or None.  With HISTORY_CACHE_VALIDATE the hit is
+    checked first: one indexed COUNT must equal `offset + len(cached)`,
+    else another worker has written turns and the entry is dropped.
+    """
+    found = history_cache.lookup(conversation_id)
+    if found is None or not VALIDATE_CACHE:
+        return found
+    messages, offset = found
+    total = (
+        db.query(func.count(Message.id))
+        .filter(Message.conversation_id == conversation_id)
+        .scalar()
+    )
+    if total != offset + len(messages):
+        history_cache.mark_stale(conversation_id)
+        return None
+    return found
+
+
+def load_range(db: Session, conversation_id: int, start: int, end: int) -> List[BaseMessage]:
+    """Messages at positions `[start, end)` of the transcript, oldest first."""
+    rows = (
+        db.query(Message)
+        .filter(Message.conversation_id == conversation_id)
+        .order_by(Message.timestamp, Message.id)
+        .offset(start)
+        .limit(end - start)
+        .all()
+    )
+    return [_as_message(row) for row in rows]
+
+
+def _as_message(row: Message) -> BaseMessage:
+    return HumanMessage(content=row.content) if row.sender == "user" else AIMessage(content=row.content)
+
+
+def _batches(start: int, messages: List[BaseMessage], size: int):
+    """`(absolute end, batch)` chunks of `messages`, which begin at `start`."""
+    for i in range(0, len(messages), size):
+        batch = messages[i:i + size]
+        yield start + i + len(batch), batch
+
+
+def _summary_stage():
+    # Late import: compiling the registry loads agent.llm and every chain module.
+    from agent.chains.registry import chain_registry
+    return chain_registry.get("history_summary")
+
+# ─────────────────────────────────────────────────────────────
+#  History-cache write hook
+# ─────────────────────────────────────────────────────────────
+def remember_turn(conversation_id: int | str, user_msg: Optional[str], ai_msg: str) -> None:
+    """Mirror committed messages (user msg optional) into the history cache."""
+    messages = [HumanMessage(content=user_msg)] if user_msg is not None else []
+    messages.append(AIMessage(content=ai_msg))
+    history_cache.append(int(conversation_id), messages)
+
 # ─────────────────────────────────────────────────────────────
 #  SQL-backed memory class
 # ─────────────────────────────────────────────────────────────
 class SQLBufferMemory(ConversationBufferMemory):
     """
-    LangChain ConversationBufferMemory that transparently syncs
-    with the `messages` table.
+    LangChain ConversationBufferMemory loaded from the `messages` table.
+
+    Read-only from the chains' point of view – see `save_context`.
     """
 
     class Config:
@@ -53,7 +255,14 @@ class SQLBufferMemory(ConversationBufferMemory):
         extra = "allow"                # ignore unknown attrs
 
     # ––– Init ––––––––––––––––––––––––––––––––––––––––––––
-    def __init__(self, conversation_id: int, db: Session):
+    def __init__(
+        self,
+        conversation_id: int,
+        db: Optional[Session] = None,
+        mode: str = MEMORY_MODE,
+        history: Optional[Tuple[List[BaseMessage], int]] = None,
+    ):
+        """Pass `history=(messages, offset)` when it was already loaded (async path)."""
         super().__init__(
             memory_key="history",      # <<< aligns w/ agent_runner
             input_key="user_input",
@@ -63,52 +272,179 @@ class SQLBufferMemory(ConversationBufferMemory):
         # attach non-pydantic fields
         object.__setattr__(self, "conversation_id", conversation_id)
         object.__setattr__(self, "db", db)
+        object.__setattr__(self, "mode", mode)
+        object.__setattr__(self, "summary", "")
+        object.__setattr__(self, "summarized", 0)
+        object.__setattr__(self, "offset", 0)   # older messages not loaded
 
-        self._bootstrap()
+        if history is not None:
+            self.chat_memory.messages = list(history[0])
+            object.__setattr__(self, "offset", history[1])
+        else:
+            self._bootstrap()
 
     # ––– Bootstrap history –––––––––––––––––––––––––––––––
     def _bootstrap(self) -> None:
-        rows: List[Message] = (
-            self.db.query(Message)
-            .filter(Message.conversation_id == self.conversation_id)
-            .order_by(Message.timestamp)
-            .all()
+        found = cached_history(self.db, self.conversation_id)
+        if found is not None:
+            self.db.rollback()
+            self.chat_memory.messages, offset = found
+            object.__setattr__(self, "offset", offset)
+            logger.debug(
+                "⚡ History cache hit: %s msgs for conv_id=%s",
+                len(self.chat_memory.messages), self.conversation_id
+            )
+            return
+
+        messages, offset = load_history(self.db, self.conversation_id)
+        self.db.rollback()   # don't pin a WAL read snapshot for the memory's lifetime
+        object.__setattr__(self, "offset", offset)
+        self.chat_memory.messages = list(messages)
+        history_cache.put(self.conversation_id, messages, offset)
+
+    # ––– Prompt variables ––––––––––––––––––––––––––––––
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        messages = self.chat_memory.messages
+        if self.mode != "summary":
+            variables = super().load_memory_variables(inputs)
+            if TOKEN_STATS:
+                sent = count_tokens(get_buffer_string(messages))
+                _token_stats.record(self.conversation_id, self.mode, sent, sent)
+            return variables
+
+        history = self._render(self.summary, messages[self.summarized:])
+        _token_stats.record(
+            self.conversation_id, self.mode,
+            count_tokens(history), count_tokens(get_buffer_string(messages)),
         )
+        return {self.memory_key: history}
+
+    async def aload_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return self.load_memory_variables(inputs)
+
+    @staticmethod
+    def _render(summary: str, recent: List[Any]) -> str:
+        head = f"Summary of earlier conversation:\n{summary}\n\n" if summary else ""
+        return head + get_buffer_string(recent)
+
+    # ––– Rolling summary (MEMORY_MODE=summary) ––––––––––––
+    def _adopt(self, state: AgentState) -> None:
+        """Pick up the summary persisted in AgentState."""
+        total = len(self.chat_memory.messages)
+        loaded = max(0, state.summarized_messages - self.offset)
+        object.__setattr__(self, "summary", state.history_summary)
+        object.__setattr__(self, "summarized", min(loaded, total))
+
+    def _fold_range(self) -> Optional[Tuple[int, int]]:
+        """
+        Messages `[start, end)` to fold into the summary, or None.
+
+        Verbatim history is allowed to grow by SUMMARY_BATCH_TURNS beyond
+        KEEP_TURNS before folding, so the summary LLM call is amortised
+        over several turns – unless the token budget is exceeded first.
+        """
+        messages = self.chat_memory.messages
+        start    = self.summarized
+        keep     = 2 * KEEP_TURNS
+        pending  = len(messages) - start
+
+        over_budget = count_tokens(self._render(self.summary, messages[start:])) > TOKEN_BUDGET
+        if pending <= keep + 2 * SUMMARY_BATCH_TURNS and not over_budget:
+            return None
+
+        end = max(start, len(messages) - keep)
+        # Still over budget → shrink the verbatim tail, one turn at a time
+        while end < len(messages) - 2 and count_tokens(
+            get_buffer_string(messages[end:])
+        ) > TOKEN_BUDGET // 2:
+            end += 2
+        return (start, end) if end > start else None
+
+    def _skipped_range(self, state: AgentState) -> Optional[Tuple[int, int]]:
+        """
+        Transcript positions `[start, end)` older than the loaded tail that
+        the summary doesn't cover yet, or None – a capped load
+        (MEMORY_TAIL_MESSAGES) never put them in memory, so they are
+        fetched and folded before the regular fold.
+        """
+        if state.summarized_messages >= self.offset:
+            return None
+        return state.summarized_messages, self.offset
+
+    def _set_summary(self, state: AgentState, end: int, raw: Any) -> None:
+        """New summary covering the first `end` messages of the transcript."""
+        text = raw.get("text", "") if isinstance(raw, dict) else getattr(raw, "content", raw)
+        new_summary = _clean_llm_text(str(text))
+        object.__setattr__(self, "summary", new_summary)
+        state.history_summary     = new_summary
+        state.summarized_messages = end
         logger.debug(
-            "🧩 Bootstrapping %s msgs for conv_id=%s",
-            len(rows), self.conversation_id
+            "🗜️ Folded history up to msg %s for conv_id=%s (%s tokens)",
+            end, self.conversation_id, count_tokens(new_summary),
         )
 
-        for row in rows:
-            if row.sender == "user":
-                self.chat_memory.add_user_message(row.content)
-            else:
-                self.chat_memory.add_ai_message(row.content)
+    def _apply_fold(self, state: AgentState, end: int, raw: Any) -> None:
+        self._set_summary(state, end + self.offset, raw)
+        object.__setattr__(self, "summarized", end)
+
+    def _fold_inputs(self, lines: List[BaseMessage]) -> Dict[str, str]:
+        return {
+            "summary":   self.summary or "(none yet)",
+            "new_lines": get_buffer_string(lines),
+        }
+
+    def compact(self, state: AgentState) -> None:
+        """Fold old turns into `state.history_summary` when due (sync)."""
+        if self.mode != "summary":
+            return
+        self._adopt(state)
+        try:
+            skipped = self._skipped_range(state)
+            if skipped is not None:
+                with get_db() as db:
+                    older = load_range(db, self.conversation_id, *skipped)
+                for end, batch in _batches(skipped[0], older, TAIL_MESSAGES):
+                    raw = invoke_with_retry(_summary_stage(), self._fold_inputs(batch))
+                    self._set_summary(state, end, raw)
+            rng = self._fold_range()
+            if rng is None:
+                return
+            raw = invoke_with_retry(_summary_stage(), self._fold_inputs(self.chat_memory.messages[slice(*rng)]))
+        except Exception as exc:
+            logger.warning("⚠️ History summary failed, keeping verbatim: %s", exc)
+            return
+        self._apply_fold(state, rng[1], raw)
+
+    async def acompact(self, state: AgentState) -> None:
+        """Async twin of `compact`."""
+        if self.mode != "summary":
+            return
+        self._adopt(state)
+        try:
+            skipped = self._skipped_range(state)
+            if skipped is not None:
+                async with AsyncSessionLocal() as db:
+                    older = await db.run_sync(load_range, self.conversation_id, *skipped)
+                for end, batch in _batches(skipped[0], older, TAIL_MESSAGES):
+                    raw = await ainvoke_with_retry(_summary_stage(), self._fold_inputs(batch))
+                    self._set_summary(state, end, raw)
+            rng = self._fold_range()
+            if rng is None:
+                return
+            raw = await ainvoke_with_retry(_summary_stage(), self._fold_inputs(self.chat_memory.messages[slice(*rng)]))
+        except Exception as exc:
+            logger.warning("⚠️ History summary failed, keeping verbatim: %s", exc)
+            return
+        self._apply_fold(state, rng[1], raw)
 
-    # ––– Persist new turn ––––––––––––––––––––––––––––––––
+    # ––– Read-only: chains never write ––––––––––––––––––
     def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
-        """Persist BOTH the in-memory buffer and DB rows."""
-        super().save_context(inputs, outputs)  # update LC buffer
-
-        user_msg       = str(inputs.get("user_input", ""))
-        assistant_resp = str(outputs.get("output", ""))
-
-        self.db.add_all(
-            [
-                Message(
-                    conversation_id=self.conversation_id,
-                    sender="user",
-                    content=user_msg,
-                ),
-                Message(
-                    conversation_id=self.conversation_id,
-                    sender="assistant",
-                    content=assistant_resp,
-                ),
-            ]
-        )
-        self.db.commit()
-        logger.debug("💾 Saved turn to DB for conv_id=%s", self.conversation_id)
+        """
+        No-op. Every `LLMChain` with this memory attached calls
+        `save_context`; the turn is instead written exactly once by
+        `agent.persistence.commit_turn`.
+        """
+        return None
 
     # ––– Cleanup –––––––––––––––––––––––––––––––––––––––––
     def __del__(self):
@@ -129,3 +465,26 @@ def get_memory(conversation_id: str) -> SQLBufferMemory:
     db = SessionLocal()
     _ensure_conversation(db, conv_id_int)
     return SQLBufferMemory(conversation_id=conv_id_int, db=db)
+
+
+async def aget_memory(conversation_id: str) -> SQLBufferMemory:
+    """
+    Async twin of `get_memory`: a warm conversation comes straight from
+    the history cache (checked against the DB with HISTORY_CACHE_VALIDATE);
+    a cold one is loaded with awaited queries on the async engine – no
+    threadpool worker, no session kept open.
+    """
+    conv_id_int = int(conversation_id)
+    if VALIDATE_CACHE:
+        async with AsyncSessionLocal() as db:
+            found = await db.run_sync(cached_history, conv_id_int)
+    else:
+        found = history_cache.lookup(conv_id_int)
+    if found is None:
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(_ensure_conversation, conv_id_int)
+            found = await db.run_sync(load_history, conv_id_int)
+        history_cache.put(conv_id_int, *found)
+    else:
+        logger.debug("⚡ History cache hit: %s msgs for conv_id=%s", len(found[0]), conv_id_int)
+    return SQLBufferMemory(conversation_id=conv_id_int, history=found)
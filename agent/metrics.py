@@ -0,0 +1,235 @@
+"""
+agent/metrics.py
+─────────────────────────────────────────────────────────────────────────────
+In-process metrics with Prometheus text exposition – no client library,
+no collector; `GET /metrics` just calls `render()`.
+
+• Counter / Histogram   – labelled, thread-safe
+• span(stage)           – times one stage of a turn into
+                          `agent_stage_duration_seconds{stage,outcome}`
+• register_stats(...)   – folds an existing `stats()` dict (LLM cache,
+                          scheduler, circuit breaker, history cache …)
+                          into gauges at scrape time
+
+Stages: turn · memory_load · conversational · readiness · drafter · reviser ·
+template · outline · section · sections · checker · follow_up · db_commit · http
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("agent.metrics")
+logger.setLevel(logging.DEBUG)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+# ─────────────────────────────────────────────────────────────
+# Metric types
+# ─────────────────────────────────────────────────────────────
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_fmt_labels(key)} {_fmt_value(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[LabelKey, List[float]] = {}   # bucket counts…, sum, count
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_fmt_labels(key, ('le', _fmt_value(bound)))} {_fmt_value(cumulative)}"
+            yield f"{self.name}_bucket{_fmt_labels(key, ('le', '+Inf'))} {_fmt_value(series[-1])}"
+            yield f"{self.name}_sum{_fmt_labels(key)} {_fmt_value(series[-2])}"
+            yield f"{self.name}_count{_fmt_labels(key)} {_fmt_value(series[-1])}"
+
+
+_metrics: List[Any] = []
+_stats_sources: List[Tuple[str, Callable[[], Dict[str, Any]], Optional[str]]] = []
+
+
+def counter(name: str, help: str) -> Counter:
+    metric = Counter(name, help)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    metric = Histogram(name, help, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+# ─────────────────────────────────────────────────────────────
+# Turn metrics
+# ─────────────────────────────────────────────────────────────
+STAGE_SECONDS = histogram(
+    "agent_stage_duration_seconds", "Wall time per turn stage.")
+LLM_TOKENS = counter(
+    "agent_llm_tokens_total", "LLM tokens by stage and kind (prompt|completion).")
+LLM_CALLS = counter(
+    "agent_llm_calls_total", "LLM calls by stage and outcome.")
+LLM_RETRIES = counter(
+    "agent_llm_retries_total", "Extra LLM attempts (retries) by stage.")
+JSON_DECODE = counter(
+    "agent_json_decode_total", "Model-output decodes by required key and winning strategy.")
+HTTP_SECONDS = histogram(
+    "agent_http_request_duration_seconds", "HTTP request wall time by route and status.")
+
+
+class Span:
+    """Mutable outcome holder for one timed stage."""
+
+    __slots__ = ("stage", "outcome", "started")
+
+    def __init__(self, stage: str):
+        self.stage   = stage
+        self.outcome = "ok"
+        self.started = time.perf_counter()
+
+
+@contextmanager
+def span(stage: str) -> Iterator[Span]:
+    """
+    Time a stage.  Set `s.outcome` inside the block for a non-exception
+    result label (e.g. "parse_failed", "local", "patched"); an exception
+    records its class name and re-raises.
+    """
+    s = Span(stage)
+    try:
+        yield s
+    except BaseException as exc:
+        s.outcome = type(exc).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - s.started
+        STAGE_SECONDS.observe(elapsed, stage=stage, outcome=s.outcome)
+        logger.debug("⏱️ %s %.1f ms (%s)", stage, elapsed * 1000, s.outcome)
+
+
+# ─────────────────────────────────────────────────────────────
+# Existing stats() dicts → gauges
+# ─────────────────────────────────────────────────────────────
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def register_stats(prefix: str, source: Callable[[], Dict[str, Any]], label: Optional[str] = None) -> None:
+    """
+    Export `source()` at scrape time as `agent_<prefix>_<key>` gauges.
+    Nested dicts become a label (named `label`, default "key"); string
+    values become `{<key>="<value>"} 1`.
+    """
+    _stats_sources.append((prefix, source, label))
+
+
+def _flatten(prefix: str, stats: Dict[str, Any], label: Optional[str]) -> Iterator[Tuple[str, LabelKey, float]]:
+    for key, value in stats.items():
+        name = f"agent_{prefix}_{_NAME_RE.sub('_', str(key))}"
+        if isinstance(value, bool):
+            yield name, (), float(value)
+        elif isinstance(value, (int, float)):
+            yield name, (), float(value)
+        elif isinstance(value, str):
+            yield name, ((str(key), value),), 1.0
+        elif isinstance(value, dict):
+            for inner, v in value.items():
+                if isinstance(v, dict):
+                    for field, x in v.items():
+                        if isinstance(x, (int, float)):
+                            yield (f"agent_{prefix}_{_NAME_RE.sub('_', str(field))}",
+                                   ((label or "key", str(inner)),), float(x))
+                elif isinstance(v, (int, float)):
+                    yield name, ((label or "key", str(inner)),), float(v)
+
+
+def render() -> str:
+    """Prometheus text exposition (format 0.0.4)."""
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+
+    gauges: Dict[str, List[str]] = {}
+    for prefix, source, label in _stats_sources:
+        try:
+            stats = source()
+        except Exception as exc:   # a broken source must not break the scrape
+            logger.warning("⚠️ metrics source %s failed: %s", prefix, exc)
+            continue
+        for name, key, value in _flatten(prefix, stats, label):
+            gauges.setdefault(name, []).append(f"{name}{_fmt_labels(key)} {_fmt_value(value)}")
+    for name, samples in gauges.items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
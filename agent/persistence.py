@@ -0,0 +1,120 @@
+"""
+agent/persistence.py
+─────────────────────────────────────────────────────────────────────────────
+The single write path for a finished turn.
+
+Chains only *read* memory; the runner only mutates `AgentState`.  Whoever
+drives the turn (the API routes) calls `commit_turn` once, which writes
+
+• the user / assistant message pair (or just the assistant reply)
+• the changed `AgentState` fields (`agent.state_store`)
+• the drafted document (upserted, only when its content changed) plus a
+  new entry in its revision history (`agent.revisions`)
+
+in ONE write transaction (BEGIN IMMEDIATE on SQLite – see
+`api.database.begin_write`), then mirrors the messages into the
+history cache.
+`restore_document` is the other write path: it rolls a document back to
+an earlier revision and points the conversation's state at it.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from agent.memory import remember_turn
+from api.database import begin_write
+from agent.metrics import span
+from agent.revisions import record_revision, restore_revision
+from agent.state import AgentState
+from agent.state_store import load_state, save_state
+from api.models import Conversation, Document, Message
+
+logger = logging.getLogger("agent.persistence")
+logger.setLevel(logging.DEBUG)
+
+
+@span("db_commit")
+def commit_turn(
+    db: Session,
+    conversation_id: int | str,
+    user_msg: Optional[str],
+    reply: str,
+    state: AgentState,
+    draft_document: Optional[str] = None,
+) -> None:
+    """
+    Write messages + state + document for one turn and commit once.
+
+    `user_msg=None` writes only the assistant message – used when a
+    background drafting job finishes a turn whose user message was
+    already committed.
+    """
+    conv_id = int(conversation_id)
+    begin_write(db)
+    try:
+        conv = db.get(Conversation, conv_id)
+        if conv is None:
+            raise ValueError(f"Conversation {conv_id} does not exist")
+
+        if user_msg is not None:
+            db.add(Message(conversation_id=conv_id, sender="user", content=user_msg))
+        db.add(Message(conversation_id=conv_id, sender="assistant", content=reply))
+
+        if draft_document:
+            _upsert_document(db, conv, state, draft_document)
+        save_state(db, conv, state, draft_document)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    remember_turn(conv_id, user_msg, reply)
+    logger.debug("💾 Committed turn for conv_id=%s", conv_id)
+
+
+def _upsert_document(
+    db: Session, conv: Conversation, state: AgentState, content: str
+) -> None:
+    doc = db.query(Document).filter_by(conversation_id=conv.id).first()
+    if doc is None:
+        doc = Document(
+            conversation_id=conv.id,
+            user_id=conv.user_id,
+            doc_type=state.document_type or "unknown",
+            content=content,
+        )
+        db.add(doc)
+        record_revision(db, doc, content)
+    elif doc.content != content:
+        record_revision(db, doc, content, previous=doc.content)
+        doc.content  = content
+        doc.doc_type = state.document_type or doc.doc_type
+
+
+@span("db_commit")
+def restore_document(db: Session, conversation_id: int | str, version: int) -> Document:
+    """Roll the conversation's document back to `version` (new revision)."""
+    conv_id = int(conversation_id)
+    begin_write(db)
+    try:
+        doc = db.query(Document).filter_by(conversation_id=conv_id).first()
+        if doc is None:
+            raise LookupError(f"Conversation {conv_id} has no document")
+        restore_revision(db, doc, version)
+
+        conv = db.get(Conversation, conv_id)
+        state = load_state(db, conv)
+        state.draft, state.is_drafted = doc.content, True
+        save_state(db, conv, state, doc.content)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.debug("⏪ Restored conv_id=%s document to v%s", conv_id, version)
+    return doc
@@ -0,0 +1,326 @@
+"""
+agent/retry.py
+─────────────────────────────────────────────────────────────────────────────
+The one retry subsystem for outbound LLM calls.
+
+• classification by typed HTTP status (httpx / openai exceptions), not by
+  grepping the message for "503"
+• exponential backoff with full jitter – `asyncio.sleep` on the async path
+• per-turn deadline budget (`turn_deadline`) – backoff never sleeps past
+  it and async calls are cut off when it runs out
+• the local queue slot (`slot=`, an `llm_scheduler` slot) is taken before
+  the breaker is consulted and before the call is timed: running out of
+  budget while still queued (sync or async) is a `DeadlineExceededError`,
+  never a breaker failure – only the endpoint's own errors / timeouts
+  count against it
+• circuit breaker – after LLM_BREAKER_THRESHOLD consecutive transient
+  failures calls fail fast for LLM_BREAKER_RESET_SECONDS, then one probe
+  is let through (half-open)
+
+All failures that mean "the model is unavailable right now" derive from
+`LLMUnavailableError`; the API maps them to 503 + Retry-After.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncContextManager, Awaitable, Callable, ContextManager, Dict, Optional, TypeVar
+
+import httpx
+
+logger = logging.getLogger("agent.retry")
+logger.setLevel(logging.DEBUG)
+
+T = TypeVar("T")
+
+TRANSIENT_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+
+# ─────────────────────────────────────────────────────────────
+#  Errors
+# ─────────────────────────────────────────────────────────────
+class LLMUnavailableError(RuntimeError):
+    """The model endpoint can't serve this call right now."""
+
+    retry_after: float = 5.0
+
+
+class CircuitOpenError(LLMUnavailableError):
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM circuit open – retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(LLMUnavailableError):
+    def __init__(self, last_error: Optional[BaseException] = None):
+        super().__init__(f"LLM turn deadline exceeded (last error: {last_error})")
+        self.last_error = last_error
+
+
+class RetriesExhaustedError(LLMUnavailableError):
+    def __init__(self, attempts: int, last_error: BaseException):
+        super().__init__(f"LLM unavailable after {attempts} attempts: {last_error}")
+        self.last_error = last_error
+
+
+# ─────────────────────────────────────────────────────────────
+#  Classification
+# ─────────────────────────────────────────────────────────────
+def status_of(exc: BaseException) -> Optional[int]:
+    """HTTP status carried by an httpx / openai exception, if any."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    status = getattr(exc, "status_code", None)        # openai.APIStatusError
+    if isinstance(status, int):
+        return status
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_transient(exc: BaseException) -> bool:
+    status = status_of(exc)
+    if status is not None:
+        return status in TRANSIENT_STATUS
+    if isinstance(exc, (httpx.TimeoutException, httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    try:
+        import openai
+        return isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError))
+    except ImportError:  # pragma: no cover
+        return False
+
+
+# ─────────────────────────────────────────────────────────────
+#  Policy & deadline
+# ─────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int   = int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "6"))
+    base_delay:   float = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+    max_delay:    float = float(os.getenv("LLM_RETRY_MAX_DELAY", "20.0"))
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform(0, min(max_delay, base * 2^(attempt-1)))."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+DEFAULT_POLICY = RetryPolicy()
+TURN_DEADLINE_SECONDS = float(os.getenv("LLM_TURN_DEADLINE_SECONDS", "120"))
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def turn_deadline(seconds: float = TURN_DEADLINE_SECONDS):
+    """Budget every LLM call + backoff inside the block to `seconds` total."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+# ─────────────────────────────────────────────────────────────
+#  Circuit breaker
+# ─────────────────────────────────────────────────────────────
+class CircuitBreaker:
+    def __init__(self, threshold: int = 5, reset_seconds: float = 30.0):
+        self.threshold     = threshold
+        self.reset_seconds = reset_seconds
+
+        self._lock      = threading.Lock()
+        self._failures  = 0
+        self._opened_at: Optional[float] = None
+        self._probing   = False
+        self.trips      = 0
+        self.rejected   = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise `CircuitOpenError` unless this call may go out."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probing:
+                self._probing = True           # let exactly one probe through
+                return
+            self.rejected += 1
+            wait = max(1.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(wait)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures  = 0
+            self._opened_at = None
+            self._probing   = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                if self._opened_at is None or self._probing:
+                    self.trips += 1
+                    logger.warning("🔌 LLM circuit opened after %s failures", self._failures)
+                self._opened_at = time.monotonic()
+                self._probing   = False
+
+    def release_probe(self) -> None:
+        """A probe ended without a verdict (e.g. non-transient error)."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state(),
+                "consecutive_failures": self._failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+
+llm_breaker = CircuitBreaker(
+    threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+    reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Drivers
+# ─────────────────────────────────────────────────────────────
+def _next_delay(policy: RetryPolicy, attempt: int, exc: BaseException) -> float:
+    """Backoff before the next attempt, or raise if we're out of budget."""
+    if attempt >= policy.max_attempts:
+        raise RetriesExhaustedError(attempt, exc) from exc
+    delay  = policy.backoff(attempt)
+    budget = remaining_budget()
+    if budget is not None and budget <= delay:
+        raise DeadlineExceededError(exc) from exc
+    logger.warning(
+        "⚠️ LLM call failed (attempt %d/%d, status=%s) – retrying in %.1fs: %s",
+        attempt, policy.max_attempts, status_of(exc), delay, exc,
+    )
+    return delay
+
+
+def _on_error(exc: BaseException) -> None:
+    if is_transient(exc):
+        llm_breaker.record_failure()
+    else:
+        llm_breaker.release_probe()
+        raise exc
+
+
+@contextmanager
+def _queued(slot: Optional[Callable[[Optional[float]], ContextManager]], budget: Optional[float]):
+    """Hold `slot(timeout)` for one attempt; the wait is bounded by the budget."""
+    with ExitStack() as stack:
+        if slot is not None:
+            try:
+                stack.enter_context(slot(budget))
+            except TimeoutError as exc:
+                # Still queued locally – the endpoint was never asked
+                raise DeadlineExceededError(exc) from exc
+        yield
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    policy: RetryPolicy = DEFAULT_POLICY,
+    slot: Optional[Callable[[Optional[float]], ContextManager]] = None,
+) -> T:
+    """
+    Blocking driver: `fn()` with backoff, deadline and circuit breaker.
+    `slot(timeout)` must raise `TimeoutError` if it can't be had in time.
+    """
+    for attempt in range(1, policy.max_attempts + 1):
+        budget = remaining_budget()
+        if budget is not None and budget <= 0:
+            raise DeadlineExceededError()
+        with _queued(slot, budget):
+            budget = remaining_budget()
+            if budget is not None and budget <= 0:
+                raise DeadlineExceededError()
+            llm_breaker.before_call()
+            try:
+                result = fn()
+            except Exception as exc:
+                _on_error(exc)
+                delay = _next_delay(policy, attempt, exc)
+            else:
+                llm_breaker.record_success()
+                return result
+        time.sleep(delay)      # backoff never holds the slot
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+@asynccontextmanager
+async def _aqueued(slot: Optional[Callable[[], AsyncContextManager]], budget: Optional[float]):
+    """Hold `slot()` for one attempt; the wait is bounded by the budget."""
+    async with AsyncExitStack() as stack:
+        if slot is not None:
+            try:
+                await asyncio.wait_for(stack.enter_async_context(slot()), timeout=budget)
+            except asyncio.TimeoutError as exc:
+                # Still queued locally – the endpoint was never asked
+                raise DeadlineExceededError(exc) from exc
+        yield
+
+
+async def acall_with_retry(
+    fn: Callable[[], Awaitable[T]],
+    policy: RetryPolicy = DEFAULT_POLICY,
+    slot: Optional[Callable[[], AsyncContextManager]] = None,
+) -> T:
+    """Async driver – never blocks the loop; the call itself honours the deadline."""
+    for attempt in range(1, policy.max_attempts + 1):
+        budget = remaining_budget()
+        if budget is not None and budget <= 0:
+            raise DeadlineExceededError()
+        async with _aqueued(slot, budget):
+            budget = remaining_budget()
+            if budget is not None and budget <= 0:
+                raise DeadlineExceededError()
+            llm_breaker.before_call()
+            try:
+                result = await asyncio.wait_for(fn(), timeout=budget)
+            except asyncio.TimeoutError as exc:
+                llm_breaker.record_failure()
+                raise DeadlineExceededError(exc) from exc
+            except asyncio.CancelledError:
+                llm_breaker.release_probe()
+                raise
+            except Exception as exc:
+                _on_error(exc)
+                delay = _next_delay(policy, attempt, exc)
+            else:
+                llm_breaker.record_success()
+                return result
+        await asyncio.sleep(delay)
+    raise AssertionError("unreachable")  # pragma: no cover
@@ -0,0 +1,224 @@
+"""
+agent/revisions.py
+─────────────────────────────────────────────────────────────────────────────
+Document revision history with delta storage.
+
+Every time a document's content changes a `DocumentRevision` row is added:
+
+• delta     – line-level edit script against the previous version
+              ([[start, end, [new lines…]], …]), JSON + zlib
+• snapshot  – the full text, zlib'd; written for version 1, every
+              REVISION_SNAPSHOT_EVERY versions, and whenever the delta
+              would not be smaller than the snapshot
+
+Reconstructing version N reads the nearest snapshot ≤ N plus the deltas
+after it – at most REVISION_SNAPSHOT_EVERY rows – and verifies the result
+against the stored sha256.  Nothing here calls a model.
+"""
+
+from __future__ import annotations
+
+import difflib
+import hashlib
+import json
+import logging
+import os
+import zlib
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from api.models import Document, DocumentRevision
+
+logger = logging.getLogger("agent.revisions")
+logger.setLevel(logging.DEBUG)
+
+SNAPSHOT_EVERY = max(1, int(os.getenv("REVISION_SNAPSHOT_EVERY", "10")))
+
+
+class RevisionNotFound(LookupError):
+    pass
+
+
+class RevisionCorrupt(ValueError):
+    """Stored rows don't rebuild the recorded content (bad payload or hash)."""
+
+
+# ─────────────────────────────────────────────────────────────
+# Encoding
+# ─────────────────────────────────────────────────────────────
+def _lines(text: str) -> List[str]:
+    return text.splitlines(keepends=True)
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_snapshot(content: str) -> bytes:
+    return zlib.compress(content.encode("utf-8"), 9)
+
+
+def encode_delta(old: str, new: str) -> bytes:
+    old_lines, new_lines = _lines(old), _lines(new)
+    ops = [
+        [i1, i2, new_lines[j1:j2]]
+        for tag, i1, i2, j1, j2
+        in difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes()
+        if tag != "equal"
+    ]
+    return zlib.compress(json.dumps(ops, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def apply_delta(old: str, payload: bytes) -> str:
+    old_lines = _lines(old)
+    out: List[str] = []
+    pos = 0
+    for i1, i2, new_lines in json.loads(zlib.decompress(payload)):
+        out.extend(old_lines[pos:i1])
+        out.extend(new_lines)
+        pos = i2
+    out.extend(old_lines[pos:])
+    return "".join(out)
+
+
+# ─────────────────────────────────────────────────────────────
+# Write path (runs inside the caller's transaction)
+# ─────────────────────────────────────────────────────────────
+def latest_version(db: Session, document_id: int) -> int:
+    return db.query(func.max(DocumentRevision.version))\
+             .filter(DocumentRevision.document_id == document_id)\
+             .scalar() or 0
+
+
+def record_revision(
+    db: Session,
+    doc: Document,
+    content: str,
+    previous: Optional[str] = None,
+    source: str = "draft",
+) -> DocumentRevision:
+    """
+    Add the next revision of `doc` holding `content`.
+
+    `previous` is the content being replaced; when the document has no
+    history yet (pre-existing rows) it is stored first as version 1.
+    Does not commit.
+    """
+    if doc.id is None:
+        db.flush()
+    version = latest_version(db, doc.id)
+    if version == 0 and previous:
+        db.add(_snapshot_row(doc.id, 1, previous, source))
+        version = 1
+
+    if version == 0:
+        rev = _snapshot_row(doc.id, 1, content, source)
+    else:
+        next_version = version + 1
+        snapshot = encode_snapshot(content)
+        if (next_version - 1) % SNAPSHOT_EVERY == 0:
+            delta = None
+        else:
+            delta = encode_delta(previous if previous is not None
+                                 else reconstruct(db, doc.id, version), content)
+        if delta is None or len(delta) >= len(snapshot):
+            rev = _row(doc.id, next_version, "snapshot", snapshot, content, source)
+        else:
+            rev = _row(doc.id, next_version, "delta", delta, content, source)
+
+    db.add(rev)
+    logger.debug("🗂️ doc %s → v%s (%s, %d B)", doc.id, rev.version, rev.kind, len(rev.payload))
+    return rev
+
+
+def _row(doc_id: int, version: int, kind: str, payload: bytes, content: str, source: str):
+    return DocumentRevision(
+        document_id=doc_id, version=version, kind=kind, payload=payload,
+        content_hash=_hash(content), size=len(content), source=source,
+    )
+
+
+def _snapshot_row(doc_id: int, version: int, content: str, source: str):
+    return _row(doc_id, version, "snapshot", encode_snapshot(content), content, source)
+
+
+# ─────────────────────────────────────────────────────────────
+# Read path
+# ─────────────────────────────────────────────────────────────
+def reconstruct(db: Session, document_id: int, version: int) -> str:
+    """Content of `version`: nearest snapshot + the deltas after it."""
+    base = db.query(func.max(DocumentRevision.version))\
+             .filter(DocumentRevision.document_id == document_id,
+                     DocumentRevision.version <= version,
+                     DocumentRevision.kind == "snapshot")\
+             .scalar()
+    if base is None:
+        raise RevisionNotFound(f"document {document_id} has no version {version}")
+
+    rows = db.query(DocumentRevision)\
+             .filter(DocumentRevision.document_id == document_id,
+                     DocumentRevision.version.between(base, version))\
+             .order_by(DocumentRevision.version)\
+             .all()
+    if not rows or rows[-1].version != version:
+        raise RevisionNotFound(f"document {document_id} has no version {version}")
+
+    content = ""
+    for row in rows:
+        try:
+            if row.kind == "snapshot":
+                content = zlib.decompress(row.payload).decode("utf-8")
+            else:
+                content = apply_delta(content, row.payload)
+        except (zlib.error, ValueError, TypeError) as exc:   # undecodable payload
+            raise RevisionCorrupt(
+                f"revision v{row.version} of document {document_id} is corrupt: {exc}"
+            ) from exc
+
+    if _hash(content) != rows[-1].content_hash:
+        raise RevisionCorrupt(f"revision v{version} of document {document_id} is corrupt")
+    return content
+
+
+def list_revisions(db: Session, document_id: int) -> List[Dict[str, Any]]:
+    rows = db.query(DocumentRevision)\
+             .filter(DocumentRevision.document_id == document_id)\
+             .order_by(DocumentRevision.version)\
+             .all()
+    return [
+        {
+            "version":      r.version,
+            "kind":         r.kind,
+            "source":       r.source,
+            "size":         r.size,
+            "stored_bytes": len(r.payload),
+            "content_hash": r.content_hash,
+            "created_at":   str(r.created_at),
+        }
+        for r in rows
+    ]
+
+
+def diff_revisions(db: Session, document_id: int, from_version: int, to_version: int) -> str:
+    """Unified diff between two versions."""
+    old = reconstruct(db, document_id, from_version)
+    new = reconstruct(db, document_id, to_version)
+    return "".join(difflib.unified_diff(
+        _lines(old), _lines(new),
+        fromfile=f"v{from_version}", tofile=f"v{to_version}",
+    ))
+
+
+def restore_revision(db: Session, doc: Document, version: int) -> DocumentRevision:
+    """
+    Make `version` current again.  History is append-only: the restored
+    text becomes a NEW version (source="restore").  Does not commit.
+    """
+    content = reconstruct(db, doc.id, version)
+    if content == doc.content:
+        raise ValueError(f"version {version} is already the current content")
+    rev = record_revision(db, doc, content, previous=doc.content, source="restore")
+    doc.content = content
+    return rev
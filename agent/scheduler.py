@@ -0,0 +1,218 @@
+"""
+agent/scheduler.py
+─────────────────────────────────────────────────────────────────────────────
+Bounded outbound LLM scheduler.
+
+Every model call (`invoke_with_retry` / `ainvoke_with_retry`) takes a slot
+here first:
+
+• global concurrency cap            – LLM_MAX_CONCURRENCY (default 8)
+• priority classes                  – interactive chat turns before drafting
+• per-user fair sharing             – within a class, the user with the
+                                      fewest calls in flight goes next
+• metrics                           – queue depth, wait times (`stats()`)
+
+Works for both sync callers (threads) and async callers (event loop), so
+the cap is shared by `run_agent_step` and `arun_agent_step`.
+
+The current user is carried in a context variable – wrap a turn in
+`llm_user(user_key)`; the stage name picks the priority.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger("agent.scheduler")
+logger.setLevel(logging.DEBUG)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0   # conversational replies – a user is waiting on them
+    DRAFTING    = 1   # drafter / checker / summaries
+
+
+_STAGE_PRIORITY: Dict[str, Priority] = {
+    "conversational": Priority.INTERACTIVE,
+}
+
+
+def stage_priority(stage: Optional[str]) -> Priority:
+    return _STAGE_PRIORITY.get(stage or "", Priority.DRAFTING)
+
+
+_current_user: contextvars.ContextVar[str] = contextvars.ContextVar("llm_user", default="anonymous")
+
+
+@contextmanager
+def llm_user(user_key: Any):
+    """Attribute every LLM call made inside the block to `user_key`."""
+    token = _current_user.set(str(user_key))
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("priority", "user", "seq", "enqueued", "granted", "event", "future", "loop")
+
+    def __init__(self, priority: Priority, user: str, seq: int):
+        self.priority = priority
+        self.user     = user
+        self.seq      = seq
+        self.enqueued = time.perf_counter()
+        self.granted  = False
+        self.event:  Optional[threading.Event] = None
+        self.future: Optional[asyncio.Future]  = None
+        self.loop:   Optional[asyncio.AbstractEventLoop] = None
+
+    def wake(self) -> None:
+        if self.event is not None:
+            self.event.set()
+        elif self.loop is not None:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if self.future is not None and not self.future.done():
+            self.future.set_result(None)
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int = 8):
+        self.max_concurrency = max(1, max_concurrency)
+
+        self._lock      = threading.Lock()
+        self._seq       = itertools.count()
+        self._waiting:  List[_Waiter] = []
+        self._in_flight = 0
+        self._per_user: Dict[str, int] = {}
+
+        # metrics
+        self.granted_total   = 0
+        self.max_queue_depth = 0
+        self.wait_total_s    = 0.0
+        self.wait_max_s      = 0.0
+        self._recent_waits: Deque[float] = deque(maxlen=512)
+
+    # ––– Core bookkeeping (lock held) ––––––––––––––––––––
+    def _grant(self, waiter: _Waiter) -> None:
+        waiter.granted = True
+        self._in_flight += 1
+        self._per_user[waiter.user] = self._per_user.get(waiter.user, 0) + 1
+        waited = time.perf_counter() - waiter.enqueued
+        self.granted_total += 1
+        self.wait_total_s  += waited
+        self.wait_max_s     = max(self.wait_max_s, waited)
+        self._recent_waits.append(waited)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        if not self._waiting:
+            return None
+        best = min(
+            self._waiting,
+            key=lambda w: (w.priority, self._per_user.get(w.user, 0), w.seq),
+        )
+        self._waiting.remove(best)
+        return best
+
+    def _enqueue(self, priority: Priority, user: str) -> _Waiter:
+        """Create a waiter; grants it immediately when a slot is free."""
+        waiter = _Waiter(priority, user, next(self._seq))
+        if self._in_flight < self.max_concurrency and not self._waiting:
+            self._grant(waiter)
+        else:
+            self._waiting.append(waiter)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiting))
+        return waiter
+
+    def _release(self, user: str) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            left = self._per_user.get(user, 1) - 1
+            if left:
+                self._per_user[user] = left
+            else:
+                self._per_user.pop(user, None)
+            nxt = self._next_waiter()
+            if nxt is not None:
+                self._grant(nxt)
+        if nxt is not None:
+            nxt.wake()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """A waiter gave up (cancelled, timed out); hand back its slot if it got one."""
+        with self._lock:
+            if not waiter.granted:
+                self._waiting.remove(waiter)
+                return
+        self._release(waiter.user)
+
+    # ––– Public API ––––––––––––––––––––––––––––––––––––––
+    @contextmanager
+    def slot(self, priority: Priority, user: Optional[str] = None, timeout: Optional[float] = None):
+        """Blocking acquire for sync callers; `TimeoutError` after `timeout` seconds queued."""
+        user = user or _current_user.get()
+        with self._lock:
+            waiter = self._enqueue(priority, user)
+            if not waiter.granted:
+                waiter.event = threading.Event()
+        if waiter.event is not None and not waiter.event.wait(timeout):
+            self._abandon(waiter)
+            raise TimeoutError(f"no LLM slot within {timeout:.1f}s")
+        try:
+            yield
+        finally:
+            self._release(user)
+
+    @asynccontextmanager
+    async def aslot(self, priority: Priority, user: Optional[str] = None):
+        """Non-blocking acquire for coroutines."""
+        user = user or _current_user.get()
+        with self._lock:
+            waiter = self._enqueue(priority, user)
+            if not waiter.granted:
+                waiter.loop   = asyncio.get_running_loop()
+                waiter.future = waiter.loop.create_future()
+        if waiter.future is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release(user)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            depth_by_priority = {p.name.lower(): 0 for p in Priority}
+            for w in self._waiting:
+                depth_by_priority[w.priority.name.lower()] += 1
+            recent = sorted(self._recent_waits)
+            return {
+                "max_concurrency":  self.max_concurrency,
+                "in_flight":        self._in_flight,
+                "queue_depth":      len(self._waiting),
+                "queue_depth_by_priority": depth_by_priority,
+                "max_queue_depth":  self.max_queue_depth,
+                "granted_total":    self.granted_total,
+                "wait_avg_s":       (self.wait_total_s / self.granted_total) if self.granted_total else 0.0,
+                "wait_p95_s":       recent[int(0.95 * (len(recent) - 1))] if recent else 0.0,
+                "wait_max_s":       self.wait_max_s,
+                "active_users":     len(self._per_user),
+            }
+
+
+llm_scheduler = LLMScheduler(int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
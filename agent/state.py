@@ -9,6 +9,8 @@ from typing import Dict, Any
 from pydantic import BaseModel, field_validator
 from pydantic import BaseModel
 
+from agent.field_schema import schema_registry
+
 
 class AgentState(BaseModel):
     # ──────────────────────────────
@@ -20,6 +22,12 @@ class AgentState(BaseModel):
     is_drafted: bool = False                  # True ⇢ draft has been generated
     missing_prompt_count: int = 0             # Times user has been asked for missing details
 
+    # ──────────────────────────────
+    # Memory bookkeeping (MEMORY_MODE=summary)
+    # ──────────────────────────────
+    history_summary: str = ""                 # Rolling summary of folded turns
+    summarized_messages: int = 0              # Oldest N messages folded into it
+
     # ──────────────────────────────
     # Validation – ensure string values
     # ──────────────────────────────
@@ -56,5 +64,12 @@ class AgentState(BaseModel):
         """Compact one-liner for LLM context injection."""
         typed = self.document_type or "—"
         drafted = "yes" if self.is_drafted else "no"
-        return (f"type={typed}, drafted={drafted}, "
+        line = (f"type={typed}, drafted={drafted}, "
                 f"fields={list(self.needed_fields.keys())}")
+        # Still collecting: name every field the type's schema wants
+        if not self.is_drafted:
+            readiness = schema_registry.check(self.document_type, self.needed_fields)
+            gaps = readiness.summary() if readiness else ""
+            if gaps:
+                line += f", {gaps}"
+        return line
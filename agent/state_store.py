@@ -0,0 +1,117 @@
+"""
+agent/state_store.py
+─────────────────────────────────────────────────────────────────────────────
+Structured storage for `AgentState`: one `conversation_state` row per
+field instead of a JSON blob in `conversations.state`.
+
+• save_state  – writes only the fields whose encoded value changed; when
+                the draft equals the conversation's document it is stored
+                as a reference (NULL) to `documents.content`, so a large
+                draft is written once per turn, not twice
+• load_state  – rebuilds the state from its rows without re-running
+                validation (every value was validated before it was
+                saved); conversations that still only have the legacy
+                blob are parsed from it and migrated on their next save
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from agent.state import AgentState
+from api.models import Conversation, ConversationStateField, Document
+
+logger = logging.getLogger("agent.state_store")
+logger.setLevel(logging.DEBUG)
+
+DRAFT_KEY = "draft"
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _document_content(db: Session, conversation_id: int) -> Optional[str]:
+    return db.scalar(select(Document.content).where(Document.conversation_id == conversation_id))
+
+
+def _legacy_state(raw: Optional[str]) -> AgentState:
+    try:
+        data = json.loads(raw) if raw else None
+    except (TypeError, ValueError):
+        data = None
+    return AgentState(**data) if isinstance(data, dict) else AgentState()
+
+
+# ─────────────────────────────────────────────────────────────
+# Load
+# ─────────────────────────────────────────────────────────────
+def load_state(db: Session, conv: Conversation) -> AgentState:
+    """The conversation's AgentState (defaults when nothing is stored)."""
+    rows = db.execute(
+        select(ConversationStateField.key, ConversationStateField.value)
+        .where(ConversationStateField.conversation_id == conv.id)
+    ).all()
+    if not rows:
+        return _legacy_state(conv.state)
+
+    fields: Dict[str, Any] = {}
+    for key, value in rows:
+        if key not in AgentState.model_fields:
+            continue   # field since removed from the model
+        if value is None:
+            fields[key] = _document_content(db, conv.id) or ""
+        else:
+            fields[key] = json.loads(value)
+    return AgentState.model_construct(**fields)
+
+
+# ─────────────────────────────────────────────────────────────
+# Save
+# ─────────────────────────────────────────────────────────────
+def save_state(
+    db: Session,
+    conv: Conversation,
+    state: AgentState,
+    document_content: Optional[str] = None,
+) -> int:
+    """
+    Stage the changed fields of `state` on `db` (no commit); returns how
+    many rows were written.  Pass the document content when the caller
+    already has it, otherwise it is read only if the draft is non-empty.
+    """
+    stored = {
+        row.key: row
+        for row in db.scalars(
+            select(ConversationStateField).where(ConversationStateField.conversation_id == conv.id)
+        )
+    }
+    if state.draft and document_content is None:
+        document_content = _document_content(db, conv.id)
+
+    written = 0
+    for key in AgentState.model_fields:
+        value = getattr(state, key)
+        if key == DRAFT_KEY and value and value == document_content:
+            encoded = None   # → documents.content
+        else:
+            encoded = _encode(value)
+
+        row = stored.get(key)
+        if row is None:
+            db.add(ConversationStateField(conversation_id=conv.id, key=key, value=encoded))
+        elif row.value != encoded:
+            row.value = encoded
+        else:
+            continue
+        written += 1
+
+    if conv.state is not None:
+        conv.state = None   # migrated off the legacy blob
+    logger.debug("🧩 State for conv_id=%s: %d field(s) written", conv.id, written)
+    return written
@@ -2,11 +2,13 @@
 Shared helper utilities for the legal-assistant agent.
 
 • invoke_with_retry        – resilient LLM / chain invocation
+• ainvoke_with_retry       – async twin built on `ainvoke`
 • _clean_llm_text          – strips <think> blocks, markdown fences, whitespace
-• _first_json_block        – extracts first {...} that contains a key
 • safe_parse_json_block    – tolerant JSON→dict loader
-• salvage_json             – multi-strategy JSON extraction fallback
-• detect_placeholders      – finds tokens like [DATE], [NAME]
+• salvage_json             – linear-time scan for the object carrying a key
+• parse_model_json         – shared decode path for every stage's output
+• detect_placeholders      – finds [DATE], {{name}}, ____, “Your Name” …
+• count_tokens             – tiktoken count (≈ chars/4 when unavailable)
 • strip_llm_fluff          – removes “Here is …” boilerplate
 • is_finalization_command  – simplistic “sign-off” detector
 """
@@ -14,182 +16,391 @@ Shared helper utilities for the legal-assistant agent.
 from __future__ import annotations
 
 import ast
+import asyncio
 import json
 import logging
+import os
 import re
-import time
+from dataclasses import replace
 from typing import Any, Dict, List, Optional
 
+from agent.metrics import JSON_DECODE, LLM_CALLS, LLM_RETRIES, LLM_TOKENS
+from agent.retry import DEFAULT_POLICY, RetryPolicy, acall_with_retry, call_with_retry
+from agent.scheduler import llm_scheduler, stage_priority
+
 logger = logging.getLogger("agent.utils")
 logger.setLevel(logging.DEBUG)
 
+# Token counters come from the provider's usage report (the client asks for
+# it, see agent/llm.py).  The local tiktoken estimate for calls without one
+# re-renders and tokenises the whole prompt, so it is opt-in.
+TOKEN_ESTIMATE = os.getenv("LLM_TOKEN_ESTIMATE", "off").strip().lower() not in ("0", "off", "false", "no")
+
 # ────────────────────────────────────────────────────────────
 # Retry wrapper
 # ────────────────────────────────────────────────────────────
+def _policy(max_retries: Optional[int]) -> RetryPolicy:
+    return DEFAULT_POLICY if max_retries is None else replace(DEFAULT_POLICY, max_attempts=max_retries)
+
+
+def _invoke_once(chain_or_runnable, inputs: Dict[str, Any]):
+    if hasattr(chain_or_runnable, "invoke"):
+        return chain_or_runnable.invoke(inputs)
+
+    if hasattr(chain_or_runnable, "run"):
+        if isinstance(inputs, dict):
+            return chain_or_runnable.run(**inputs)
+        return chain_or_runnable.run(inputs)
+
+    return chain_or_runnable(inputs)
+
+
 def invoke_with_retry(
     chain_or_runnable,
     inputs: Dict[str, Any],
-    max_retries: int = 100,
+    max_retries: Optional[int] = None,
 ):
     """
     Invoke *any* LangChain object (Runnable, Chain, or plain callable)
-    with simple exponential-backoff retry.
+    through `agent.retry` (jittered backoff, turn deadline, circuit
+    breaker).  Each attempt holds an `llm_scheduler` slot; backoff sleeps
+    do not.
     """
-    for attempt in range(1, max_retries + 1):
-        try:
-            if hasattr(chain_or_runnable, "invoke"):
-                return chain_or_runnable.invoke(inputs)
-
-            if hasattr(chain_or_runnable, "run"):
-                if isinstance(inputs, dict):
-                    return chain_or_runnable.run(**inputs)
-                return chain_or_runnable.run(inputs)
-
-            return chain_or_runnable(inputs)
-
-        except Exception as exc:
-            # Retry logic only for transient HTTP 503 / rate-limit style errors
-            transient = False
-            msg = str(exc).lower()
-            if "status code: 503" in msg or "503" in msg:
-                transient = True
-            if "rate limit" in msg or "temporarily unavailable" in msg:
-                transient = True
-
-            if not transient:
-                raise  # propagate other errors immediately
-
-            logger.warning(
-                "⚠️ invoke_with_retry (%d/%d transient) failed: %s",
-                attempt,
-                max_retries,
-                exc,
-            )
-            if attempt == max_retries:
-                raise
-            # Exponential backoff: 10s * attempt
-            time.sleep(10 * attempt)
+    stage    = getattr(chain_or_runnable, "name", None)
+    priority = stage_priority(stage)
+    attempts = 0
+
+    def attempt():
+        nonlocal attempts
+        attempts += 1
+        return _invoke_once(chain_or_runnable, inputs)
+
+    try:
+        result = call_with_retry(
+            attempt, _policy(max_retries),
+            slot=lambda timeout: llm_scheduler.slot(priority, timeout=timeout),
+        )
+    except BaseException as exc:
+        _record_call(stage, attempts, type(exc).__name__)
+        raise
+    _record_call(stage, attempts, "ok", chain_or_runnable, inputs, result)
+    return result
+
+
+async def ainvoke_with_retry(
+    chain_or_runnable,
+    inputs: Dict[str, Any],
+    max_retries: Optional[int] = None,
+    config: Optional[Dict[str, Any]] = None,
+):
+    """
+    Async twin of `invoke_with_retry`: awaits `ainvoke` and backs off with
+    `asyncio.sleep`, so a waiting turn never holds a worker thread.
+
+    `config` is forwarded to `ainvoke` (e.g. `{"callbacks": [...]}` for
+    token streaming).
+    """
+    if not hasattr(chain_or_runnable, "ainvoke"):
+        # Plain callables / legacy chains – keep them off the event loop
+        return await asyncio.to_thread(
+            invoke_with_retry, chain_or_runnable, inputs, max_retries
+        )
+
+    stage    = getattr(chain_or_runnable, "name", None)
+    priority = stage_priority(stage)
+    attempts = 0
+
+    async def attempt():
+        nonlocal attempts
+        attempts += 1
+        return await chain_or_runnable.ainvoke(inputs, config=config)
+
+    try:
+        result = await acall_with_retry(
+            attempt, _policy(max_retries), slot=lambda: llm_scheduler.aslot(priority),
+        )
+    except BaseException as exc:
+        _record_call(stage, attempts, type(exc).__name__)
+        raise
+    _record_call(stage, attempts, "ok", chain_or_runnable, inputs, result)
+    return result
+
+
+def _record_call(
+    stage: Optional[str],
+    attempts: int,
+    outcome: str,
+    chain: Any = None,
+    inputs: Optional[Dict[str, Any]] = None,
+    result: Any = None,
+) -> None:
+    """Call / retry / token counters for one (possibly retried) LLM call."""
+    stage = stage or "unknown"
+    LLM_CALLS.inc(stage=stage, outcome=outcome)
+    if attempts > 1:
+        LLM_RETRIES.inc(attempts - 1, stage=stage)
+    if outcome != "ok":
+        return
+
+    usage = getattr(result, "usage_metadata", None) or {}
+    prompt_tokens = usage.get("input_tokens")
+    completion_tokens = usage.get("output_tokens")
+    if TOKEN_ESTIMATE:
+        if prompt_tokens is None and hasattr(chain, "prompt") and isinstance(inputs, dict):
+            try:
+                prompt_tokens = count_tokens(chain.prompt.format(**inputs))
+            except Exception:   # extra / missing inputs – skip the estimate
+                prompt_tokens = None
+        if completion_tokens is None:
+            content = getattr(result, "content", result)
+            completion_tokens = count_tokens(content if isinstance(content, str) else str(content))
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, stage=stage, kind="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, stage=stage, kind="completion")
 
 # ────────────────────────────────────────────────────────────
 # Text-cleanup helpers
 # ────────────────────────────────────────────────────────────
 _THINK_END_RE        = re.compile(r"</think>", re.IGNORECASE)
 _CODE_FENCE_START_RE = re.compile(r"^\s*```[a-zA-Z0-9_-]*\s*")
-_CODE_FENCE_END_RE   = re.compile(r"\s*```\s*$")
 
 def _clean_llm_text(text: str) -> str:
     """
     Strip <think> … </think> blocks *and* leading / trailing code fences.
     """
-    m = list(_THINK_END_RE.finditer(text))
+    m = None
+    for m in _THINK_END_RE.finditer(text):
+        pass
     if m:
-        text = text[m[-1].end():]
+        text = text[m.end():]
 
-    text = _CODE_FENCE_START_RE.sub("", text)
-    text = _CODE_FENCE_END_RE.sub("", text)
+    m = _CODE_FENCE_START_RE.match(text)
+    if m:
+        text = text[m.end():]
+    text = text.strip()
+    if text.endswith("```"):
+        text = text[:-3]
     return text.strip()
 
 # ────────────────────────────────────────────────────────────
-# Balanced-brace JSON extraction helpers
+# JSON extraction – one linear scan, one decode path
 # ────────────────────────────────────────────────────────────
-def _iterate_json_candidates(text: str):
-    depth   = 0
-    start   = None
-    in_str  = False
-    escape  = False
+# Only these characters matter to the scanner; everything between them is
+# skipped by the regex engine instead of a Python-level loop.
+_STRUCT_RE    = re.compile(r"""[{}"']""")
+_STRING_BODY_RE = {                # literal body; always matches → no backtracking
+    '"': re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.S),
+    "'": re.compile(r"[^'\\]*(?:\\.[^'\\]*)*", re.S),
+}
+_KEY_COLON_RE = re.compile(r"\s*:")
 
-    for i, ch in enumerate(text):
-        if ch == '"' and not escape:
-            in_str = not in_str
-        escape = (ch == "\\" and not escape)
 
-        if in_str:
+def _scan_objects(text: str, required_key: Optional[str] = None):
+    """
+    Single O(n) pass over `text` yielding `(start, end, has_key)` for every
+    balanced `{…}` object, outermost first.  `has_key` is True when the
+    object itself (not a nested one) has `required_key` as a key.
+
+    String literals ('…' or "…", backslash escapes) inside objects are
+    jumped over with one regex match each, so braces inside drafts never
+    confuse the depth count; quotes in surrounding prose are ignored.
+    """
+    stack: List[List[Any]] = []     # [start, has_key] per open object
+    found: List[tuple[int, int, bool]] = []
+    pos, n = 0, len(text)
+
+    while pos < n:
+        if not stack:
+            i = text.find("{", pos)
+            if i == -1:
+                break
+            stack.append([i, False])
+            pos = i + 1
             continue
 
+        m = _STRUCT_RE.search(text, pos)
+        if m is None:
+            break
+        i, ch = m.start(), m.group()
         if ch == "{":
-            if depth == 0:
-                start = i
-            depth += 1
+            stack.append([i, False])
         elif ch == "}":
-            depth -= 1
-            if depth == 0 and start is not None:
-                yield text[start : i + 1]
-                start = None
+            start, has_key = stack.pop()
+            found.append((start, i + 1, has_key))
+        else:
+            # Jump over the whole literal in one regex match
+            j = _STRING_BODY_RE[ch].match(text, i + 1).end()
+            if j >= n:
+                break                                # unterminated string
+            if (required_key is not None
+                    and text[i + 1:j] == required_key
+                    and _KEY_COLON_RE.match(text, j + 1)):
+                stack[-1][1] = True
+            i = j
+        pos = i + 1
+
+    # Closed inner objects come first in `found`; order outermost-first
+    found.sort(key=lambda span: span[0])
+    return found
+
+
+def _iterate_json_candidates(text: str):
+    """Top-level balanced `{…}` blocks, in order of appearance."""
+    end = -1
+    for start, stop, _ in _scan_objects(text):
+        if start >= end:
+            end = stop
+            yield text[start:stop]
+
 
 _SINGLE_TO_DOUBLE_RE = re.compile(r"'([^']+?)'")
+_LENIENT_JSON        = json.JSONDecoder(strict=False)   # raw newlines in strings
+_TRAILING_COMMA_RE   = re.compile(r",\s*([}\]])")
 
 def safe_parse_json_block(block: str) -> Optional[Dict[str, Any]]:
+    """
+    Tolerant JSON→dict loader – the one decode path every stage uses.
+
+    json (raw newlines allowed) → quote rewrite → Python literal
+    (single quotes, True/None) → trailing-comma repair.
+    """
+    return _decode_block(block)[0]
+
+
+def _decode_block(block: str) -> tuple[Optional[Dict[str, Any]], str]:
+    """`safe_parse_json_block` + the name of the decoder that succeeded."""
+    block = block.strip()
+    if not block.startswith("{"):
+        return None, "none"
     try:
-        return json.loads(block)
+        return _as_dict(_LENIENT_JSON.decode(block)), "json"
     except json.JSONDecodeError:
         pass
 
     try:
-        converted = _SINGLE_TO_DOUBLE_RE.sub(r'"\1"', block)
-        return json.loads(converted)
+        return _as_dict(_LENIENT_JSON.decode(_SINGLE_TO_DOUBLE_RE.sub(r'"\1"', block))), "quote_rewrite"
     except json.JSONDecodeError:
         pass
 
     try:
-        return ast.literal_eval(block)
+        return _as_dict(ast.literal_eval(block)), "literal_eval"
     except Exception:
-        return None
+        pass
+
+    try:
+        return _as_dict(_LENIENT_JSON.decode(_TRAILING_COMMA_RE.sub(r"\1", block))), "trailing_comma"
+    except json.JSONDecodeError:
+        return None, "none"
+
+
+def _as_dict(value: Any) -> Optional[Dict[str, Any]]:
+    return value if isinstance(value, dict) else None
 
-# ────────────────────────────────────────────────────────────
-# Fallback JSON-extraction strategies
-# ────────────────────────────────────────────────────────────
-_JSON_FENCE_RE = re.compile(
-    r"```json\s*({[\s\S]+?})\s*```",
-    re.IGNORECASE,
-)
 
 def salvage_json(text: str, required_key: str = "destination") -> Optional[Dict[str, Any]]:
     """
-    Robust, multi-strategy JSON extraction.
-
-    • `required_key` – only return a dict that contains this key
-                       (defaults to "destination" for router output).
+    Outermost decodable object that has `required_key` as one of its own
+    keys (defaults to "destination" for router output).  One linear scan;
+    only objects that actually carry the key are decoded.
     """
-    # 1) ```json … ``` fenced blocks
-    for m in _JSON_FENCE_RE.finditer(text):
-        block  = m.group(1)
-        parsed = safe_parse_json_block(block)
-        if parsed and required_key in parsed:
-            logger.debug("🛟 Salvaged JSON from fenced block.")
-            return parsed
+    return _salvage(text, required_key)[0]
+
 
-    # 2) Any balanced { … } group
-    for block in _iterate_json_candidates(text):
-        if f'"{required_key}"' not in block and f"'{required_key}'" not in block:
+def _salvage(text: str, required_key: str) -> tuple[Optional[Dict[str, Any]], str]:
+    for start, stop, has_key in _scan_objects(text, required_key):
+        if not has_key:
             continue
-        parsed = safe_parse_json_block(block)
-        if parsed and required_key in parsed:
-            logger.debug("🛟 Salvaged JSON from balanced scan.")
+        parsed, decoder = _decode_block(text[start:stop])
+        if parsed is not None and required_key in parsed:
+            logger.debug("🛟 Salvaged JSON with key %r.", required_key)
+            return parsed, decoder
+    return None, "none"
+
+
+def parse_model_json(text: str, required_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Shared decode path for model outputs (conversational, drafter,
+    reviser, checker): strip <think>/fences, try the whole text as JSON,
+    else salvage the object carrying `required_key`.
+
+    Counts which path won in `agent_json_decode_total{key,source,decoder}`
+    (source: whole | scan | failed).
+    """
+    cleaned = _clean_llm_text(text)
+    if cleaned.startswith("{") and cleaned.endswith("}"):
+        parsed, decoder = _decode_block(cleaned)
+        if parsed is not None and required_key in parsed:
+            JSON_DECODE.inc(key=required_key, source="whole", decoder=decoder)
             return parsed
+    parsed, decoder = _salvage(cleaned, required_key)
+    JSON_DECODE.inc(key=required_key, source="scan" if parsed is not None else "failed", decoder=decoder)
+    return parsed
 
-    # 3) Reverse scan – last brace group containing the key
-    idx = text.rfind("}")
-    while idx != -1:
-        start = text.rfind("{", 0, idx)
-        if start == -1:
-            break
-        block = text[start : idx + 1]
-        if f'"{required_key}"' in block or f"'{required_key}'" in block:
-            parsed = safe_parse_json_block(block)
-            if parsed and required_key in parsed:
-                logger.debug("🛟 Salvaged JSON from reverse scan.")
-                return parsed
-        idx = text.rfind("}", 0, start)
+# ────────────────────────────────────────────────────────────
+# Token counting
+# ────────────────────────────────────────────────────────────
+_ENCODING: Any = None
+_ENCODING_TRIED = False
 
-    return None
+def count_tokens(text: str) -> int:
+    """
+    Token count for budgeting / reporting.  Uses tiktoken's cl100k_base
+    when it can be loaded, else the usual ~4 characters per token estimate.
+    """
+    global _ENCODING, _ENCODING_TRIED
+    if not text:
+        return 0
+    if not _ENCODING_TRIED:
+        _ENCODING_TRIED = True
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding("cl100k_base")
+        except Exception as exc:  # not installed / no network for the BPE file
+            logger.debug("tiktoken unavailable (%s) – estimating tokens", exc)
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
 
 # ────────────────────────────────────────────────────────────
 # Misc helpers
 # ────────────────────────────────────────────────────────────
-_PLACEHOLDER_RE = re.compile(r"\[[A-Z0-9_]+\]")
+# Unambiguous – nothing in a finished draft looks like these
+_PLACEHOLDER_RE = re.compile(
+    r"\[\s*[A-Z](?:[A-Z0-9_'./&-]|\s+(?=[A-Z0-9]))+\s*\]"              # [DATE] [PARTY A]
+    r"|\[\s*(?:Your|Insert|Enter)\s[^\]\n]{1,48}\]"                      # [Your Name]
+    r"|\{\{\s*[A-Za-z_][A-Za-z0-9 _.-]{0,48}\}\}"                        # {{ date }}
+    r"|<\s*[A-Z][A-Z0-9 _-]{1,48}>"                                     # <PARTY A>
+)
+# Ambiguous – also legitimate text: "Signed: ______", "see Schedule [A]",
+# "[a]" sub-clauses, "Your Honour", "Enter Into This Agreement"
+_MAYBE_PLACEHOLDER_RE = re.compile(
+    r"\[\s*[A-Za-z][A-Za-z0-9 _'./&-]{0,48}\]"                          # [a] [Tenant Name]
+    r"|\{\s*[A-Za-z_][A-Za-z0-9 _.-]{0,48}\}"                           # {name}
+    r"|_{3,}"                                                          # ______ blanks
+    r"|\b(?:Your|Insert|Enter)\s+(?:[A-Z][a-z]+)(?:\s+[A-Z][a-z]+)?\b"   # Your Name
+)
+_NOT_PLACEHOLDER = {"[sic]"}
 
-def detect_placeholders(doc: str) -> List[str]:
-    return list(dict.fromkeys(_PLACEHOLDER_RE.findall(doc)))
+def _unique(matches) -> List[str]:
+    found = (m.group(0) for m in matches)
+    return list(dict.fromkeys(t for t in found if t.lower() not in _NOT_PLACEHOLDER))
+
+def detect_placeholders(doc: str, certain: bool = False) -> List[str]:
+    """
+    Unique placeholder-looking tokens, in order of first appearance.
+
+    `certain=True` keeps only the unambiguous ones ([DATE], {{x}}, <PARTY>);
+    otherwise blanks, bracketed letters and “Your Name” phrases count too.
+    """
+    sure = list(_PLACEHOLDER_RE.finditer(doc))
+    if certain:
+        return _unique(sure)
+    maybe = [
+        m for m in _MAYBE_PLACEHOLDER_RE.finditer(doc)
+        if not any(s.start() < m.end() and m.start() < s.end() for s in sure)
+    ]
+    return _unique(sorted(sure + maybe, key=lambda m: m.start()))
 
 _FLUFF_RE = re.compile(
     r"^\s*(Here is|Below is|Sure[,:\-]?|Certainly[,:\-]?|Here's the)\b[^\n]*\n+",
@@ -0,0 +1,43 @@
+"""history indexes: messages(conversation_id, timestamp), documents(conversation_id)
+
+Revision ID: 0001_history_indexes
+Revises:
+Create Date: 2026-10-18
+
+Tables are still created by `Base.metadata.create_all` on startup, which
+also creates these indexes on a fresh database – so every step checks
+what already exists and only adds what is missing.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_history_indexes"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    # (name, table, columns, unique)
+    ("ix_messages_conversation_id_timestamp", "messages", ["conversation_id", "timestamp"], False),
+    ("ix_documents_conversation_id", "documents", ["conversation_id"], True),
+)
+
+
+def _existing(table: str) -> set:
+    insp = sa.inspect(op.get_bind())
+    if table not in insp.get_table_names():
+        return set()
+    return {ix["name"] for ix in insp.get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns, unique in INDEXES:
+        if name not in _existing(table):
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade() -> None:
+    for name, table, _columns, _unique in reversed(INDEXES):
+        if name in _existing(table):
+            op.drop_index(name, table_name=table)
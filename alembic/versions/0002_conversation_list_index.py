@@ -0,0 +1,31 @@
+"""conversation list index: conversations(user_id, created_at)
+
+Revision ID: 0002_conversation_list_index
+Revises: 0001_history_indexes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_conversation_list_index"
+down_revision = "0001_history_indexes"
+branch_labels = None
+depends_on = None
+
+NAME, TABLE, COLUMNS = "ix_conversations_user_id_created_at", "conversations", ["user_id", "created_at"]
+
+
+def _exists() -> bool:
+    insp = sa.inspect(op.get_bind())
+    return TABLE in insp.get_table_names() and NAME in {ix["name"] for ix in insp.get_indexes(TABLE)}
+
+
+def upgrade() -> None:
+    if not _exists():
+        op.create_index(NAME, TABLE, COLUMNS)
+
+
+def downgrade() -> None:
+    if _exists():
+        op.drop_index(NAME, table_name=TABLE)
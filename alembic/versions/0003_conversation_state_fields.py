@@ -0,0 +1,88 @@
+"""conversation_state: AgentState as one row per field
+
+Revision ID: 0003_conversation_state_fields
+Revises: 0002_conversation_list_index
+Create Date: 2026-10-18
+
+Creates the table when `create_all` has not already done so, then moves
+every `conversations.state` blob into it.  A draft equal to the
+conversation's document is stored as NULL (a reference to
+`documents.content`), as `agent.state_store.save_state` does.
+Downgrade folds the rows back into blobs.
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_conversation_state_fields"
+down_revision = "0002_conversation_list_index"
+branch_labels = None
+depends_on = None
+
+TABLE = "conversation_state"
+
+conversations = sa.table(
+    "conversations", sa.column("id", sa.Integer), sa.column("state", sa.Text),
+)
+documents = sa.table(
+    "documents", sa.column("conversation_id", sa.Integer), sa.column("content", sa.Text),
+)
+state_fields = sa.table(
+    TABLE,
+    sa.column("conversation_id", sa.Integer),
+    sa.column("key", sa.String),
+    sa.column("value", sa.Text),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if TABLE not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            TABLE,
+            sa.Column("conversation_id", sa.Integer, sa.ForeignKey("conversations.id"), primary_key=True),
+            sa.Column("key", sa.String(50), primary_key=True),
+            sa.Column("value", sa.Text),
+        )
+
+    blobs = bind.execute(
+        sa.select(conversations.c.id, conversations.c.state, documents.c.content)
+        .select_from(conversations.outerjoin(documents, documents.c.conversation_id == conversations.c.id))
+        .where(conversations.c.state.isnot(None))
+    ).all()
+    for conv_id, raw, content in blobs:
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            bind.execute(state_fields.delete().where(state_fields.c.conversation_id == conv_id))
+            bind.execute(state_fields.insert(), [
+                {
+                    "conversation_id": conv_id,
+                    "key": key,
+                    "value": None if key == "draft" and value and value == content
+                             else json.dumps(value, ensure_ascii=False),
+                }
+                for key, value in data.items()
+            ])
+        bind.execute(conversations.update().where(conversations.c.id == conv_id).values(state=None))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(state_fields.c.conversation_id, state_fields.c.key, state_fields.c.value, documents.c.content)
+        .select_from(state_fields.outerjoin(documents, documents.c.conversation_id == state_fields.c.conversation_id))
+    ).all()
+    blobs: dict = {}
+    for conv_id, key, value, content in rows:
+        blobs.setdefault(conv_id, {})[key] = (content or "") if value is None else json.loads(value)
+    for conv_id, data in blobs.items():
+        bind.execute(
+            conversations.update().where(conversations.c.id == conv_id)
+            .values(state=json.dumps(data, ensure_ascii=False))
+        )
+    op.drop_table(TABLE)
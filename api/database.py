@@ -1,8 +1,13 @@
 #api/database.py
 
-from sqlalchemy import create_engine
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 from dotenv import load_dotenv
 
@@ -13,14 +18,177 @@ DATABASE_URL = os.getenv(
     "sqlite:////data/test.db" if os.getenv("SPACE_ID") else "sqlite:///./test.db"
 ) if os.getenv("SPACE_ID") else "sqlite:///./test.db"
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+# ------------------------------------------------------------
+# ⚙️  Engine profile
+# ------------------------------------------------------------
+# DB_ENGINE_PROFILE=production (default) – SQLite runs in WAL mode with
+#   synchronous=NORMAL and a busy timeout, write units opened with
+#   `begin_write` take the write lock up front (BEGIN IMMEDIATE) so
+#   concurrent turns queue on the busy timeout instead of failing with
+#   "database is locked", and the connection pool is sized for
+#   concurrent requests.
+# DB_ENGINE_PROFILE=default – plain `create_engine`, as before.
+ENGINE_PROFILE         = os.getenv("DB_ENGINE_PROFILE", "production").lower()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS     = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_CACHE_SIZE_KB   = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+SQLITE_BEGIN           = os.getenv("SQLITE_BEGIN", "DEFERRED").upper()    # all other transactions
+DB_POOL_SIZE           = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW        = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT        = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE        = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+
+def _sqlite_pragmas() -> tuple:
+    return (
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        "PRAGMA temp_store=MEMORY",
+    )
+
+
+def _install_sqlite_profile(engine: Engine, gate: bool = True) -> None:
+    pragmas = _sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        # Let SQLAlchemy emit BEGIN itself (pysqlite would defer it)
+        dbapi_conn.isolation_level = None
+        cur = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cur.execute(pragma)
+        cur.close()
+
+    # SQLite's own busy handler polls with sleeps of up to 100 ms, so
+    # queued writers wake late and out of order; in-process writers queue
+    # on a lock instead and only cross-process contention hits the handler.
+    write_gate = threading.Lock()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        mode = conn.get_execution_options().get("sqlite_begin", SQLITE_BEGIN)
+        if mode == "IMMEDIATE" and gate:
+            if not write_gate.acquire(timeout=SQLITE_BUSY_TIMEOUT_MS / 1000):
+                raise OperationalError("BEGIN IMMEDIATE", None,
+                                       Exception("database is locked (write queue timeout)"))
+            conn.info["write_gate"] = True
+        try:
+            conn.exec_driver_sql(f"BEGIN {mode}")
+        except BaseException:
+            _release(conn)
+            raise
+
+    def _release(conn):
+        if conn.info.pop("write_gate", False):
+            write_gate.release()
+
+    event.listen(engine, "commit", _release)
+    event.listen(engine, "rollback", _release)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(_dbapi_conn, record):
+        # Safety net: a connection never leaves the pool holding the gate
+        if record.info.pop("write_gate", False):
+            write_gate.release()
+
+
+def _engine_kwargs(url: str, profile: str, sync: bool) -> dict:
+    sqlite = url.startswith("sqlite")
+    if profile != "production":
+        return {"connect_args": {"check_same_thread": False}} if sqlite and sync else {}
+
+    pool = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    if not sqlite:
+        return {**pool, "pool_recycle": DB_POOL_RECYCLE, "pool_pre_ping": True}
+
+    connect_args = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    if sync:
+        connect_args["check_same_thread"] = False
+    in_memory = url.split("://", 1)[1] in ("", "/:memory:") or "mode=memory" in url
+    # In-memory databases keep SQLAlchemy's default (per-thread / static) pool
+    return {"connect_args": connect_args, **({} if in_memory else pool)}
+
+
+def make_engine(url: str = DATABASE_URL, profile: str = ENGINE_PROFILE) -> Engine:
+    """Engine for `url` configured by `profile` ("production" | "default")."""
+    engine = create_engine(url, **_engine_kwargs(url, profile, sync=True))
+    if profile == "production" and url.startswith("sqlite"):
+        _install_sqlite_profile(engine)
+    return engine
+
+
+engine = make_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# ------------------------------------------------------------
+# ⚡ Async engine (aiosqlite / asyncpg)
+# ------------------------------------------------------------
+# Routers and the async memory loader await their queries here instead
+# of borrowing threadpool workers.  ASYNC_DATABASE_URL defaults to
+# DATABASE_URL with the async driver swapped in.
+_ASYNC_DRIVERS = {
+    "sqlite":     "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres":   "postgresql+asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """`url` with its async driver (sqlite → aiosqlite, postgresql → asyncpg)."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in _ASYNC_DRIVERS or scheme in _ASYNC_DRIVERS.values():
+        return url
+    return f"{_ASYNC_DRIVERS[dialect]}{sep}{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+
+
+def make_async_engine(url: str = ASYNC_DATABASE_URL, profile: str = ENGINE_PROFILE) -> AsyncEngine:
+    """
+    Async twin of `make_engine`.  SQLite gets the same pragmas and BEGIN
+    handling, but no in-process write gate – a threading lock would stall
+    the event loop; writers wait on the busy timeout in aiosqlite's thread.
+    """
+    engine = create_async_engine(url, **_engine_kwargs(url, profile, sync=False))
+    if profile == "production" and url.startswith("sqlite"):
+        _install_sqlite_profile(engine.sync_engine, gate=False)
+    return engine
+
+
+async_engine = make_async_engine()
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False,
+)
+
 Base = declarative_base()
 
+def begin_write(db: Session) -> None:
+    """
+    Open `db`'s next transaction as a write transaction.
+
+    A read-then-write unit that starts DEFERRED upgrades its read snapshot
+    to a write lock at the first INSERT/UPDATE; if another turn committed
+    in between, SQLite fails it with "database is locked" right away – the
+    busy timeout does not apply.  BEGIN IMMEDIATE takes the write lock
+    first and waits on the busy timeout instead.  Any read transaction
+    the session still holds (e.g. from loading the conversation before
+    the LLM call) is ended first.  Readers are unaffected under WAL.
+    """
+    if db.in_transaction():
+        db.commit()
+    db.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+
+
 # ------------------------------------------------------------
 # 🛠️  Lightweight auto-migration for SQLite (add missing columns)
 # ------------------------------------------------------------
@@ -66,3 +234,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,23 +1,94 @@
 import os
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 
 from api.database import Base, engine
 from api.routers.conversation import router as conversation_router
 from api.routers.agent import router as agent_router
 from api.routers.document import router as document_router
+from agent.chains.registry import warm_up as warm_up_chains
+from agent.retry import LLMUnavailableError
+from agent.jobs import draft_jobs
+from agent.metrics import HTTP_SECONDS, register_stats, render as render_metrics
+from agent.llm_cache import llm_cache
+from agent.scheduler import llm_scheduler
+from agent.retry import llm_breaker
+from agent.history_cache import history_cache
+from agent.memory import prompt_token_stats
+from agent.doc_templates import template_registry
+from agent.field_schema import schema_registry
 
 # Initialize DB tables
 Base.metadata.create_all(bind=engine)
 
+# ─────────────────────────────
+# 🚦 Startup / shutdown
+# ─────────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up_chains()   # compile every chain stage once, log setup benchmark
+    template_registry.templates()   # load + validate draft templates now, not mid-turn
+    schema_registry.schemas()       # … and the field schemas built on them
+    yield
+    await draft_jobs.shutdown()
+
+
 app = FastAPI(
     title="AgreeUpon API",
     version="1.0.0",
-    description="Agentic AI-Powered Legal Document Drafter for Canadian Law"
+    description="Agentic AI-Powered Legal Document Drafter for Canadian Law",
+    lifespan=lifespan,
 )
 
+# ─────────────────────────────
+# 🧯 LLM outage → 503 (fail fast, tell clients when to retry)
+# ─────────────────────────────
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable_handler(request, exc: LLMUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
+
+# ─────────────────────────────
+# 📈 Metrics – per-route latency + Prometheus scrape endpoint
+# ─────────────────────────────
+register_stats("llm_cache", llm_cache.stats, label="stage")
+register_stats("llm_scheduler", llm_scheduler.stats, label="priority")
+register_stats("llm_circuit", llm_breaker.stats)
+register_stats("history_cache", history_cache.stats)
+register_stats("draft_jobs", draft_jobs.stats)
+register_stats("prompt_tokens", prompt_token_stats)
+register_stats("draft_templates", template_registry.stats)
+
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_SECONDS.observe(
+            time.perf_counter() - started,
+            route=getattr(route, "path", "unmatched"),
+            method=request.method,
+            status=str(status),
+        )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # ─────────────────────────────
 # 🔐 CORS Setup
 # ─────────────────────────────
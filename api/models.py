@@ -1,5 +1,5 @@
 #api/models.py
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, LargeBinary, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from api.database import Base
@@ -7,19 +7,31 @@ from api.database import Base
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    # Sidebar list: a user's conversations, newest first
+    __table_args__ = (Index("ix_conversations_user_id_created_at", "user_id", "created_at"),)
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    state = Column(Text)  # JSON-serialized AgentState
+    state = Column(Text)  # legacy JSON AgentState – superseded by conversation_state rows
 
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
+    state_fields = relationship("ConversationStateField", cascade="all, delete-orphan")
     document = relationship("Document", uselist=False, back_populates="conversation", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Conversation id={self.id}>"
 
+class ConversationStateField(Base):
+    """One AgentState field of a conversation (see agent/state_store.py)."""
+    __tablename__ = "conversation_state"
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), primary_key=True)
+    key = Column(String(50), primary_key=True)
+    value = Column(Text)  # JSON; NULL for "draft" → the conversation's documents.content
+
 class Message(Base):
     __tablename__ = "messages"
+    # History reads are "newest N before a cursor" – keyset on (timestamp, id)
+    __table_args__ = (Index("ix_messages_conversation_id_timestamp", "conversation_id", "timestamp"),)
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
     sender = Column(String(20))  # "user" or "assistant"
@@ -31,9 +43,29 @@ class Document(Base):
     __tablename__ = "documents"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    conversation_id = Column(Integer, ForeignKey("conversations.id"), unique=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), unique=True, index=True)
     doc_type = Column(String(100), nullable=False)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     conversation = relationship("Conversation", back_populates="document")
+    revisions = relationship(
+        "DocumentRevision", back_populates="document",
+        cascade="all, delete-orphan", order_by="DocumentRevision.version",
+    )
+
+class DocumentRevision(Base):
+    """One version of a document: a zlib'd full snapshot or a line delta
+    against the previous version (see agent/revisions.py)."""
+    __tablename__ = "document_revisions"
+    __table_args__ = (UniqueConstraint("document_id", "version", name="uq_revision_version"),)
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+    version = Column(Integer, nullable=False)
+    kind = Column(String(10), nullable=False)  # "snapshot" or "delta"
+    payload = Column(LargeBinary, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    size = Column(Integer, nullable=False)  # uncompressed content length
+    source = Column(String(20), default="draft")  # "draft" or "restore"
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    document = relationship("Document", back_populates="revisions")
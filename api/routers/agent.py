@@ -1,139 +1,298 @@
 """
 FastAPI router that exposes:
-  • POST /agent/{conversation_id}/message
+  • POST /agent/{conversation_id}/message        (?background=true → 202 + job)
   • POST /agent/{conversation_id}/stream
+  • GET  /agent/jobs/{job_id}
+  • GET  /agent/jobs/{job_id}/events             (SSE progress)
+  • GET  /agent/llm-cache/stats
+  • GET  /agent/llm-scheduler/stats
 Now also returns the drafted document (if any).
+
+Both routes are `async` and drive `arun_agent_step`, so a turn that is
+waiting on the model costs an event-loop task, not a threadpool worker.
+DB work is awaited on the async engine too: loads are plain `select`s and
+each turn is written once via `commit_turn`, run on the async session
+with `run_sync`.
 """
 
+import asyncio
 import logging
-import time
 import json
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Request
-from sqlalchemy.orm import Session
-from typing import Optional
-from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from api import models, schemas, deps
-from agent.agent_runner import run_agent_step
+from api import models, schemas
+from api.database import AsyncSessionLocal, get_async_db
+from agent.agent_runner import (
+    arun_agent_step,
+    arun_conversational_step,
+    arun_drafting_step,
+)
+from agent.jobs import DraftJob, JobConflict, draft_jobs
+from agent.persistence import commit_turn
+from agent.llm_cache import llm_cache
+from agent.scheduler import llm_scheduler
+from agent.retry import LLMUnavailableError, llm_breaker
 from agent.state import AgentState
+from agent.state_store import load_state
 
 router = APIRouter(prefix="/agent", tags=["agent"])
 logger = logging.getLogger("api.routers.agent")
 
+
+# ──────────────────────────────────────────────
+# Helpers
+# ──────────────────────────────────────────────
+async def _load_conversation(db: AsyncSession, conversation_id: str):
+    """Load conversation + hydrate its AgentState, or 404."""
+    conv = await db.get(models.Conversation, int(conversation_id)) if conversation_id.isdigit() else None
+    if not conv:
+        raise HTTPException(404, "Conversation not found.")
+    state = await db.run_sync(load_state, conv)
+    await db.commit()   # end the read transaction before the LLM wait
+    return conv, state
+
+
+def _ensure_idle(conversation_id: int) -> None:
+    """
+    One turn at a time: refuse early while a drafting job owns the state.
+    Only a fast path – the authoritative check is `draft_jobs.submit`.
+    """
+    job = draft_jobs.active_for(conversation_id)
+    if job is not None:
+        raise HTTPException(409, f"Drafting job {job.id} is still running.")
+
+
+async def _commit_job_result(conversation_id: int, result: Dict[str, Any]) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(
+            commit_turn, conversation_id, None,
+            result["reply"], result["updated_state"], result["draft_document"],
+        )
+
+
 # ──────────────────────────────────────────────
 # POST /agent/{conversation_id}/message
 # ──────────────────────────────────────────────
 @router.post("/{conversation_id}/message")
-def send_message(
+async def send_message(
     conversation_id: str,
     msg_in: schemas.MessageCreate,
-    db: Session = Depends(deps.get_db),
+    background: bool = False,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    # 1. Load conversation
-    conv = db.query(models.Conversation).filter_by(id=conversation_id).first()
-    if not conv:
-        raise HTTPException(404, "Conversation not found.")
+    """
+    Run one turn.  With `?background=true`, a turn that needs drafting
+    answers 202 as soon as the conversational reply is known and the
+    drafter → checker loop continues as a job (see /agent/jobs/{job_id}).
+    Jobs live in one process, so with several workers (WEB_CONCURRENCY > 1)
+    the flag is ignored and the turn drafts inline.
+    """
+    # 1. Load conversation + hydrate AgentState
+    conv, state = await _load_conversation(db, conversation_id)
+    _ensure_idle(conv.id)
 
-    # 2. Hydrate AgentState
-    raw_state = getattr(conv, "state", None)
-    if isinstance(raw_state, str):
-        try:
-            raw_state = json.loads(raw_state)
-        except Exception:
-            raw_state = None
-    state = AgentState(**raw_state) if raw_state else AgentState()
+    if background and draft_jobs.enabled:
+        return await _send_message_background(db, conv, state, msg_in.content)
 
-    # 3. Run agent step
-    result          = run_agent_step(state, msg_in.content, conversation_id)
+    # 2. Run agent step
+    result          = await arun_agent_step(
+        state, msg_in.content, conversation_id, user_id=conv.user_id
+    )
     reply           = result["reply"]
     updated_state   = result["updated_state"]
     draft_document  = result["draft_document"]  # could be None
 
-    # ── Persist / upsert Document ──
-    if draft_document:
+    # 3. Persist messages, state & document in one transaction
+    await db.run_sync(
+        commit_turn, conv.id, msg_in.content,
+        reply, updated_state, draft_document,
+    )
 
-        doc = (
-            db.query(models.Document)
-            .filter_by(conversation_id=conv.id)
-            .first()
-        )
-        if doc:
-            doc.content   = draft_document
-            doc.doc_type  = state.document_type or doc.doc_type
-        else:
-            doc = models.Document(
-                conversation_id=conv.id,
-
-                doc_type=state.document_type or "unknown",
-                content=draft_document,
-            )
-            db.add(doc)
-        db.commit()
-
-    # 4. Persist messages
-    db.add_all([
-        models.Message(conversation_id=conv.id, sender="user",      content=msg_in.content),
-        models.Message(conversation_id=conv.id, sender="assistant", content=reply),
-    ])
-
-    # 5. Persist updated state
-    if hasattr(conv, "state"):
-        conv.state = json.dumps(updated_state.dict())
-
-    db.commit()
-
-    # 6. Return JSON payload (doc may be null)
+    # 4. Return JSON payload (doc may be null)
     print("Agent replay: ", reply)
     return {
         "assistant_reply": reply,
         "document": draft_document,   # null if no draft yet
     }
 
+
+async def _send_message_background(
+    db: AsyncSession, conv: models.Conversation, state: AgentState, content: str
+):
+    phase = await arun_conversational_step(
+        state, content, str(conv.id), user_id=conv.user_id
+    )
+    reply    = phase["reply"]
+    document = state.draft if state.is_drafted else None
+
+    if phase["draft_instruction"] is None:
+        await db.run_sync(commit_turn, conv.id, content, reply, state, None)
+        return {"assistant_reply": reply, "document": document}
+
+    conv_id, user_id = conv.id, conv.user_id
+    committed: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    async def work(job: DraftJob) -> Dict[str, Any]:
+        if not await committed:
+            raise RuntimeError("The user's turn could not be saved.")
+        result = await arun_drafting_step(
+            state, content, str(conv_id),
+            instruction=phase["draft_instruction"],
+            history=phase["history"],
+            user_id=user_id,
+            on_progress=job.emit,
+        )
+        await _commit_job_result(conv_id, result)
+        return {
+            "assistant_reply": result["reply"],
+            "document":        result["draft_document"],
+        }
+
+    # Check + register in one step: a concurrent request that also got
+    # past `_ensure_idle` gets 409 here, before anything is written.
+    try:
+        job = draft_jobs.submit(conv_id, work)
+    except JobConflict as exc:
+        raise HTTPException(409, str(exc))
+
+    # The user's turn is committed now; the job waits for it, and its
+    # drafting result lands later.
+    try:
+        await db.run_sync(commit_turn, conv.id, content, reply, state, None)
+    except BaseException:
+        committed.set_result(False)
+        raise
+    committed.set_result(True)
+    return JSONResponse(status_code=202, content={
+        "assistant_reply": reply,
+        "document":        document,
+        "job_id":          job.id,
+        "status_url":      f"/agent/jobs/{job.id}",
+        "events_url":      f"/agent/jobs/{job.id}/events",
+    })
+
 # ──────────────────────────────────────────────
 # POST /agent/{conversation_id}/stream
 # ──────────────────────────────────────────────
+def _sse(data: str, event: Optional[str] = None) -> str:
+    """Format one SSE frame; multi-line payloads get one `data:` per line."""
+    head = f"event: {event}\n" if event else ""
+    return head + "".join(f"data: {line}\n" for line in data.split("\n")) + "\n"
+
+
+_STREAM_DONE = object()
+
+
 @router.post("/{conversation_id}/stream")
 async def stream_reply(
     conversation_id: str,
     msg_in: schemas.MessageCreate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    conv = db.query(models.Conversation).filter_by(id=conversation_id).first()
-    if not conv:
-        raise HTTPException(404, "Conversation not found.")
+    """
+    SSE stream of one turn.
+
+    • `data:`            – reply text, forwarded as the model generates it
+                           (extracted from the JSON envelope on the fly)
+    • `event: reply`     – the final reply text (the runner may replace the
+                           streamed text, e.g. after drafting)
+    • `event: document`  – drafted document (empty if none)
+    • `event: done`
+    • `event: error`     – the model is unavailable (circuit open, deadline)
+    """
+    conv, state = await _load_conversation(db, conversation_id)
+    _ensure_idle(conv.id)
+
+    queue: asyncio.Queue = asyncio.Queue()
 
-    raw_state = getattr(conv, "state", None)
-    if isinstance(raw_state, str):
+    async def run_turn():
         try:
-            raw_state = json.loads(raw_state)
-        except Exception:
-            raw_state = None
-    state = AgentState(**raw_state) if raw_state else AgentState()
+            return await arun_agent_step(
+                state, msg_in.content, conversation_id,
+                on_token=queue.put, user_id=conv.user_id,
+            )
+        finally:
+            await queue.put(_STREAM_DONE)
 
     # ——— Streaming generator ——————————————————
-    def token_stream():
-        # Run agent logic
-        result         = run_agent_step(state, msg_in.content, conversation_id)
+    async def token_stream():
+        turn = asyncio.create_task(run_turn())
+        try:
+            while (token := await queue.get()) is not _STREAM_DONE:
+                yield _sse(token)
+
+            result = await turn   # re-raises agent errors
+        except LLMUnavailableError as exc:
+            yield _sse(str(exc), event="error")
+            return
+        finally:
+            if not turn.done():   # client went away mid-stream
+                turn.cancel()
+
         full_reply     = result["reply"]
         updated_state  = result["updated_state"]
         draft_document = result["draft_document"]
 
-        # Persist DB
-        db.add_all([
-            models.Message(conversation_id=conv.id, sender="user",      content=msg_in.content),
-            models.Message(conversation_id=conv.id, sender="assistant", content=full_reply),
-        ])
-        if hasattr(conv, "state"):
-            conv.state = json.dumps(updated_state.dict())
-        db.commit()
-
-        # Stream reply char-by-char
-        for ch in full_reply:
-            yield f"data: {ch}\n\n"
-            time.sleep(0.015)
+        # Persist DB – own session: the request-scoped one may already be
+        # closed while the response body is still streaming
+        async with AsyncSessionLocal() as commit_db:
+            await commit_db.run_sync(
+                commit_turn, conv.id, msg_in.content,
+                full_reply, updated_state, draft_document,
+            )
 
+        yield _sse(full_reply, event="reply")
         # Push the document (if any) as a separate SSE event
-        yield "event: document\ndata: " + (draft_document or "") + "\n\n"
-        yield "event: done\ndata: END\n\n"
+        yield _sse(draft_document or "", event="document")
+        yield _sse("END", event="done")
 
     return StreamingResponse(token_stream(), media_type="text/event-stream")
+
+
+# ──────────────────────────────────────────────
+# GET /agent/jobs/{job_id}  ·  GET /agent/jobs/{job_id}/events
+# ──────────────────────────────────────────────
+def _get_job(job_id: str) -> DraftJob:
+    job = draft_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found.")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Poll a drafting job: status, progress so far, final result."""
+    return _get_job(job_id).snapshot()
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, since: int = 0):
+    """SSE: replay progress events from `since`, then follow until done."""
+    job = _get_job(job_id)
+
+    async def event_stream():
+        async for ev in job.follow(since):
+            yield _sse(json.dumps(ev["data"], ensure_ascii=False), event=ev["event"])
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+# ──────────────────────────────────────────────
+# GET /agent/llm-cache/stats
+# ──────────────────────────────────────────────
+@router.get("/llm-cache/stats")
+def llm_cache_stats():
+    """Per-stage hits / misses / stores / hit_rate of the LLM response cache."""
+    return llm_cache.stats()
+
+
+# ──────────────────────────────────────────────
+# GET /agent/llm-scheduler/stats
+# ──────────────────────────────────────────────
+@router.get("/llm-scheduler/stats")
+def llm_scheduler_stats():
+    """Concurrency, queue depth and wait-time metrics of the LLM scheduler."""
+    return {**llm_scheduler.stats(), "circuit": llm_breaker.stats()}
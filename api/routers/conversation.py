@@ -1,59 +1,145 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from api import models, schemas, deps
+from api.database import get_async_db
+from agent.history_cache import history_cache
+from agent.memory import message_page
+
+MESSAGE_PAGE_SIZE = 50
+MESSAGE_PAGE_MAX  = 200
+CONVERSATION_PAGE_SIZE = 50
+CONVERSATION_PAGE_MAX  = 200
 
 router = APIRouter(tags=["conversations"])  # 🔥 Removed prefix here
 
 # -------------------------------
 # Create a New Conversation
 # -------------------------------
-@router.post("/", response_model=schemas.ConversationRead)
-def create_conversation(
+@router.post("/", response_model=schemas.ConversationDetail)
+async def create_conversation(
     c: schemas.ConversationCreate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: models.User = Depends(deps.get_current_user),
 ):
     conv = models.Conversation(user_id=user.id)
-    db.add(conv); db.commit(); db.refresh(conv)
-    return conv
+    db.add(conv); await db.commit(); await db.refresh(conv)
+    # Built explicitly: serialising the ORM object would lazy-load
+    # `messages` outside the AsyncSession (MissingGreenlet) – and a new
+    # conversation has none.
+    return schemas.ConversationDetail(
+        id=conv.id, created_at=conv.created_at, messages=[], has_more_messages=False,
+    )
 
 # -------------------------------
-# List User's Conversations
+# List User's Conversations (summaries, newest first, keyset)
 # -------------------------------
-@router.get("/", response_model=List[schemas.ConversationRead])
-def list_conversations(
-    db: Session = Depends(deps.get_db),
+def conversation_summaries(
+    db: Session,
+    user_id: int,
+    before: Optional[int] = None,
+    limit: int = CONVERSATION_PAGE_SIZE,
+):
+    """
+    One statement: conversations left-joined to their document, with the
+    last message time as a correlated MAX() that SQLite answers from the
+    (conversation_id, timestamp) index – so the cost per row does not grow
+    with the conversation's length, and no messages are loaded.
+    """
+    Conv, Doc, Msg = models.Conversation, models.Document, models.Message
+    last_message = (
+        select(func.max(Msg.timestamp))
+        .where(Msg.conversation_id == Conv.id)
+        .correlate(Conv)
+        .scalar_subquery()
+    )
+    query = (
+        db.query(
+            Conv.id,
+            Conv.created_at,
+            Doc.doc_type,
+            func.coalesce(last_message, Conv.created_at).label("last_activity"),
+        )
+        .outerjoin(Doc, Doc.conversation_id == Conv.id)
+        .filter(Conv.user_id == user_id)
+    )
+    if before is not None:
+        cursor_ts = select(Conv.created_at).where(Conv.id == before).scalar_subquery()
+        query = query.filter(tuple_(Conv.created_at, Conv.id) < tuple_(cursor_ts, before))
+    rows = (
+        query.order_by(Conv.created_at.desc(), Conv.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    return rows[:limit], len(rows) > limit
+
+
+@router.get("/", response_model=schemas.ConversationPage)
+async def list_conversations(
+    before: Optional[int] = Query(None, description="Conversation id; return older conversations"),
+    limit: int = Query(CONVERSATION_PAGE_SIZE, ge=1, le=CONVERSATION_PAGE_MAX),
+    db: AsyncSession = Depends(get_async_db),
     user: models.User = Depends(deps.get_current_user),
 ):
-    return db.query(models.Conversation)\
-             .filter(models.Conversation.user_id == user.id)\
-             .order_by(models.Conversation.created_at.desc())\
-             .all()
+    rows, has_more = await db.run_sync(conversation_summaries, user.id, before=before, limit=limit)
+    return schemas.ConversationPage(
+        conversations=[schemas.ConversationSummary(**row._mapping) for row in rows],
+        has_more=has_more,
+        next_before=rows[-1].id if has_more and rows else None,
+    )
 
 # -------------------------------
 # Get a Conversation by ID
 # -------------------------------
-@router.get("/{id}", response_model=schemas.ConversationRead)
-def get_conversation(
+@router.get("/{id}", response_model=schemas.ConversationDetail)
+async def get_conversation(
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    conv = db.query(models.Conversation).filter_by(id=id).first()
+    conv = await db.get(models.Conversation, id)
     if not conv:
         raise HTTPException(404, "Conversation not found")
-    return conv
+    rows, has_more = await db.run_sync(message_page, id, limit=MESSAGE_PAGE_SIZE)
+    return schemas.ConversationDetail(
+        id=conv.id, created_at=conv.created_at,
+        messages=rows, has_more_messages=has_more,
+    )
+
+# -------------------------------
+# Page Through a Conversation's Messages (newest first, keyset)
+# -------------------------------
+@router.get("/{id}/messages", response_model=schemas.MessagePage)
+async def get_messages(
+    id: int,
+    before: Optional[int] = Query(None, description="Message id; return messages older than it"),
+    limit: int = Query(MESSAGE_PAGE_SIZE, ge=1, le=MESSAGE_PAGE_MAX),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if await db.scalar(select(models.Conversation.id).where(models.Conversation.id == id)) is None:
+        raise HTTPException(404, "Conversation not found")
+    try:
+        rows, has_more = await db.run_sync(message_page, id, before=before, limit=limit)
+    except LookupError as exc:
+        raise HTTPException(400, str(exc))
+    return schemas.MessagePage(
+        messages=rows,
+        has_more=has_more,
+        next_before=rows[0].id if has_more and rows else None,
+    )
 
 # -------------------------------
 # Delete a Conversation
 # -------------------------------
 @router.delete("/{id}", status_code=204)
-def delete_conversation(
+async def delete_conversation(
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    conv = db.query(models.Conversation).filter_by(id=id).first()
+    conv = await db.get(models.Conversation, id)
     if not conv:
         raise HTTPException(404, "Conversation not found")
-    db.delete(conv); db.commit()
+    await db.delete(conv); await db.commit()
+    history_cache.invalidate(id)
@@ -1,28 +1,121 @@
 """api/routers/document.py
 Provides endpoints to fetch / update drafted documents associated with a conversation.
-Currently only GET is required for the frontend to display the latest draft.
+
+Routes run on the async session; the revision helpers are the same sync
+ORM code, run on it with `run_sync`.
+
+Revision history (no model calls – versions are rebuilt from stored deltas):
+  • GET  /documents/{conversation_id}/revisions
+  • GET  /documents/{conversation_id}/revisions/{version}
+  • GET  /documents/{conversation_id}/diff?from_version=&to_version=
+  • POST /documents/{conversation_id}/revisions/{version}/restore
 """
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from api import models, deps
+from api import models
+from api.database import get_async_db
 from agent.state import AgentState
+from agent.persistence import restore_document
+from agent.revisions import (
+    RevisionCorrupt,
+    RevisionNotFound,
+    diff_revisions,
+    latest_version,
+    list_revisions,
+    reconstruct,
+)
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
+def _corrupt(exc: RevisionCorrupt) -> HTTPException:
+    """Stored history can't be rebuilt – the same answer on every route."""
+    return HTTPException(status_code=500, detail=f"Revision history is corrupt ({exc})")
+
+
 @router.get("/{conversation_id}")
-def get_document(conversation_id: int, db: Session = Depends(deps.get_db)):
+async def get_document(conversation_id: int, db: AsyncSession = Depends(get_async_db)):
     """Return the drafted document for a conversation, or 404."""
-    doc = db.query(models.Document).filter_by(conversation_id=conversation_id).first()
+    doc = await _document(db, conversation_id)
+
+    return {
+        "id": doc.id,
+        "conversation_id": doc.conversation_id,
+        "doc_type": doc.doc_type,
+        "content": doc.content,
+        "updated_at": str(doc.updated_at),
+    }
+
+
+async def _document(db: AsyncSession, conversation_id: int) -> models.Document:
+    doc = await db.scalar(
+        select(models.Document).where(models.Document.conversation_id == conversation_id)
+    )
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
+    return doc
+
+
+@router.get("/{conversation_id}/revisions")
+async def get_revisions(conversation_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Revision metadata, oldest first."""
+    doc = await _document(db, conversation_id)
+    return {"document_id": doc.id, "revisions": await db.run_sync(list_revisions, doc.id)}
+
 
+@router.get("/{conversation_id}/revisions/{version}")
+async def get_revision(conversation_id: int, version: int, db: AsyncSession = Depends(get_async_db)):
+    doc = await _document(db, conversation_id)
+    try:
+        content = await db.run_sync(reconstruct, doc.id, version)
+    except RevisionNotFound:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    except RevisionCorrupt as exc:
+        raise _corrupt(exc)
+    return {"document_id": doc.id, "version": version, "content": content}
+
+
+@router.get("/{conversation_id}/diff")
+async def get_diff(
+    conversation_id: int,
+    from_version: int,
+    to_version: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Unified diff between two versions (`to_version` defaults to latest)."""
+    doc = await _document(db, conversation_id)
+    to_version = to_version or await db.run_sync(latest_version, doc.id)
+    try:
+        diff = await db.run_sync(diff_revisions, doc.id, from_version, to_version)
+    except RevisionNotFound:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    except RevisionCorrupt as exc:
+        raise _corrupt(exc)
+    return {"from_version": from_version, "to_version": to_version, "diff": diff}
+
+
+@router.post("/{conversation_id}/revisions/{version}/restore")
+async def restore(conversation_id: int, version: int, db: AsyncSession = Depends(get_async_db)):
+    """Make `version` the current draft again (recorded as a new revision)."""
+    await _document(db, conversation_id)
+    try:
+        doc = await db.run_sync(restore_document, conversation_id, version)
+    except RevisionNotFound:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    except RevisionCorrupt as exc:
+        raise _corrupt(exc)
+    except ValueError as exc:   # already the current content
+        raise HTTPException(status_code=409, detail=str(exc))
+    await db.refresh(doc)   # updated_at is set by the database
     return {
         "id": doc.id,
         "conversation_id": doc.conversation_id,
-        "doc_type": doc.doc_type,
+        "version": await db.run_sync(latest_version, doc.id),
         "content": doc.content,
         "updated_at": str(doc.updated_at),
     }
@@ -23,6 +23,11 @@ class MessageRead(BaseModel):
     timestamp: datetime
     model_config = ConfigDict(from_attributes=True)
 
+class MessagePage(BaseModel):
+    messages: List[MessageRead]   # oldest first
+    has_more: bool                # older messages exist
+    next_before: Optional[int]    # pass as ?before= for the previous page
+
 # ------------------------
 # Conversation Schemas
 # ------------------------
@@ -36,6 +41,22 @@ class ConversationRead(BaseModel):
     messages: List[MessageRead] = []
     model_config = ConfigDict(from_attributes=True)
 
+class ConversationSummary(BaseModel):
+    """Sidebar projection – no messages."""
+    id: int
+    created_at: datetime
+    doc_type: Optional[str] = None
+    last_activity: datetime       # newest message, else created_at
+
+class ConversationPage(BaseModel):
+    conversations: List[ConversationSummary]   # newest first
+    has_more: bool
+    next_before: Optional[int]                 # pass as ?before= for the next page
+
+class ConversationDetail(ConversationRead):
+    """A conversation with only its newest page of messages."""
+    has_more_messages: bool = False
+
 # ------------------------
 # Document Schemas
 # ------------------------
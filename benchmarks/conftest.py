@@ -0,0 +1,171 @@
+"""
+benchmarks/conftest.py
+─────────────────────────────────────────────────────────────────────────────
+Offline benchmark harness (pytest-benchmark).
+
+• every LLM reference is swapped for `ScriptedLLM` – no network
+• a throw-away SQLite database per session (sync and aiosqlite engines);
+  LLM response cache disabled
+• each benchmark's median is compared against `baselines.json`:
+  slower than baseline × (1 + BENCH_TOLERANCE) fails the test
+
+    python -m pytest benchmarks                       # check
+    python -m pytest benchmarks --update-baselines    # re-record
+    BENCH_LLM_LATENCY_MS=50 python -m pytest benchmarks --benchmark-only
+
+Baselines are machine-dependent; re-record them on the machine that runs
+the comparison.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+_TMP = tempfile.mkdtemp(prefix="bench-")
+os.environ.setdefault("HF_TOKEN", "bench")
+os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+os.environ["LLM_CACHE_STAGES"] = ""
+os.environ["LLM_CACHE_PATH"] = os.path.join(_TMP, "llm_cache.db")
+# api.database opens ./test.db on import – keep it out of the working tree
+os.chdir(_TMP)
+
+from sqlalchemy import Column, Integer, Table, create_engine  # noqa: E402
+
+import api.database  # noqa: E402
+from api.database import Base  # noqa: E402
+
+# The models reference users.id; register a bare table when no User model exists.
+if "users" not in Base.metadata.tables:
+    Table("users", Base.metadata, Column("id", Integer, primary_key=True))
+
+import api.deps  # noqa: E402
+import api.models  # noqa: E402,F401
+
+
+# …and, likewise, routes run as user 0 when there is no auth module.
+class _BenchUser:
+    id = 0
+
+
+if not hasattr(api.models, "User"):
+    api.models.User = _BenchUser
+if not hasattr(api.deps, "get_current_user"):
+    api.deps.get_current_user = _BenchUser
+
+from benchmarks.stub_llm import ScriptedLLM  # noqa: E402
+
+BASELINES = Path(__file__).parent / "baselines.json"
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "1.0"))
+LATENCY_MS = float(os.getenv("BENCH_LLM_LATENCY_MS", "0"))
+
+_recorded: dict = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption("--update-baselines", action="store_true",
+                     help="record medians into benchmarks/baselines.json")
+
+
+# ─────────────────────────────────────────────────────────────
+# Database / LLM fixtures
+# ─────────────────────────────────────────────────────────────
+@pytest.fixture(scope="session", autouse=True)
+def bench_db():
+    engine = create_engine(
+        f"sqlite:///{os.path.join(_TMP, 'bench.db')}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    api.database.SessionLocal.configure(bind=engine)
+    async_engine = api.database.make_async_engine(
+        f"sqlite+aiosqlite:///{os.path.join(_TMP, 'bench.db')}"
+    )
+    api.database.AsyncSessionLocal.configure(bind=async_engine)
+    yield engine
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def stub_llm():
+    llm = ScriptedLLM(latency_ms=LATENCY_MS)
+    import agent.llm
+    from agent.chains.registry import chain_registry
+
+    agent.llm.llm_chain = llm
+    chain_registry.compile(llm=llm)
+    return llm
+
+
+@pytest.fixture
+def new_conversation(bench_db):
+    """Factory: a fresh conversation id (optionally with `n` messages)."""
+    from api.database import SessionLocal
+    from api.models import Conversation, Message
+
+    def make(n_messages: int = 0) -> int:
+        db = SessionLocal()
+        try:
+            conv = Conversation(user_id=0)
+            db.add(conv)
+            db.flush()
+            db.add_all(
+                Message(conversation_id=conv.id,
+                        sender="user" if i % 2 == 0 else "assistant",
+                        content=f"message {i}: " + "lorem ipsum dolor sit amet " * 8)
+                for i in range(n_messages)
+            )
+            db.commit()
+            return conv.id
+        finally:
+            db.close()
+
+    return make
+
+
+# ─────────────────────────────────────────────────────────────
+# Baseline comparison
+# ─────────────────────────────────────────────────────────────
+def _load_baselines() -> dict:
+    if BASELINES.exists():
+        return json.loads(BASELINES.read_text())
+    return {}
+
+
+@pytest.fixture(autouse=True)
+def _check_baseline(request):
+    yield
+    bench = request.node.funcargs.get("benchmark")
+    stats = getattr(getattr(bench, "stats", None), "stats", None)
+    if stats is None or not getattr(stats, "data", None):
+        return
+    name, median = request.node.name, stats.median
+    _recorded[name] = median
+    if request.config.getoption("--update-baselines"):
+        return
+    baseline = _load_baselines().get(name)
+    if baseline is not None and median > baseline * (1 + TOLERANCE):
+        pytest.fail(
+            f"performance regression: median {median * 1e3:.3f} ms vs "
+            f"baseline {baseline * 1e3:.3f} ms (+{TOLERANCE:.0%} allowed)",
+            pytrace=False,
+        )
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if session.config.getoption("--update-baselines") and _recorded:
+        merged = {**_load_baselines(), **_recorded}
+        BASELINES.write_text(json.dumps(dict(sorted(merged.items())), indent=2) + "\n")
+    os.chdir(ROOT)
+    shutil.rmtree(_TMP, ignore_errors=True)
@@ -0,0 +1,170 @@
+"""
+benchmarks/json_salvage.py
+─────────────────────────────────────────────────────────────────────────────
+JSON salvage microbenchmark over `corpus/model_outputs.jsonl` – model
+outputs in the shapes we actually get back (think blocks, fences, prose,
+single quotes, raw newlines, trailing commas, truncation, 8k-token drafts).
+
+Compares the legacy three-strategy `salvage_json` (copied below, as it was
+before the linear scanner) with the current decode path, checks both
+against each case's expected key, and prints µs per call.
+
+    python -m benchmarks.json_salvage [rounds]
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from agent.utils import parse_model_json
+
+CORPUS = Path(__file__).parent / "corpus" / "model_outputs.jsonl"
+
+
+def load_corpus() -> List[Dict[str, Any]]:
+    with CORPUS.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ─────────────────────────────────────────────────────────────
+# Legacy implementation (baseline)
+# ─────────────────────────────────────────────────────────────
+def _legacy_iterate_json_candidates(text: str):
+    depth, start, in_str, escape = 0, None, False, False
+    for i, ch in enumerate(text):
+        if ch == '"' and not escape:
+            in_str = not in_str
+        escape = (ch == "\\" and not escape)
+        if in_str:
+            continue
+        if ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0 and start is not None:
+                yield text[start: i + 1]
+                start = None
+
+
+_LEGACY_THINK_END = re.compile(r"</think>", re.IGNORECASE)
+_LEGACY_FENCE_START = re.compile(r"^\s*```[a-zA-Z0-9_-]*\s*")
+_LEGACY_FENCE_END = re.compile(r"\s*```\s*$")
+
+
+def _legacy_clean(text: str) -> str:
+    m = list(_LEGACY_THINK_END.finditer(text))
+    if m:
+        text = text[m[-1].end():]
+    text = _LEGACY_FENCE_START.sub("", text)
+    text = _LEGACY_FENCE_END.sub("", text)
+    return text.strip()
+
+
+_LEGACY_S2D = re.compile(r"'([^']+?)'")
+_LEGACY_FENCE = re.compile(r"```json\s*({[\s\S]+?})\s*```", re.IGNORECASE)
+
+
+def _legacy_safe_parse(block: str) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(block)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(_LEGACY_S2D.sub(r'"\1"', block))
+    except json.JSONDecodeError:
+        pass
+    try:
+        return ast.literal_eval(block)
+    except Exception:
+        return None
+
+
+def _legacy_salvage(text: str, required_key: str) -> Optional[Dict[str, Any]]:
+    for m in _LEGACY_FENCE.finditer(text):
+        parsed = _legacy_safe_parse(m.group(1))
+        if parsed and required_key in parsed:
+            return parsed
+    for block in _legacy_iterate_json_candidates(text):
+        if f'"{required_key}"' not in block and f"'{required_key}'" not in block:
+            continue
+        parsed = _legacy_safe_parse(block)
+        if parsed and required_key in parsed:
+            return parsed
+    idx = text.rfind("}")
+    while idx != -1:
+        start = text.rfind("{", 0, idx)
+        if start == -1:
+            break
+        block = text[start: idx + 1]
+        if f'"{required_key}"' in block or f"'{required_key}'" in block:
+            parsed = _legacy_safe_parse(block)
+            if parsed and required_key in parsed:
+                return parsed
+        idx = text.rfind("}", 0, start)
+    return None
+
+
+def legacy_decode(text: str, required_key: str) -> Optional[Dict[str, Any]]:
+    """What the runner used to do: whole-text parse, then salvage."""
+    cleaned = _legacy_clean(text)
+    parsed = _legacy_safe_parse(cleaned)
+    if isinstance(parsed, dict):
+        return parsed
+    return _legacy_salvage(cleaned, required_key)
+
+
+# ─────────────────────────────────────────────────────────────
+# Runner
+# ─────────────────────────────────────────────────────────────
+def _ok(result: Any, case: Dict[str, Any]) -> bool:
+    expect = case["expect_key"]
+    if expect is None:
+        return result is None
+    return isinstance(result, dict) and expect in result
+
+
+def _time(fn, text: str, key: str, rounds: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn(text, key)
+    return (time.perf_counter() - t0) * 1e6 / rounds
+
+
+def run(rounds: int = 20) -> List[Dict[str, Any]]:
+    rows = []
+    for case in load_corpus():
+        text, key = case["text"], case["required_key"]
+        rows.append({
+            "name":      case["name"],
+            "chars":     len(text),
+            "legacy_ok": _ok(legacy_decode(text, key), case),
+            "new_ok":    _ok(parse_model_json(text, key), case),
+            "legacy_us": _time(legacy_decode, text, key, rounds),
+            "new_us":    _time(parse_model_json, text, key, rounds),
+        })
+    return rows
+
+
+def main(argv: List[str]) -> int:
+    rounds = int(argv[1]) if len(argv) > 1 else 20
+    rows = run(rounds)
+    print(f"{'case':28} {'chars':>7} {'legacy µs':>11} {'new µs':>9}  ok(legacy/new)")
+    for r in rows:
+        print(f"{r['name']:28} {r['chars']:>7} {r['legacy_us']:>11.1f} {r['new_us']:>9.1f}"
+              f"  {'✓' if r['legacy_ok'] else '✗'}/{'✓' if r['new_ok'] else '✗'}")
+    failures = [r["name"] for r in rows if not r["new_ok"]]
+    if failures:
+        print("❌ new decoder failed:", ", ".join(failures))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,164 @@
+"""
+benchmarks/sqlite_concurrency.py
+─────────────────────────────────────────────────────────────────────────────
+Concurrent-write benchmark for the SQLite engine profiles in `api.database`:
+
+• legacy      – default engine, and `commit_turn` without `begin_write`
+                (the tree before the production profile existed)
+• default     – DB_ENGINE_PROFILE=default
+• production  – DB_ENGINE_PROFILE=production (WAL, busy timeout, pool)
+
+`threads` workers each run `turns` turns against their own conversation,
+shaped like the agent route:
+
+    load conversation → (LLM wait, session still open) → read history tail
+    → commit_turn (messages + state, a document revision every 4th turn)
+
+Each profile runs on a fresh database file; the table shows committed
+turns/s, commit latency and how many turns failed with
+"database is locked".
+
+    python -m benchmarks.sqlite_concurrency [threads] [turns] [llm_ms]
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+if __name__ == "__main__":
+    # api.database opens ./test.db on import – keep it out of the working tree
+    _WORKDIR = tempfile.mkdtemp(prefix="sqlite-bench-")
+    os.chdir(_WORKDIR)
+    os.environ.setdefault("HF_TOKEN", "bench")
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+
+from sqlalchemy import Column, Integer, Table  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from api.database import Base, make_engine  # noqa: E402
+
+# The models reference users.id; register a bare table when no User model exists.
+if "users" not in Base.metadata.tables:
+    Table("users", Base.metadata, Column("id", Integer, primary_key=True))
+
+import agent.persistence  # noqa: E402
+from agent.memory import message_page  # noqa: E402
+from agent.persistence import commit_turn  # noqa: E402
+from agent.state_store import load_state  # noqa: E402
+from api.models import Conversation  # noqa: E402
+from benchmarks.stub_llm import DRAFT_TEXT  # noqa: E402
+
+PROFILES = ("legacy", "default", "production")
+
+
+def _pct(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_profile(profile: str, threads: int = 8, turns: int = 25, llm_ms: float = 5.0) -> Dict[str, Any]:
+    """Run the workload once on a fresh database; returns throughput stats."""
+    workdir = tempfile.mkdtemp(prefix=f"sqlite-{profile}-")
+    engine = make_engine(
+        f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "default" if profile == "legacy" else profile,
+    )
+    begin_write = agent.persistence.begin_write
+    if profile == "legacy":
+        agent.persistence.begin_write = lambda db: None
+    try:
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        with Session() as db:
+            convs = [Conversation(user_id=0) for _ in range(threads)]
+            db.add_all(convs)
+            db.commit()
+            conv_ids = [c.id for c in convs]
+
+        lock = threading.Lock()
+        latencies: List[float] = []
+        counts = {"committed": 0, "locked": 0}
+        start = threading.Barrier(threads + 1)
+
+        def worker(conv_id: int) -> None:
+            start.wait()
+            for i in range(turns):
+                db = Session()
+                try:
+                    conv = db.get(Conversation, conv_id)
+                    state = load_state(db, conv)
+                    time.sleep(llm_ms / 1000)   # the model is thinking
+                    message_page(db, conv_id, limit=50)
+
+                    draft = None
+                    if i % 4 == 3:
+                        draft = DRAFT_TEXT.replace("Term: 2 years", f"Term: {i} years")
+                        state.draft, state.is_drafted, state.document_type = draft, True, "NDA"
+                    t0 = time.perf_counter()
+                    commit_turn(db, conv_id, f"user {i}", f"assistant {i}", state, draft)
+                    elapsed = time.perf_counter() - t0
+                    with lock:
+                        latencies.append(elapsed)
+                        counts["committed"] += 1
+                except OperationalError as exc:
+                    if "locked" not in str(exc):
+                        raise
+                    with lock:
+                        counts["locked"] += 1
+                finally:
+                    db.close()
+
+        pool = [threading.Thread(target=worker, args=(cid,)) for cid in conv_ids]
+        for t in pool:
+            t.start()
+        start.wait()
+        t0 = time.perf_counter()
+        for t in pool:
+            t.join()
+        wall = time.perf_counter() - t0
+
+        return {
+            "profile":     profile,
+            "turns":       threads * turns,
+            "committed":   counts["committed"],
+            "locked":      counts["locked"],
+            "wall_s":      wall,
+            "turns_per_s": counts["committed"] / wall if wall else 0.0,
+            "p50_ms":      _pct(latencies, 0.50) * 1000,
+            "p95_ms":      _pct(latencies, 0.95) * 1000,
+        }
+    finally:
+        agent.persistence.begin_write = begin_write
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv: List[str]) -> int:
+    threads = int(argv[1]) if len(argv) > 1 else 8
+    turns   = int(argv[2]) if len(argv) > 2 else 25
+    llm_ms  = float(argv[3]) if len(argv) > 3 else 5.0
+    print(f"{threads} threads × {turns} turns, {llm_ms:g} ms simulated LLM wait")
+    print(f"{'profile':12} {'committed':>10} {'locked':>7} {'turns/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for profile in PROFILES:
+        r = run_profile(profile, threads, turns, llm_ms)
+        print(f"{r['profile']:12} {r['committed']:>6}/{r['turns']:<3} {r['locked']:>7} "
+              f"{r['turns_per_s']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main(sys.argv))
+    finally:
+        os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        shutil.rmtree(_WORKDIR, ignore_errors=True)
@@ -0,0 +1,149 @@
+"""
+benchmarks/stub_llm.py
+─────────────────────────────────────────────────────────────────────────────
+Deterministic local stand-in for `agent.llm.llm_chain`.
+
+`ScriptedLLM` recognises which stage is calling from the rendered prompt
+and answers with that stage's scripted output after `latency_ms` (sleep,
+so it models network wait, not CPU).  Tokens are streamed in fixed-size
+chunks when streaming is requested.  A script entry may also be a
+callable of the prompt text (the section stage echoes its heading).
+
+    llm = ScriptedLLM(latency_ms=50)
+    llm.script["conversational"] = json.dumps({...})
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Lower-cased prompt markers; first match wins (reviser before drafter).
+STAGE_MARKERS = (
+    ("section",         "you are drafting one section"),
+    ("outline",         "plan the section outline"),
+    ("reviser",         "revising an existing document"),
+    ("drafter",         "veteran legal drafter"),
+    ("checker",         "scan the draft below"),
+    ("history_summary", "running summary"),
+    ("conversational",  "empathetic legal-ai assistant"),
+)
+
+DRAFT_TEXT = "\n\n".join(
+    [
+        "MUTUAL NON-DISCLOSURE AGREEMENT",
+        "This Agreement is made between Alice Corp and Bob LLC.",
+    ]
+    + [
+        f"{i}. Clause {i}. Each party shall keep the other's confidential "
+        f"information strictly confidential and use it only for the Purpose."
+        for i in range(1, 41)
+    ]
+    + ["Governed by the laws of Delaware. Term: 2 years."]
+)
+
+SECTION_HEADINGS = [
+    "Parties", "Definitions", "Confidential Information", "Obligations",
+    "Exclusions", "Term", "Remedies", "Governing Law",
+]
+
+_SECTION_RE = re.compile(r"section to draft:\s*(\d+)\.\s*([^\n–]+)", re.IGNORECASE)
+
+
+def _section_reply(prompt: str) -> str:
+    match = _SECTION_RE.search(prompt)
+    number, heading = (match.group(1), match.group(2).strip()) if match else ("0", "Section")
+    body = "\n\n".join(
+        f"{number}.{i} {heading}: Alice Corp and Bob LLC agree to clause {number}.{i}, "
+        f"which applies to the Purpose for the whole term of this Agreement."
+        for i in range(1, 6)
+    )
+    return json.dumps({"section": body})
+
+
+Script = Union[str, Callable[[str], str]]
+
+DEFAULT_SCRIPT: Dict[str, Script] = {
+    "conversational": json.dumps({
+        "actions": ["update_document_type", "update_needed_values", "update_document"],
+        "user_reply": "Great – drafting your NDA between Alice Corp and Bob LLC now.",
+        "update_document_type": "NDA",
+        "update_needed_values": {"Party A": "Alice Corp", "Party B": "Bob LLC", "Effective Date": "July 1, 2026"},
+        "update_document_instruction": "create fresh draft",
+    }),
+    "drafter": json.dumps({"draft": DRAFT_TEXT, "is_drafted": True}),
+    "reviser": json.dumps({
+        "full_rewrite": False,
+        "edits": [{"op": "replace", "anchor": "B3", "find": "strictly", "text": "permanently"}],
+    }),
+    "checker": json.dumps({"is_success": True, "missing_desc": "", "ask_user": ""}),
+    "history_summary": "- user is Alice Corp\n- wants an NDA with Bob LLC",
+    "outline": json.dumps({
+        "title": "MUTUAL NON-DISCLOSURE AGREEMENT",
+        "sections": [{"heading": h, "brief": f"{h.lower()} of Alice Corp and Bob LLC"}
+                     for h in SECTION_HEADINGS],
+    }),
+    "section": _section_reply,
+}
+
+
+def stage_of(prompt: str) -> str:
+    lowered = prompt.lower()
+    for stage, marker in STAGE_MARKERS:
+        if marker in lowered:
+            return stage
+    return "conversational"
+
+
+class ScriptedLLM(BaseChatModel):
+    latency_ms: float = 0.0
+    chunk_size: int = 8
+    script: Dict[str, Script] = {}
+    calls: Dict[str, int] = {}
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.script = {**DEFAULT_SCRIPT, **self.script}
+        self.calls = {}
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-stub"
+
+    @property
+    def model_name(self) -> str:
+        return "scripted-stub"
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(m.content) for m in messages)
+        stage  = stage_of(prompt)
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        reply = self.script[stage]
+        return reply(prompt) if callable(reply) else reply
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._respond(messages)))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._respond(messages)))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency_ms / 1000)
+        text = self._respond(messages)
+        for i in range(0, len(text), self.chunk_size):
+            piece = text[i:i + self.chunk_size]
+            if run_manager:
+                run_manager.on_llm_new_token(piece)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
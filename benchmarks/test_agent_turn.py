@@ -0,0 +1,231 @@
+"""
+Agent turn benchmarks: whole `run_agent_step` turns and each chain stage
+on its own (prompt render + stub round-trip + parse).
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import agent.agent_runner
+from agent.agent_runner import (
+    _drafter_inputs,
+    _parse_check,
+    _parse_conversational,
+    _parse_draft,
+    _parse_patch,
+    _reviser_inputs,
+    arun_agent_step,
+    run_agent_step,
+)
+from agent.chains.placeholder_checker import local_placeholder_check
+from agent.chains.registry import chain_registry
+from agent.doc_templates import template_registry
+from agent.retry import DeadlineExceededError, call_with_retry, llm_breaker, turn_deadline
+from agent.scheduler import LLMScheduler, Priority
+from agent.state import AgentState
+from benchmarks.stub_llm import DEFAULT_SCRIPT, DRAFT_TEXT, SECTION_HEADINGS
+
+CHAT_ONLY = json.dumps({
+    "actions": ["update_needed_values"],
+    "user_reply": "Thanks – what is the effective date?",
+    "update_needed_values": {"Party A": "Alice Corp"},
+})
+TEMPLATED_FIELDS = {"Party A": "Alice Corp", "Party B": "Bob LLC", "Effective Date": "July 1, 2026"}
+TEMPLATED = json.dumps({
+    "actions": ["update_document_type", "update_needed_values", "update_document"],
+    "user_reply": "Drafting your NDA now.",
+    "update_document_type": "NDA",
+    "update_needed_values": TEMPLATED_FIELDS,
+    "update_document_instruction": "create fresh draft",
+})
+INCOMPLETE = json.dumps({
+    "actions": ["update_document_type", "update_needed_values", "update_document"],
+    "user_reply": "Drafting your NDA now.",
+    "update_document_type": "NDA",
+    "update_needed_values": {"Party A": "Alice Corp", "Effective Date": "soon"},
+    "update_document_instruction": "create fresh draft",
+})
+REVISE = json.dumps({
+    "actions": ["update_document"],
+    "user_reply": "Updating the confidentiality clause.",
+    "update_document_instruction": "make clause 1 permanent",
+})
+
+
+def _drafted_state() -> AgentState:
+    return AgentState(
+        document_type="NDA",
+        needed_fields={"Party A": "Alice Corp", "Party B": "Bob LLC"},
+        draft=DRAFT_TEXT,
+        is_drafted=True,
+    )
+
+
+@pytest.fixture
+def sections_mode(monkeypatch):
+    monkeypatch.setattr(agent.agent_runner, "DRAFT_MODE", "sections")
+
+
+@pytest.fixture
+def no_templates(monkeypatch):
+    """Fresh NDA drafts go to the model instead of the local template."""
+    monkeypatch.setattr(agent.agent_runner, "DRAFT_TEMPLATES", False)
+
+
+def _assert_sectioned(draft: str) -> None:
+    positions = [draft.index(f"{n}. {h}") for n, h in enumerate(SECTION_HEADINGS, 1)]
+    assert positions == sorted(positions)
+
+
+@pytest.fixture
+def scripted(stub_llm):
+    """Temporarily override the conversational script."""
+    def use(conversational: str):
+        stub_llm.script["conversational"] = conversational
+    yield use
+    stub_llm.script["conversational"] = DEFAULT_SCRIPT["conversational"]
+
+
+# ─────────────────────────────────────────────────────────────
+# Whole turns
+# ─────────────────────────────────────────────────────────────
+def test_turn_conversational_only(benchmark, new_conversation, scripted):
+    scripted(CHAT_ONLY)
+    conv_id = str(new_conversation(20))
+    result = benchmark(lambda: run_agent_step(AgentState(), "It's Alice Corp.", conv_id))
+    assert result["draft_document"] is None
+
+
+def test_turn_fresh_draft(benchmark, new_conversation, no_templates):
+    conv_id = str(new_conversation(20))
+    result = benchmark(lambda: run_agent_step(AgentState(), "Draft an NDA.", conv_id))
+    assert result["document_updated_this_turn"]
+
+
+def test_turn_fresh_draft_template(benchmark, new_conversation, scripted, stub_llm):
+    scripted(TEMPLATED)
+    conv_id = str(new_conversation(20))
+    drafter_calls = stub_llm.calls.get("drafter", 0)
+    result = benchmark(lambda: run_agent_step(AgentState(), "Draft an NDA.", conv_id))
+    assert result["draft_document"].startswith("MUTUAL NON-DISCLOSURE AGREEMENT")
+    assert stub_llm.calls.get("drafter", 0) == drafter_calls
+
+
+def test_turn_incomplete_fields(benchmark, new_conversation, scripted, stub_llm):
+    scripted(INCOMPLETE)
+    conv_id = str(new_conversation(20))
+    before = {stage: stub_llm.calls.get(stage, 0) for stage in ("drafter", "checker")}
+    result = benchmark(lambda: run_agent_step(AgentState(), "Draft an NDA.", conv_id))
+    assert not result["document_updated_this_turn"]
+    assert "Party B" in result["reply"] and "Effective Date" in result["reply"]
+    assert {stage: stub_llm.calls.get(stage, 0) for stage in before} == before
+
+
+def test_turn_patch_revision(benchmark, new_conversation, scripted):
+    scripted(REVISE)
+    conv_id = str(new_conversation(20))
+    result = benchmark(lambda: run_agent_step(_drafted_state(), "Make it permanent.", conv_id))
+    assert "permanently" in result["draft_document"]
+
+
+def test_turn_fresh_draft_async(benchmark, new_conversation, no_templates):
+    conv_id = str(new_conversation(20))
+    result = benchmark(lambda: asyncio.run(
+        arun_agent_step(AgentState(), "Draft an NDA.", conv_id)
+    ))
+    assert result["document_updated_this_turn"]
+
+
+def test_turn_fresh_draft_sections(benchmark, new_conversation, sections_mode, no_templates):
+    conv_id = str(new_conversation(20))
+    result = benchmark(lambda: run_agent_step(AgentState(), "Draft an NDA.", conv_id))
+    assert result["document_updated_this_turn"]
+    _assert_sectioned(result["draft_document"])
+
+
+def test_turn_fresh_draft_sections_async(benchmark, new_conversation, sections_mode, no_templates):
+    conv_id = str(new_conversation(20))
+    result = benchmark(lambda: asyncio.run(
+        arun_agent_step(AgentState(), "Draft an NDA.", conv_id)
+    ))
+    assert result["document_updated_this_turn"]
+    _assert_sectioned(result["draft_document"])
+
+
+# ─────────────────────────────────────────────────────────────
+# Individual stages
+# ─────────────────────────────────────────────────────────────
+HISTORY = "Human: I need an NDA.\nAI: Sure, who are the parties?\n" * 10
+
+
+def _stage(name, inputs, parse):
+    stage = chain_registry.get(name)
+    return lambda: parse(stage.invoke(inputs))
+
+
+def test_stage_conversational(benchmark):
+    run = _stage("conversational", {
+        "user_input": "Draft an NDA.", "state": AgentState().summary(), "history": HISTORY,
+    }, _parse_conversational)
+    assert benchmark(run)["user_reply"]
+
+
+def test_stage_drafter(benchmark):
+    state = _drafted_state()
+    run = _stage("drafter", _drafter_inputs(state, "create fresh draft", HISTORY), _parse_draft)
+    assert benchmark(run)
+
+
+def test_stage_reviser(benchmark):
+    state = _drafted_state()
+    run = _stage("reviser", _reviser_inputs(state, "make clause 1 permanent", HISTORY), _parse_patch)
+    assert benchmark(run)["edits"]
+
+
+def test_stage_template_render(benchmark):
+    rendered = benchmark(template_registry.render, "NDA", TEMPLATED_FIELDS)
+    assert not rendered.custom_fields
+
+
+def test_stage_checker(benchmark):
+    run = _stage("checker", {"draft": DRAFT_TEXT, "history": HISTORY}, _parse_check)
+    assert benchmark(run).is_success
+
+
+FIELDS = {"Party A": "Alice Corp", "Party B": "Bob LLC"}
+SIGNED = "Alice Corp and Bob LLC agree.\n\nSigned: ______________\nBy: ____"
+SUB_CLAUSES = "Alice Corp shall pay Bob LLC:\n[a] the fee; and\n[b] the costs in Schedule [A]."
+
+
+@pytest.mark.parametrize("draft, expected", [
+    (SIGNED, None),                                         # signature line → LLM decides
+    (SUB_CLAUSES, None),                                    # "[a]" markers → LLM decides
+    ("Alice Corp and [PARTY_B] agree on {{ date }}.", False),
+    ("Alice Corp and Bob LLC agree.", True),
+], ids=["signature_line", "sub_clause_markers", "certain", "clean"])
+def test_local_placeholder_check(benchmark, draft, expected):
+    check = benchmark(local_placeholder_check, draft, FIELDS)
+    assert (check if check is None else check.is_success) is expected
+
+
+# ─────────────────────────────────────────────────────────────
+# Scheduler queue under the turn deadline
+# ─────────────────────────────────────────────────────────────
+def test_sync_queue_wait_deadline(benchmark):
+    scheduler = LLMScheduler(max_concurrency=1)
+    failures = llm_breaker.stats()["consecutive_failures"]
+
+    def queued_turn():
+        with scheduler.slot(Priority.INTERACTIVE, user="busy"):   # the only slot
+            with turn_deadline(0.05), pytest.raises(DeadlineExceededError):
+                call_with_retry(
+                    lambda: "unreachable",
+                    slot=lambda timeout: scheduler.slot(Priority.DRAFTING, timeout=timeout),
+                )
+
+    benchmark.pedantic(queued_turn, rounds=3)
+    stats = scheduler.stats()
+    assert stats["queue_depth"] == 0 and stats["in_flight"] == 0
+    assert llm_breaker.stats()["consecutive_failures"] == failures
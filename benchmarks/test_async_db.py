@@ -0,0 +1,146 @@
+"""
+Async session layer: concurrent turns awaited on one event loop, and the
+async routes end-to-end through FastAPI.
+
+SQLite runs on the suite's aiosqlite engine; set BENCH_POSTGRES_URL
+(postgresql+asyncpg://…, a scratch database – tables are created and
+dropped) to run the same workload against Postgres.
+"""
+
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import api.database
+from agent.history_cache import history_cache
+from agent.memory import aget_memory, message_page
+from agent.persistence import commit_turn
+from agent.state import AgentState
+from agent.state_store import load_state
+from api.database import Base, make_async_engine
+from api.models import Conversation, Document, DocumentRevision
+from api.routers.agent import router as agent_router
+from api.routers.conversation import router as conversation_router
+from api.routers.document import router as document_router
+from benchmarks.stub_llm import DRAFT_TEXT
+
+POSTGRES_URL = os.getenv("BENCH_POSTGRES_URL")
+TASKS, TURNS = 8, 5
+
+
+async def _turns(Session, conv_id: int) -> int:
+    committed = 0
+    for i in range(TURNS):
+        async with Session() as db:
+            conv = await db.get(Conversation, conv_id)
+            state = await db.run_sync(load_state, conv)
+            await db.commit()
+            await asyncio.sleep(0)   # the model is thinking
+            await db.run_sync(message_page, conv_id, limit=50)
+            draft = None
+            if i % 2:
+                draft = DRAFT_TEXT.replace("Term: 2 years", f"Term: {i} years")
+                state.draft, state.is_drafted, state.document_type = draft, True, "NDA"
+            await db.run_sync(commit_turn, conv_id, f"user {i}", f"assistant {i}", state, draft)
+            committed += 1
+    return committed
+
+
+async def _workload(Session) -> int:
+    async with Session() as db:
+        convs = [Conversation(user_id=0) for _ in range(TASKS)]
+        db.add_all(convs)
+        await db.commit()
+        conv_ids = [c.id for c in convs]
+    done = await asyncio.gather(*(_turns(Session, cid) for cid in conv_ids))
+    return sum(done)
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def async_sessions(request):
+    if request.param == "sqlite":
+        yield api.database.AsyncSessionLocal
+        return
+    if not POSTGRES_URL:
+        pytest.skip("BENCH_POSTGRES_URL not set")
+    engine = make_async_engine(POSTGRES_URL)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(Base.metadata.tables["users"].insert().values(id=0))
+
+    async def teardown():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+    asyncio.run(setup())
+    yield async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(teardown())
+
+
+def test_concurrent_async_turns(benchmark, async_sessions):
+    committed = benchmark.pedantic(
+        lambda: asyncio.run(_workload(async_sessions)), rounds=3,
+    )
+    assert committed == TASKS * TURNS
+
+
+def test_aget_memory_cold(benchmark, new_conversation):
+    conv_id = new_conversation(100)
+
+    def load() -> str:
+        return asyncio.run(aget_memory(str(conv_id))).load_memory_variables({})["history"]
+
+    benchmark.pedantic(load, setup=lambda: history_cache.invalidate(conv_id), rounds=20)
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+    app.include_router(conversation_router, prefix="/conversations")
+    app.include_router(agent_router)
+    app.include_router(document_router)
+    with TestClient(app) as c:
+        yield c
+
+
+def test_create_conversation_route(benchmark, client):
+    response = benchmark(lambda: client.post("/conversations/", json={}))
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["messages"] == [] and body["has_more_messages"] is False
+    assert client.get(f"/conversations/{body['id']}").status_code == 200
+
+
+@pytest.mark.parametrize("route", ["message", "stream"])
+def test_agent_route_unknown_conversation(benchmark, client, route):
+    response = benchmark(lambda: client.post(f"/agent/abc/{route}", json={"content": "hi"}))
+    assert response.status_code == 404, response.text
+
+
+def test_corrupt_revision_routes(benchmark, client, new_conversation):
+    conv_id = new_conversation()
+    with api.database.SessionLocal() as db:
+        commit_turn(db, conv_id, "draft it", "done", AgentState(document_type="NDA", draft=DRAFT_TEXT, is_drafted=True), DRAFT_TEXT)
+        revised = DRAFT_TEXT.replace("Term: 2 years", "Term: 3 years")
+        commit_turn(db, conv_id, "change the term", "updated", AgentState(document_type="NDA", draft=revised, is_drafted=True), revised)
+        doc = db.query(Document).filter_by(conversation_id=conv_id).one()
+        delta = db.query(DocumentRevision).filter_by(document_id=doc.id, version=2).one()
+        assert delta.kind == "delta"
+        delta.payload = b"not zlib"
+        db.commit()
+
+    responses = benchmark(lambda: [
+        client.get(f"/documents/{conv_id}/diff", params={"from_version": 1}),
+        client.get(f"/documents/{conv_id}/revisions/2"),
+        client.post(f"/documents/{conv_id}/revisions/2/restore"),
+    ])
+    for response in responses:
+        assert response.status_code == 500, response.text
+        assert "corrupt" in response.json()["detail"]
@@ -0,0 +1,23 @@
+"""JSON decode path over the malformed-output corpus (see json_salvage.py)."""
+
+import pytest
+
+from agent.utils import parse_model_json, salvage_json
+from benchmarks.json_salvage import load_corpus
+
+CASES = load_corpus()
+
+
+@pytest.mark.parametrize("case", CASES, ids=[c["name"] for c in CASES])
+def test_parse_model_json(benchmark, case):
+    result = benchmark(parse_model_json, case["text"], case["required_key"])
+    if case["expect_key"] is None:
+        assert result is None
+    else:
+        assert case["expect_key"] in result
+
+
+@pytest.mark.parametrize("name", ["drafter_8k_preamble", "drafter_8k_truncated"])
+def test_salvage_json_large(benchmark, name):
+    case = next(c for c in CASES if c["name"] == name)
+    benchmark(salvage_json, case["text"], case["required_key"])
@@ -0,0 +1,43 @@
+"""Memory bootstrap cost at different history lengths (cold DB vs cache, validated cache)."""
+
+import pytest
+
+from agent.history_cache import history_cache
+from agent.memory import get_memory
+
+LENGTHS = [10, 100, 1000]
+
+
+def _load(conv_id: int) -> str:
+    memory = get_memory(str(conv_id))
+    try:
+        return memory.load_memory_variables({})["history"]
+    finally:
+        memory.db.close()
+
+
+@pytest.mark.parametrize("n_messages", LENGTHS)
+def test_bootstrap_cold(benchmark, new_conversation, n_messages):
+    conv_id = new_conversation(n_messages)
+    benchmark.pedantic(
+        _load, args=(conv_id,),
+        setup=lambda: history_cache.invalidate(conv_id),
+        rounds=20,
+    )
+
+
+@pytest.mark.parametrize("n_messages", LENGTHS)
+def test_bootstrap_cached(benchmark, new_conversation, n_messages):
+    conv_id = new_conversation(n_messages)
+    _load(conv_id)   # warm the history cache
+    benchmark(_load, conv_id)
+
+
+@pytest.mark.parametrize("n_messages", LENGTHS)
+def test_bootstrap_cached_validated(benchmark, new_conversation, n_messages, monkeypatch):
+    """Multi-worker mode: every hit is checked with one COUNT first."""
+    monkeypatch.setattr("agent.memory.VALIDATE_CACHE", True)
+    conv_id = new_conversation(n_messages)
+    _load(conv_id)
+    benchmark(_load, conv_id)
+    assert history_cache.stats()["stale"] == 0
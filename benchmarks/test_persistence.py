@@ -0,0 +1,42 @@
+"""`commit_turn` – the single write path at the end of every turn."""
+
+from api.database import SessionLocal
+from agent.persistence import commit_turn
+from agent.state import AgentState
+from benchmarks.stub_llm import DRAFT_TEXT
+
+
+def _state(draft: str) -> AgentState:
+    return AgentState(document_type="NDA", draft=draft, is_drafted=bool(draft))
+
+
+def test_commit_turn_messages_only(benchmark, new_conversation):
+    conv_id = new_conversation(20)
+    db = SessionLocal()
+    try:
+        benchmark(commit_turn, db, conv_id, "hello", "hi there", _state(""))
+    finally:
+        db.close()
+
+
+def test_commit_turn_unchanged_document(benchmark, new_conversation):
+    conv_id = new_conversation(20)
+    db = SessionLocal()
+    try:
+        commit_turn(db, conv_id, "draft it", "done", _state(DRAFT_TEXT), DRAFT_TEXT)
+        benchmark(commit_turn, db, conv_id, "thanks", "welcome", _state(DRAFT_TEXT), DRAFT_TEXT)
+    finally:
+        db.close()
+
+
+def test_commit_turn_revised_document(benchmark, new_conversation):
+    conv_id = new_conversation(20)
+    db = SessionLocal()
+    counter = iter(range(10**9))
+    try:
+        def revise():
+            draft = DRAFT_TEXT.replace("Term: 2 years", f"Term: {next(counter)} years")
+            commit_turn(db, conv_id, "change the term", "updated", _state(draft), draft)
+        benchmark(revise)
+    finally:
+        db.close()
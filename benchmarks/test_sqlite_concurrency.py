@@ -0,0 +1,9 @@
+"""Concurrent turn commits under the production SQLite engine profile."""
+
+from benchmarks.sqlite_concurrency import run_profile
+
+
+def test_concurrent_commits_production(benchmark):
+    result = benchmark.pedantic(run_profile, args=("production", 8, 10, 0.0), rounds=3)
+    assert result["locked"] == 0
+    assert result["committed"] == result["turns"]
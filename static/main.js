@@ -48,6 +48,7 @@ async function sendMessage(content) {
 
 // --- UI State ---
 let conversations = [];
+let convoNextBefore = null;   // keyset cursor for the next sidebar page
 let selectedConvo = null;
 
 // --- DOM Elements ---
@@ -111,12 +112,22 @@ registerForm.onsubmit = async e => {
 };
 
 // --- Conversation Management ---
-async function loadConversations() {
-  const res = await fetch('/conversations/', {
+async function loadConversations(more = false) {
+  const params = new URLSearchParams({ limit: 50 });
+  if (more && convoNextBefore) params.set('before', convoNextBefore);
+  const res = await fetch(`/conversations/?${params}`, {
     headers: { 'Authorization': 'Bearer ' + token }
   });
   if (!res.ok) throw new Error(await res.text());
-  conversations = await res.json();
+  const page = await res.json();
+  conversations = more ? conversations.concat(page.conversations) : page.conversations;
+  convoNextBefore = page.has_more ? page.next_before : null;
+  renderConvoList();
+}
+
+function touchConversation(convo, docType) {
+  convo.last_activity = new Date().toISOString();
+  if (docType) convo.doc_type = docType;
   renderConvoList();
 }
 
@@ -133,10 +144,18 @@ function renderConvoList() {
   conversations.forEach(convo => {
     const btn = document.createElement('button');
     btn.className = 'convo-item' + (selectedConvo && convo.id === selectedConvo.id ? ' selected' : '');
-    btn.textContent = `#${convo.id} (${new Date(convo.created_at).toLocaleString()})`;
+    const label = convo.doc_type ? ` · ${convo.doc_type}` : '';
+    btn.textContent = `#${convo.id}${label} (${new Date(convo.last_activity).toLocaleString()})`;
     btn.onclick = () => selectConversation(convo.id);
     convoList.appendChild(btn);
   });
+  if (convoNextBefore) {
+    const more = document.createElement('button');
+    more.className = 'convo-item';
+    more.textContent = 'Load more…';
+    more.onclick = () => loadConversations(true);
+    convoList.appendChild(more);
+  }
   deleteConvoBtn.disabled = !selectedConvo;
 }
 
@@ -148,7 +167,7 @@ async function createConversation() {
   });
   if (!res.ok) throw new Error(await res.text());
   const convo = await res.json();
-  conversations.unshift(convo);
+  conversations.unshift({ id: convo.id, created_at: convo.created_at, doc_type: null, last_activity: convo.created_at });
   renderConvoList();
   selectConversation(convo.id);
 }
@@ -177,16 +196,14 @@ async function selectConversation(id) {
   renderConvoList();
   chat.innerHTML = '';
   documentContent.textContent = 'Loading...';
-  // Load messages
-  const res = await fetch(`/conversations/${id}`, {
-    headers: { 'Authorization': 'Bearer ' + token }
-  });
-  if (!res.ok) { chat.innerHTML = '<div>Error loading conversation.</div>'; return; }
-  const convo = await res.json();
-  if (convo.messages && convo.messages.length) {
-    convo.messages.forEach(m => {
+  // Load the newest page of messages (older ones on demand)
+  const page = await fetchMessages(id);
+  if (!page) { chat.innerHTML = '<div>Error loading conversation.</div>'; return; }
+  if (page.messages.length) {
+    page.messages.forEach(m => {
       addMsg(m.sender, m.content);
     });
+    renderLoadEarlier(id, page);
   } else {
     addMsg('agent', "Hi, I’m your Legal Assistant. I can help you draft documents like: NDA Agreement, Lease or Rental Agreement, Partnership Agreement, Shareholder Agreement. Or feel free to describe your legal needs.");
   }
@@ -202,12 +219,45 @@ async function selectConversation(id) {
   }
 }
 
+// --- Message history (keyset pages, newest first) ---
+async function fetchMessages(id, before) {
+  const params = new URLSearchParams({ limit: 50 });
+  if (before) params.set('before', before);
+  const res = await fetch(`/conversations/${id}/messages?${params}`, {
+    headers: { 'Authorization': 'Bearer ' + token }
+  });
+  return res.ok ? res.json() : null;
+}
+
+function renderLoadEarlier(id, page) {
+  if (!page.has_more) return;
+  const btn = document.createElement('button');
+  btn.className = 'load-earlier';
+  btn.textContent = 'Load earlier messages';
+  btn.onclick = async () => {
+    btn.disabled = true;
+    const older = await fetchMessages(id, page.next_before);
+    if (!older || !selectedConvo || selectedConvo.id !== id) { btn.disabled = false; return; }
+    btn.remove();
+    const anchor = chat.firstChild;
+    const height = chat.scrollHeight;
+    older.messages.forEach(m => chat.insertBefore(msgEl(m.sender, m.content), anchor));
+    renderLoadEarlier(id, older);
+    chat.scrollTop = chat.scrollHeight - height;   // keep the view where it was
+  };
+  chat.insertBefore(btn, chat.firstChild);
+}
+
 // --- Chat ---
-function addMsg(role, content) {
+function msgEl(role, content) {
   const div = document.createElement('div');
   div.className = 'msg ' + role;
   div.textContent = content;
-  chat.appendChild(div);
+  return div;
+}
+
+function addMsg(role, content) {
+  chat.appendChild(msgEl(role, content));
   chat.scrollTop = chat.scrollHeight;
 }
 
@@ -236,10 +286,9 @@ inputRow.onsubmit = async e => {
     const docRes = await fetch(`/documents/${selectedConvo.id}`, {
       headers: { 'Authorization': 'Bearer ' + token }
     });
-    if (docRes.ok) {
-      const doc = await docRes.json();
-      documentContent.textContent = doc.content;
-    }
+    const doc = docRes.ok ? await docRes.json() : null;
+    if (doc) documentContent.textContent = doc.content;
+    touchConversation(selectedConvo, doc && doc.doc_type);
   } catch (err) {
     chat.lastChild.textContent = 'Error: ' + err.message;
   }